@@ -0,0 +1,72 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from analytics.models import DailyRollup, SubGoalDailyRollup
+from analytics.rollup import rebuild
+from analytics.views import AnalyticsView
+from goals.models import Goal, SubGoal
+from tasks.models import Prayer, Task
+from thimar_project.benchmarking import bench_user, rolled_back, summarize, timed
+
+
+class Command(BaseCommand):
+    help = "Time the analytics endpoint against the same heatmap counted from the tasks table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=200_000)
+        parser.add_argument('--sub-goals', type=int, default=30)
+        parser.add_argument('--days', type=int, default=3 * 365)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        today = timezone.localdate()
+        with rolled_back():
+            user = bench_user()
+            prayers = list(Prayer.objects.filter(user=user)) + [None] * 7
+            sub_goals = SubGoal.objects.bulk_create(
+                SubGoal(goal=Goal.objects.create(user=user, name=f"goal {i % 5}"), name=f"sub {i}")
+                for i in range(options['sub_goals'])
+            )
+            Task.objects.bulk_create(
+                (
+                    Task(
+                        sub_goal=rng.choice(sub_goals), user=user, name=f"task {i}",
+                        date=today - timedelta(days=rng.randrange(options['days'])),
+                        status=rng.random() < 0.7, prayer=rng.choice(prayers),
+                    )
+                    for i in range(options['tasks'])
+                ),
+                batch_size=5000,
+            )
+            started = time.perf_counter()
+            rebuild()
+            self.stdout.write(
+                f"{options['tasks']} tasks -> {DailyRollup.objects.count()} daily and "
+                f"{SubGoalDailyRollup.objects.count()} sub-goal rollup rows, "
+                f"rebuilt in {time.perf_counter() - started:.1f} s"
+            )
+
+            view = AnalyticsView.as_view()
+            factory = APIRequestFactory()
+
+            def endpoint():
+                request = factory.get('/api/analytics/')
+                force_authenticate(request, user=user)
+                assert view(request).status_code == 200
+
+            def heatmap_from_tasks():
+                list(
+                    Task.objects.filter(user=user, date__gt=today - timedelta(days=365), date__lte=today)
+                    .values('date')
+                    .annotate(scheduled=Count('pk'), completed=Count('pk', filter=Q(status=True)))
+                )
+
+            self.stdout.write(f"{'analytics endpoint':<26} {summarize(timed(endpoint, options['repeat']))}")
+            self.stdout.write(f"{'heatmap only, from tasks':<26} {summarize(timed(heatmap_from_tasks, options['repeat']))}")
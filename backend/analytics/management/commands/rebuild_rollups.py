@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.rollup import find_rollup_drift, rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily completion rollups from the tasks table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only report rollup rows that disagree with the tasks table.",
+        )
+
+    def handle(self, *args, **options):
+        drift = find_rollup_drift()
+        self.stdout.write(f"{len(drift)} stale daily rollups")
+        for model_name, (user_id, day, scope_id) in drift[:20]:
+            self.stdout.write(f"  {model_name}: user {user_id}, {day}, {scope_id}")
+
+        if options['check']:
+            if drift:
+                raise CommandError(f"{len(drift)} daily rollups are stale.")
+            return
+
+        rebuild()
+        remaining = len(find_rollup_drift())
+        if remaining:
+            raise CommandError(f"{remaining} daily rollups still disagree after the rebuild.")
+        self.stdout.write(self.style.SUCCESS("Daily rollups rebuilt."))
@@ -0,0 +1,61 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('goals', '0016_subgoal_subgoal_goal_created_id_idx'),
+        ('tasks', '0010_task_user_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubGoalDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('scheduled', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('sub_goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='goals.subgoal')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sub_goal_daily_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('scheduled', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('prayer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='tasks.prayer')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='subgoaldailyrollup',
+            index=models.Index(fields=['user', 'day'], name='subgoal_rollup_user_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='subgoaldailyrollup',
+            constraint=models.UniqueConstraint(fields=('sub_goal', 'day'), name='subgoal_rollup_day_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyrollup',
+            index=models.Index(fields=['user', 'day'], name='rollup_user_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('prayer__isnull', True)), fields=('user', 'day'), name='rollup_user_day_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('prayer__isnull', False)), fields=('user', 'day', 'prayer'), name='rollup_user_day_prayer_uniq'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.1.13 on 2026-10-18 10:20
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Q
+from django.db.models.functions import Coalesce
+
+
+def backfill_rollups(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskOccurrence = apps.get_model('tasks', 'TaskOccurrence')
+    DailyRollup = apps.get_model('analytics', 'DailyRollup')
+    SubGoalDailyRollup = apps.get_model('analytics', 'SubGoalDailyRollup')
+
+    # (user, day, sub-goal, prayer) -> [scheduled, completed]
+    totals = defaultdict(lambda: [0, 0])
+    one_off = (
+        Task.objects.filter(recurrence='')
+        .values_list('user_id', 'date', 'sub_goal_id', 'prayer_id')
+        .annotate(scheduled=Count('pk'), completed=Count('pk', filter=Q(status=True)))
+        .order_by()
+    )
+    for user_id, day, sub_goal_id, prayer_id, scheduled, completed in one_off.iterator():
+        totals[user_id, day, sub_goal_id, prayer_id][0] += scheduled
+        totals[user_id, day, sub_goal_id, prayer_id][1] += completed
+    occurrences = (
+        TaskOccurrence.objects.filter(status=True, skipped=False)
+        .values_list('task__user_id', 'date', 'task__sub_goal_id', Coalesce('prayer_id', 'task__prayer_id'))
+        .annotate(completed=Count('pk'))
+        .order_by()
+    )
+    for user_id, day, sub_goal_id, prayer_id, completed in occurrences.iterator():
+        totals[user_id, day, sub_goal_id, prayer_id][0] += completed
+        totals[user_id, day, sub_goal_id, prayer_id][1] += completed
+
+    by_prayer, by_sub_goal = defaultdict(lambda: [0, 0]), defaultdict(lambda: [0, 0])
+    for (user_id, day, sub_goal_id, prayer_id), (scheduled, completed) in totals.items():
+        for rows, key in ((by_prayer, (user_id, day, prayer_id)), (by_sub_goal, (user_id, day, sub_goal_id))):
+            rows[key][0] += scheduled
+            rows[key][1] += completed
+
+    DailyRollup.objects.bulk_create(
+        (
+            DailyRollup(user_id=user_id, day=day, prayer_id=prayer_id, scheduled=scheduled, completed=completed)
+            for (user_id, day, prayer_id), (scheduled, completed) in by_prayer.items()
+        ),
+        batch_size=5000,
+    )
+    SubGoalDailyRollup.objects.bulk_create(
+        (
+            SubGoalDailyRollup(
+                user_id=user_id, day=day, sub_goal_id=sub_goal_id, scheduled=scheduled, completed=completed
+            )
+            for (user_id, day, sub_goal_id), (scheduled, completed) in by_sub_goal.items()
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.db import models
+
+
+class DailyRollup(models.Model):
+    """
+    How many of a user's tasks were scheduled and completed on a day, split
+    by prayer (``prayer`` is null for tasks not tied to one), so a day is at
+    most a handful of rows however many tasks it holds. One-off tasks count
+    on their date; a recurring task counts once per completed occurrence,
+    the only ones stored. Kept up to date by analytics/signals.py and
+    rebuilt by ``rebuild_rollups``.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups'
+    )
+    day = models.DateField()
+    prayer = models.ForeignKey(
+        'tasks.Prayer', on_delete=models.CASCADE, related_name='daily_rollups', blank=True, null=True
+    )
+    scheduled = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'day'],
+                condition=models.Q(prayer__isnull=True),
+                name='rollup_user_day_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'day', 'prayer'],
+                condition=models.Q(prayer__isnull=False),
+                name='rollup_user_day_prayer_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='rollup_user_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} on {self.day}: {self.completed}/{self.scheduled}"
+
+
+class SubGoalDailyRollup(models.Model):
+    """The same counts per sub-goal and day, for per-goal trends."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='sub_goal_daily_rollups'
+    )
+    sub_goal = models.ForeignKey(
+        'goals.SubGoal', on_delete=models.CASCADE, related_name='daily_rollups'
+    )
+    day = models.DateField()
+    scheduled = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['sub_goal', 'day'], name='subgoal_rollup_day_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='subgoal_rollup_user_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sub_goal_id} on {self.day}: {self.completed}/{self.scheduled}"
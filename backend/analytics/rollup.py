@@ -0,0 +1,202 @@
+# analytics/rollup.py
+"""
+Maintenance of the DailyRollup and SubGoalDailyRollup tables.
+
+A task or occurrence *contributes* ``(scheduled, completed)`` to a key
+``(user_id, day, sub_goal_id, prayer_id)``; that key names one row in each
+table, ``(user, day, prayer)`` and ``(sub_goal, day)``. Writes apply the
+difference between what a row contributed before and after, as F()
+updates, the same way goals/progress.py keeps the goal counters;
+``rebuild`` recomputes every row from the tasks table.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Coalesce
+
+from tasks.models import Recurrence, Task, TaskOccurrence
+from .models import DailyRollup, SubGoalDailyRollup
+
+REBUILD_BATCH = 5000
+
+
+def task_contribution(user_id, day, sub_goal_id, prayer_id, status, recurrence):
+    """``(key, scheduled, completed)`` for a task row, or None for recurring tasks."""
+    if recurrence != Recurrence.NONE:
+        return None
+    return (user_id, day, sub_goal_id, prayer_id), 1, int(bool(status))
+
+
+def occurrence_contribution(task, day, prayer_id, status, skipped):
+    """``(key, scheduled, completed)`` for an occurrence of ``task``, or None."""
+    if not status or skipped:
+        return None
+    return (task.user_id, day, task.sub_goal_id, prayer_id or task.prayer_id), 1, 1
+
+
+def add(deltas, contribution, sign):
+    """Add ``contribution`` (or take it away, sign=-1) to a ``{key: [scheduled, completed]}`` dict."""
+    if contribution is not None:
+        key, scheduled, completed = contribution
+        deltas[key][0] += sign * scheduled
+        deltas[key][1] += sign * completed
+
+
+def new_deltas():
+    return defaultdict(lambda: [0, 0])
+
+
+def _split(totals):
+    """Sum ``{key: [scheduled, completed]}`` into the rows of each table."""
+    by_prayer, by_sub_goal = new_deltas(), new_deltas()
+    for (user_id, day, sub_goal_id, prayer_id), (scheduled, completed) in totals.items():
+        for rows, key in ((by_prayer, (user_id, day, prayer_id)), (by_sub_goal, (user_id, day, sub_goal_id))):
+            rows[key][0] += scheduled
+            rows[key][1] += completed
+    return by_prayer, by_sub_goal
+
+
+def _shift(model, lookup, user_id, scheduled, completed):
+    if not scheduled and not completed:
+        return
+    rows = model.objects.filter(**lookup)
+    changes = {'scheduled': F('scheduled') + scheduled, 'completed': F('completed') + completed}
+    if rows.update(**changes) or scheduled < 0 or completed < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**{'user_id': user_id, **lookup}, scheduled=scheduled, completed=completed)
+    except IntegrityError:
+        # Created by a concurrent writer in the meantime.
+        rows.update(**changes)
+
+
+def apply_deltas(deltas):
+    """
+    Shift the rollup rows by ``deltas``, creating the rows that gain their
+    first task. A removal from a missing row is dropped; rebuild_rollups
+    restores any difference that leaves behind.
+    """
+    by_prayer, by_sub_goal = _split(deltas)
+    _apply_by_prayer(by_prayer)
+    for (user_id, day, sub_goal_id), (scheduled, completed) in by_sub_goal.items():
+        lookup = {'sub_goal_id': sub_goal_id, 'day': day}
+        _shift(SubGoalDailyRollup, lookup, user_id, scheduled, completed)
+
+
+def _apply_by_prayer(by_prayer):
+    for (user_id, day, prayer_id), (scheduled, completed) in by_prayer.items():
+        lookup = {'user_id': user_id, 'day': day, 'prayer_id': prayer_id}
+        _shift(DailyRollup, lookup, user_id, scheduled, completed)
+
+
+def contributions(tasks=None, occurrences=None):
+    """
+    ``{key: [scheduled, completed]}`` summed over ``tasks`` and
+    ``occurrences`` (by default every task and occurrence), one grouped
+    query each.
+    """
+    if tasks is None:
+        tasks = Task.objects.all()
+    if occurrences is None:
+        occurrences = TaskOccurrence.objects.all()
+    totals = new_deltas()
+    one_off = (
+        tasks.filter(recurrence=Recurrence.NONE)
+        .values_list('user_id', 'date', 'sub_goal_id', 'prayer_id')
+        .annotate(scheduled=Count('pk'), completed=Count('pk', filter=Q(status=True)))
+        .order_by()
+    )
+    for user_id, day, sub_goal_id, prayer_id, scheduled, completed in one_off.iterator():
+        totals[user_id, day, sub_goal_id, prayer_id][0] += scheduled
+        totals[user_id, day, sub_goal_id, prayer_id][1] += completed
+    done = (
+        occurrences.filter(status=True, skipped=False)
+        .values_list('task__user_id', 'date', 'task__sub_goal_id', Coalesce('prayer_id', 'task__prayer_id'))
+        .annotate(completed=Count('pk'))
+        .order_by()
+    )
+    for user_id, day, sub_goal_id, prayer_id, completed in done.iterator():
+        totals[user_id, day, sub_goal_id, prayer_id][0] += completed
+        totals[user_id, day, sub_goal_id, prayer_id][1] += completed
+    return totals
+
+
+def take_away(tasks, occurrences):
+    """Remove what ``tasks`` and ``occurrences`` contribute, before they are deleted in bulk."""
+    deltas = contributions(tasks, occurrences)
+    for totals in deltas.values():
+        totals[0], totals[1] = -totals[0], -totals[1]
+    apply_deltas(deltas)
+
+
+def move_sub_goal(sub_goal_id, user_id):
+    """
+    Carry a sub-goal's history over to ``user_id``, the owner of the goal it
+    was moved to. Its tasks must already belong to that user.
+    """
+    rows = SubGoalDailyRollup.objects.filter(sub_goal_id=sub_goal_id)
+    old_user_id = rows.exclude(user_id=user_id).values_list('user_id', flat=True).first()
+    if old_user_id is None:
+        return
+    moved = new_deltas()
+    tasks = Task.objects.filter(sub_goal_id=sub_goal_id)
+    occurrences = TaskOccurrence.objects.filter(task__sub_goal_id=sub_goal_id)
+    for (_, day, _, prayer_id), (scheduled, completed) in contributions(tasks, occurrences).items():
+        for owner, sign in ((old_user_id, -1), (user_id, 1)):
+            moved[owner, day, prayer_id][0] += sign * scheduled
+            moved[owner, day, prayer_id][1] += sign * completed
+    _apply_by_prayer(moved)
+    rows.update(user_id=user_id)
+
+
+def _stored():
+    counted = Q(scheduled__gt=0) | Q(completed__gt=0)
+    by_prayer = {
+        (user_id, day, prayer_id): [scheduled, completed]
+        for user_id, day, prayer_id, scheduled, completed in DailyRollup.objects.filter(counted).values_list(
+            'user_id', 'day', 'prayer_id', 'scheduled', 'completed'
+        ).iterator()
+    }
+    by_sub_goal = {
+        (user_id, day, sub_goal_id): [scheduled, completed]
+        for user_id, day, sub_goal_id, scheduled, completed in SubGoalDailyRollup.objects.filter(
+            counted
+        ).values_list('user_id', 'day', 'sub_goal_id', 'scheduled', 'completed').iterator()
+    }
+    return by_prayer, by_sub_goal
+
+
+def find_rollup_drift():
+    """``(model name, key)`` for every stored rollup that disagrees with the tasks table."""
+    drift = []
+    for model, actual, stored in zip((DailyRollup, SubGoalDailyRollup), _split(contributions()), _stored()):
+        drift.extend(
+            (model.__name__, key) for key in actual.keys() | stored.keys() if actual.get(key) != stored.get(key)
+        )
+    return drift
+
+
+@transaction.atomic
+def rebuild():
+    """Replace every rollup row with one computed from the tasks table."""
+    by_prayer, by_sub_goal = _split(contributions())
+    DailyRollup.objects.all().delete()
+    SubGoalDailyRollup.objects.all().delete()
+    DailyRollup.objects.bulk_create(
+        (
+            DailyRollup(user_id=user_id, day=day, prayer_id=prayer_id, scheduled=scheduled, completed=completed)
+            for (user_id, day, prayer_id), (scheduled, completed) in by_prayer.items()
+        ),
+        batch_size=REBUILD_BATCH,
+    )
+    SubGoalDailyRollup.objects.bulk_create(
+        (
+            SubGoalDailyRollup(
+                user_id=user_id, day=day, sub_goal_id=sub_goal_id, scheduled=scheduled, completed=completed
+            )
+            for (user_id, day, sub_goal_id), (scheduled, completed) in by_sub_goal.items()
+        ),
+        batch_size=REBUILD_BATCH,
+    )
@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from goals.models import Goal, SubGoal
+from goals.signals import _deleted_through
+from tasks.models import Prayer, Task, TaskOccurrence
+from .rollup import (
+    add, apply_deltas, move_sub_goal, new_deltas, occurrence_contribution, take_away, task_contribution,
+)
+
+
+def _loaded(instance):
+    """The snapshot ``from_db`` took of the rollup fields, or None."""
+    return getattr(instance, '_loaded_rollup', None)
+
+
+@receiver(post_save, sender=Task)
+def update_rollup_on_task_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = new_deltas()
+    # Without a snapshot (an instance not loaded from the database) only the
+    # new contribution is known; rebuild_rollups evens out the difference.
+    if not created and _loaded(instance) is not None:
+        add(deltas, task_contribution(*_loaded(instance)), -1)
+    current = instance.rollup_fields()
+    add(deltas, task_contribution(*current), 1)
+    apply_deltas(deltas)
+    instance._loaded_rollup = current
+
+
+@receiver(post_delete, sender=Task)
+def update_rollup_on_task_delete(sender, instance, origin=None, **kwargs):
+    # Sub-goal and prayer deletes take their tasks off in one go, below;
+    # deleting the user deletes the rollups with it.
+    if origin is not None and not _deleted_through(origin, Task):
+        return
+    deltas = new_deltas()
+    add(deltas, task_contribution(*instance.rollup_fields()), -1)
+    apply_deltas(deltas)
+
+
+@receiver(post_save, sender=TaskOccurrence)
+def update_rollup_on_occurrence_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = new_deltas()
+    if not created and _loaded(instance) is not None:
+        add(deltas, occurrence_contribution(instance.task, *_loaded(instance)), -1)
+    current = instance.rollup_fields()
+    add(deltas, occurrence_contribution(instance.task, *current), 1)
+    apply_deltas(deltas)
+    instance._loaded_rollup = current
+
+
+@receiver(post_delete, sender=TaskOccurrence)
+def update_rollup_on_occurrence_delete(sender, instance, origin=None, **kwargs):
+    # The occurrences of a task deleted on its own still come off the
+    # rollups; larger cascades are handled below.
+    if origin is not None and not _deleted_through(origin, (Task, TaskOccurrence)):
+        return
+    deltas = new_deltas()
+    add(deltas, occurrence_contribution(instance.task, *instance.rollup_fields()), -1)
+    apply_deltas(deltas)
+
+
+@receiver(pre_delete, sender=SubGoal)
+def update_rollups_on_sub_goal_delete(sender, instance, origin=None, **kwargs):
+    # Also sent for each sub-goal of a deleted goal.
+    if origin is not None and _deleted_through(origin, get_user_model()):
+        return
+    take_away(
+        Task.objects.filter(sub_goal=instance),
+        TaskOccurrence.objects.filter(task__sub_goal=instance),
+    )
+
+
+@receiver(pre_delete, sender=Prayer)
+def update_rollups_on_prayer_delete(sender, instance, origin=None, **kwargs):
+    if origin is not None and not _deleted_through(origin, Prayer):
+        return
+    take_away(
+        Task.objects.filter(prayer=instance),
+        TaskOccurrence.objects.filter(Q(prayer=instance) | Q(task__prayer=instance)),
+    )
+
+
+@receiver(pre_save, sender=SubGoal)
+def note_sub_goal_move(sender, instance, raw=False, **kwargs):
+    # Read here: the goals app refreshes the snapshot in its post_save.
+    loaded = getattr(instance, '_loaded_goal_id', None)
+    instance._rollup_goal_moved = not raw and loaded is not None and loaded != instance.goal_id
+
+
+@receiver(post_save, sender=SubGoal)
+def move_rollups_with_sub_goal(sender, instance, created, raw=False, **kwargs):
+    # A sub-goal moved to another user's goal takes its history along. The
+    # goals app has already handed its tasks to the new owner.
+    if raw or created or not getattr(instance, '_rollup_goal_moved', False):
+        return
+    user_id = Goal.objects.filter(pk=instance.goal_id).values_list('user_id', flat=True).first()
+    move_sub_goal(instance.pk, user_id)
@@ -0,0 +1,100 @@
+# analytics/stats.py
+"""
+Streaks, heatmap and prayer totals read from DailyRollup, goal trends from
+SubGoalDailyRollup. Both hold a few rows per day, so the cost follows the
+number of days with tasks, never the number of tasks.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import DateField, Sum
+from django.db.models.functions import TruncWeek
+
+from .models import DailyRollup, SubGoalDailyRollup
+
+HEATMAP_DAYS = 365
+TREND_WEEKS = 12
+
+
+def _totals(rows, *keys):
+    return rows.values(*keys).annotate(scheduled=Sum('scheduled'), completed=Sum('completed')).order_by(*keys)
+
+
+def streaks(active_days, today):
+    """
+    ``(current, longest)`` runs of consecutive days in ``active_days``
+    (ascending, none after today). The current run may end yesterday:
+    today is not over yet.
+    """
+    current = longest = 0
+    previous = None
+    for day in active_days:
+        current = current + 1 if previous == day - timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    if previous is None or previous < today - timedelta(days=1):
+        current = 0
+    return current, longest
+
+
+def user_stats(user, today):
+    rollups = DailyRollup.objects.filter(user=user)
+    first_day = today - timedelta(days=HEATMAP_DAYS - 1)
+    first_week = today - timedelta(days=today.weekday(), weeks=TREND_WEEKS - 1)
+
+    active_days = list(
+        rollups.filter(day__lte=today, completed__gt=0).order_by('day').values_list('day', flat=True).distinct()
+    )
+    current, longest = streaks(active_days, today)
+
+    by_day = {
+        row['day']: row for row in _totals(rollups.filter(day__gte=first_day, day__lte=today), 'day')
+    }
+    heatmap = []
+    for offset in range(HEATMAP_DAYS):
+        day = first_day + timedelta(days=offset)
+        row = by_day.get(day, {})
+        heatmap.append({
+            'date': day.isoformat(),
+            'scheduled': row.get('scheduled', 0),
+            'completed': row.get('completed', 0),
+        })
+
+    prayers = [
+        {'prayer': row['prayer__name'], 'scheduled': row['scheduled'], 'completed': row['completed']}
+        for row in _totals(
+            rollups.filter(day__gte=first_day, day__lte=today, prayer__isnull=False), 'prayer__name'
+        )
+    ]
+
+    weeks = [first_week + timedelta(weeks=i) for i in range(TREND_WEEKS)]
+    trends = defaultdict(lambda: {week: [0, 0] for week in weeks})
+    sub_goal_rollups = SubGoalDailyRollup.objects.filter(user=user, day__gte=first_week, day__lte=today).annotate(
+        week=TruncWeek('day', output_field=DateField())
+    )
+    # Names come with the totals, so a goal deleted meanwhile is simply absent.
+    names = {}
+    for row in _totals(sub_goal_rollups, 'sub_goal__goal_id', 'sub_goal__goal__name', 'week'):
+        names[row['sub_goal__goal_id']] = row['sub_goal__goal__name']
+        totals = trends[row['sub_goal__goal_id']][row['week']]
+        totals[0] += row['scheduled']
+        totals[1] += row['completed']
+    goals = [
+        {
+            'goal': str(goal_id),
+            'name': names[goal_id],
+            'weeks': [
+                {'week': week.isoformat(), 'scheduled': scheduled, 'completed': completed}
+                for week, (scheduled, completed) in by_week.items()
+            ],
+        }
+        for goal_id, by_week in sorted(trends.items(), key=lambda item: names[item[0]])
+    ]
+
+    return {
+        'today': today.isoformat(),
+        'streak': {'current': current, 'longest': longest},
+        'heatmap': heatmap,
+        'prayers': prayers,
+        'goals': goals,
+    }
@@ -0,0 +1,165 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from goals.models import Goal, SubGoal
+from tasks.models import Prayer, Task, TaskOccurrence
+from . import signals
+from .models import DailyRollup, SubGoalDailyRollup
+from .rollup import find_rollup_drift
+from .stats import streaks
+
+User = get_user_model()
+
+
+class RollupTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+        self.goal = Goal.objects.create(user=self.user, name="Goal")
+        self.sub_goal = SubGoal.objects.create(goal=self.goal, name="Sub")
+        self.fajr = Prayer.objects.get(user=self.user, name="Fajr")
+        self.day = date(2025, 3, 1)
+
+    def rollup(self, day=None, prayer=None, user=None):
+        row = DailyRollup.objects.filter(user=user or self.user, day=day or self.day, prayer=prayer).first()
+        return (row.scheduled, row.completed) if row else (0, 0)
+
+    def sub_goal_rollup(self, sub_goal, day=None):
+        row = SubGoalDailyRollup.objects.filter(sub_goal=sub_goal, day=day or self.day).first()
+        return (row.scheduled, row.completed) if row else (0, 0)
+
+    def test_follows_task_writes(self):
+        task = Task.objects.create(sub_goal=self.sub_goal, name="read", date=self.day)
+        Task.objects.create(sub_goal=self.sub_goal, name="pray", date=self.day, prayer=self.fajr, status=True)
+        self.assertEqual(self.rollup(), (1, 0))
+        self.assertEqual(self.rollup(prayer=self.fajr), (1, 1))
+
+        task = Task.objects.get(pk=task.pk)
+        task.status = True
+        task.save()
+        self.assertEqual(self.rollup(), (1, 1))
+
+        task.date = self.day + timedelta(days=1)
+        task.prayer = self.fajr
+        task.save()
+        self.assertEqual(self.rollup(), (0, 0))
+        self.assertEqual(self.rollup(day=task.date, prayer=self.fajr), (1, 1))
+
+        task.delete()
+        self.assertEqual(self.rollup(day=task.date, prayer=self.fajr), (0, 0))
+        self.assertEqual(find_rollup_drift(), [])
+
+    def test_counts_completed_occurrences(self):
+        task = Task.objects.create(sub_goal=self.sub_goal, name="daily", date=self.day, recurrence="daily")
+        self.assertEqual(self.rollup(), (0, 0))
+        url = f"/api/tasks/{task.pk}/occurrences/"
+        self.client.post(url, {"date": "2025-03-02", "status": True}, format="json")
+        self.client.post(url, {"date": "2025-03-03", "skipped": True}, format="json")
+        self.assertEqual(self.rollup(day=date(2025, 3, 2)), (1, 1))
+        self.assertEqual(self.rollup(day=date(2025, 3, 3)), (0, 0))
+
+        self.client.post(url, {"date": "2025-03-03", "status": True}, format="json")
+        self.client.post(url, {"date": "2025-03-02"}, format="json")
+        self.assertEqual(self.rollup(day=date(2025, 3, 2)), (0, 0))
+        self.assertEqual(self.rollup(day=date(2025, 3, 3)), (1, 1))
+
+        Task.objects.get(pk=task.pk).delete()
+        self.assertFalse(TaskOccurrence.objects.exists())
+        self.assertEqual(self.rollup(day=date(2025, 3, 3)), (0, 0))
+
+    def test_follows_bulk_updates_and_moves(self):
+        tasks = [Task.objects.create(sub_goal=self.sub_goal, name=f"t{i}", date=self.day) for i in range(3)]
+        other = SubGoal.objects.create(goal=self.goal, name="Other")
+        self.client.post("/api/tasks/bulk/", {"changes": [
+            {"id": str(tasks[0].pk), "status": True},
+            {"id": str(tasks[1].pk), "sub_goal": str(other.pk), "date": "2025-03-05"},
+        ]}, format="json")
+        self.assertEqual(self.rollup(), (2, 1))
+        self.assertEqual(self.sub_goal_rollup(self.sub_goal), (2, 1))
+        self.assertEqual(self.sub_goal_rollup(other, day=date(2025, 3, 5)), (1, 0))
+
+        bilal = User.objects.create_user(username="bilal", password="pass")
+        other.goal = Goal.objects.create(user=bilal, name="Theirs")
+        other.save()
+        self.assertEqual(self.rollup(day=date(2025, 3, 5)), (0, 0))
+        self.assertEqual(self.rollup(day=date(2025, 3, 5), user=bilal), (1, 0))
+        self.assertEqual(SubGoalDailyRollup.objects.get(sub_goal=other).user, bilal)
+        self.assertEqual(find_rollup_drift(), [])
+
+    def test_sub_goal_edits_leave_rollups_alone(self):
+        with mock.patch.object(signals, "move_sub_goal") as move:
+            self.sub_goal.name = "Renamed"
+            self.sub_goal.save()
+            SubGoal.objects.get(pk=self.sub_goal.pk).save()
+            move.assert_not_called()
+            self.sub_goal.goal = Goal.objects.create(user=self.user, name="Another")
+            self.sub_goal.save()
+        move.assert_called_once_with(self.sub_goal.pk, self.user.pk)
+
+    def test_follows_cascading_deletes(self):
+        other = SubGoal.objects.create(goal=self.goal, name="Other")
+        Task.objects.create(sub_goal=self.sub_goal, name="read", date=self.day, status=True)
+        Task.objects.create(sub_goal=other, name="pray", date=self.day, prayer=self.fajr)
+        daily = Task.objects.create(sub_goal=other, name="daily", date=self.day, recurrence="daily")
+        TaskOccurrence.objects.create(task=daily, date=self.day, prayer=self.fajr, status=True)
+
+        self.fajr.delete()
+        self.assertEqual(self.rollup(), (1, 1))
+        self.assertEqual(self.sub_goal_rollup(other), (0, 0))
+        self.assertEqual(find_rollup_drift(), [])
+
+        self.goal.delete()
+        self.assertEqual(self.rollup(), (0, 0))
+        self.assertEqual(find_rollup_drift(), [])
+
+    def test_rebuild_command(self):
+        Task.objects.create(sub_goal=self.sub_goal, name="read", date=self.day)
+        call_command("rebuild_rollups", "--check", stdout=StringIO())
+        DailyRollup.objects.update(completed=5)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_rollups", "--check", stdout=StringIO())
+        call_command("rebuild_rollups", stdout=StringIO())
+        self.assertEqual(self.rollup(), (1, 0))
+
+
+class AnalyticsViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+        self.goal = Goal.objects.create(user=self.user, name="Quran")
+        self.sub_goal = SubGoal.objects.create(goal=self.goal, name="Juz Amma")
+        self.today = timezone.localdate()
+        fajr = Prayer.objects.get(user=self.user, name="Fajr")
+        # Done on each of the last three days and five days before that.
+        for days_ago in (0, 1, 2, 7, 8, 9, 10, 11):
+            Task.objects.create(
+                sub_goal=self.sub_goal, name="read", date=self.today - timedelta(days=days_ago),
+                status=True, prayer=fajr,
+            )
+        Task.objects.create(sub_goal=self.sub_goal, name="review", date=self.today)
+
+    def test_stats(self):
+        with self.assertNumQueries(4):
+            data = self.client.get("/api/analytics/").data
+        self.assertEqual(data["streak"], {"current": 3, "longest": 5})
+        self.assertEqual(len(data["heatmap"]), 365)
+        self.assertEqual(data["heatmap"][-1], {"date": self.today.isoformat(), "scheduled": 2, "completed": 1})
+        self.assertEqual(data["prayers"], [{"prayer": "Fajr", "scheduled": 8, "completed": 8}])
+        [goal] = data["goals"]
+        self.assertEqual(goal["name"], "Quran")
+        self.assertEqual(len(goal["weeks"]), 12)
+        self.assertEqual(sum(week["completed"] for week in goal["weeks"]), 8)
+
+    def test_streaks(self):
+        today = date(2025, 3, 10)
+        days = [date(2025, 3, d) for d in (1, 2, 3, 4, 7, 8, 9)]
+        self.assertEqual(streaks(days, today), (3, 4))
+        self.assertEqual(streaks(days + [today], today), (4, 4))
+        self.assertEqual(streaks(days[:4], today), (0, 4))
+        self.assertEqual(streaks([], today), (0, 0))
@@ -0,0 +1,19 @@
+from django.utils import timezone
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .stats import user_stats
+
+
+class AnalyticsView(APIView):
+    """
+    The user's current and longest streaks of days with a completed task,
+    a ``heatmap`` of tasks scheduled and completed on each of the last 365
+    days, the same totals per prayer, and weekly totals per goal over the
+    last 12 weeks (``goals``).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        return Response(user_stats(request.user, timezone.localdate()))
@@ -0,0 +1,83 @@
+# goals/cache.py
+"""
+Per-user response cache for the goal list.
+
+Every cached page is keyed on the user's current *generation*. Any write to
+one of their goals, sub-goals or tasks increments that number (a single
+INCR), which makes all of their cached pages unreachable at once; they then
+expire on their own. The bump runs on transaction commit, so a response
+built from uncommitted or pre-commit data can never be stored under the new
+generation.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+GOAL_LIST_CACHE_TIMEOUT = getattr(settings, 'GOAL_LIST_CACHE_TIMEOUT', 60 * 5)
+
+HITS_KEY = 'goals:list:hits'
+MISSES_KEY = 'goals:list:misses'
+
+
+def _generation_key(user_id):
+    return f'goals:gen:{user_id}'
+
+
+def get_generation(user_id):
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Seed from the clock rather than 1: if the key was evicted, the new
+        # generation must not collide with one that still has pages cached.
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bump(user_id):
+    try:
+        cache.incr(_generation_key(user_id))
+    except ValueError:
+        cache.add(_generation_key(user_id), time.time_ns(), timeout=None)
+
+
+def invalidate_user(user_id):
+    if user_id is not None:
+        transaction.on_commit(lambda: _bump(user_id))
+
+
+def goal_list_key(request):
+    params = sorted(request.query_params.lists())
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()
+    generation = get_generation(request.user.pk)
+    return f'goals:list:{request.user.pk}:{generation}:{digest}'
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def record_hit():
+    _count(HITS_KEY)
+
+
+def record_miss():
+    _count(MISSES_KEY)
+
+
+def cache_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0,
+    }
@@ -0,0 +1,93 @@
+# goals/fastpath.py
+"""
+Fast read path for the goal and sub-goal lists; see tasks/fastpath.py.
+
+One ``values()`` query per level of the tree, children grouped by parent id
+in a single pass, output identical to GoalSerializer / SubGoalSerializer.
+"""
+from tasks.fastpath import PRAYER_FORMAT, RowFormat, tasks_by_sub_goal
+from tasks.models import Prayer, Task
+from .models import Goal, SubGoal, progress_percent
+from .serializers import GoalSerializer, SubGoalSerializer
+
+GOAL_FORMAT = RowFormat(GoalSerializer)
+SUB_GOAL_FORMAT = RowFormat(SubGoalSerializer)
+
+
+def _expanded(expand, path):
+    return expand is None or path in expand
+
+
+def render_sub_goals(rows, expand=None, only=None, tasks=None):
+    """
+    Render sub-goal rows (dicts from ``values(*SUB_GOAL_FORMAT.columns)``),
+    with their tasks unless ``expand`` leaves ``tasks`` out. ``tasks`` is an
+    optional ``tasks_by_sub_goal()`` result already covering these rows.
+    """
+    rows = list(rows)
+    if tasks is None:
+        tasks = {}
+        if rows and _expanded(expand, 'tasks'):
+            tasks = tasks_by_sub_goal(Task.objects.filter(sub_goal_id__in=[row['id'] for row in rows]))
+
+    rendered = []
+    for row in rows:
+        extra = {'progress': progress_percent(row['finished_tasks'], row['total_tasks'])}
+        if _expanded(expand, 'tasks'):
+            extra['tasks'] = tasks.get(row['id'], [])
+        rendered.append(SUB_GOAL_FORMAT.render(row, extra, only))
+    return rendered
+
+
+def render_goals(rows, expand=None, only=None, sub_goal_rows=None, tasks=None):
+    """
+    Render goal rows (dicts from ``values(*GOAL_FORMAT.columns)``) with the
+    same ``fields`` / ``expand`` semantics as ExpandableFieldsMixin.
+    ``sub_goal_rows`` and ``tasks`` may be passed in when the caller already
+    fetched every child of these goals.
+    """
+    rows = list(rows)
+    sub_goals = {}
+    if rows and _expanded(expand, 'sub_goals'):
+        nested = None
+        if expand is not None:
+            nested = {path.split('.', 1)[1] for path in expand if path.startswith('sub_goals.')}
+        if sub_goal_rows is None:
+            sub_goal_rows = SubGoal.objects.filter(
+                goal_id__in=[row['id'] for row in rows]
+            ).values(*SUB_GOAL_FORMAT.columns)
+        for sub_goal in render_sub_goals(sub_goal_rows, nested, tasks=tasks):
+            sub_goals.setdefault(sub_goal['goal'], []).append(sub_goal)
+
+    rendered = []
+    for row in rows:
+        extra = {'progress': progress_percent(row['finished_tasks'], row['total_tasks'])}
+        if _expanded(expand, 'sub_goals'):
+            extra['sub_goals'] = sub_goals.get(row['id'], [])
+        rendered.append(GOAL_FORMAT.render(row, extra, only))
+    return rendered
+
+
+def render_snapshot(user, goal_id=None):
+    """
+    The user's whole goal -> sub-goal -> task tree plus their prayers, from
+    one flat query per table (no IN lists, no prefetch objects), stitched
+    together in memory by id. ``goal_id`` narrows the tree to one goal.
+    """
+    goals = Goal.objects.filter(user=user).order_by('-created_at')
+    sub_goals = SubGoal.objects.filter(goal__user=user).order_by('created_at')
+    tasks = Task.objects.filter(user=user).order_by('date', 'id')
+    if goal_id is not None:
+        goals = goals.filter(pk=goal_id)
+        sub_goals = sub_goals.filter(goal_id=goal_id)
+        tasks = tasks.filter(sub_goal__goal_id=goal_id)
+
+    prayers = Prayer.objects.filter(user=user).order_by('time')
+    return {
+        'goals': render_goals(
+            goals.values(*GOAL_FORMAT.columns),
+            sub_goal_rows=sub_goals.values(*SUB_GOAL_FORMAT.columns),
+            tasks=tasks_by_sub_goal(tasks),
+        ),
+        'prayers': PRAYER_FORMAT.render_all(prayers.values(*PRAYER_FORMAT.columns)),
+    }
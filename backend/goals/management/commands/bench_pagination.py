@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from goals.models import Goal
+from goals.views import GoalListCreateView
+from thimar_project.benchmarking import bench_user, rolled_back, summarize, timed
+
+
+class Command(BaseCommand):
+    help = "Compare page-number and keyset pagination latency on the goal list."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, page_size = options['rows'], options['page_size']
+        with rolled_back():
+            user = bench_user()
+            Goal.objects.bulk_create(
+                (Goal(user=user, name=f"goal {i}") for i in range(rows)),
+                batch_size=5000,
+            )
+            self.stdout.write(f"Seeded {rows} goals, page size {page_size}")
+
+            view = GoalListCreateView.as_view()
+            factory = APIRequestFactory()
+            paginator = GoalListCreateView.pagination_class().get_keyset_paginator()
+            ordered = Goal.objects.filter(user=user).order_by(*paginator.ordering)
+
+            last_page = max(1, -(-rows // page_size))
+            sampled = {1, 10, last_page // 10, last_page // 2, last_page}
+            for page in sorted(page for page in sampled if 1 <= page <= last_page):
+                offset = (page - 1) * page_size
+                params = {'page': page, 'page_size': page_size}
+                page_number = timed(lambda: self.get(view, factory, user, params), options['repeat'])
+
+                params = {'cursor': '', 'page_size': page_size}
+                if offset:
+                    # The cursor a client would hold after reading the previous page.
+                    previous = ordered[offset - 1]
+                    params['cursor'] = paginator.encode_position(paginator.get_position(previous))
+                keyset = timed(lambda: self.get(view, factory, user, params), options['repeat'])
+
+                self.stdout.write(
+                    f"page {page:>6}  page-number: {summarize(page_number)}   keyset: {summarize(keyset)}"
+                )
+
+    def get(self, view, factory, user, params):
+        request = factory.get('/api/goals/', params)
+        force_authenticate(request, user=user)
+        response = view(request)
+        assert response.status_code == 200, response.data
+        return response
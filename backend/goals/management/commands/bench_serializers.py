@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from goals.fastpath import GOAL_FORMAT, render_goals
+from goals.models import Goal, SubGoal
+from goals.serializers import GoalSerializer
+from tasks.models import Task
+from thimar_project.benchmarking import bench_user, rolled_back, summarize, timed
+
+
+class Command(BaseCommand):
+    help = "Compare GoalSerializer with the values() fast path on a large account."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--goals', type=int, default=50)
+        parser.add_argument('--sub-goals', type=int, default=10)
+        parser.add_argument('--tasks', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            user = bench_user()
+            goals = Goal.objects.bulk_create(
+                Goal(user=user, name=f"goal {i}") for i in range(options['goals'])
+            )
+            sub_goals = SubGoal.objects.bulk_create(
+                SubGoal(goal=goal, name=f"sub-goal {j}")
+                for goal in goals for j in range(options['sub_goals'])
+            )
+            start = date(2025, 1, 1)
+            Task.objects.bulk_create(
+                (
+                    Task(
+                        sub_goal=sub_goals[i % len(sub_goals)],
+                        user=user,
+                        name=f"task {i}",
+                        description="Read ten pages",
+                        date=start + timedelta(days=i % 365),
+                        status=i % 3 == 0,
+                    )
+                    for i in range(options['tasks'])
+                ),
+                batch_size=5000,
+            )
+            self.stdout.write(
+                f"Seeded {len(goals)} goals, {len(sub_goals)} sub-goals, {options['tasks']} tasks"
+            )
+
+            queryset = Goal.objects.filter(user=user).order_by('-created_at')
+
+            def serializer_path():
+                prefetched = queryset.prefetch_related(
+                    Prefetch('sub_goals', queryset=SubGoal.objects.prefetch_related('tasks'))
+                )
+                return GoalSerializer(prefetched, many=True).data
+
+            def fast_path():
+                return render_goals(queryset.values(*GOAL_FORMAT.columns))
+
+            render = JSONRenderer().render
+            if render(serializer_path()) != render(fast_path()):
+                raise CommandError("Fast path output differs from GoalSerializer.")
+
+            self.stdout.write(f"serializer: {summarize(timed(serializer_path, options['repeat']))}")
+            self.stdout.write(f"fast path:  {summarize(timed(fast_path, options['repeat']))}")
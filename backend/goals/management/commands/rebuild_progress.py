@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from goals.progress import find_counter_drift, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized task counters on goals and sub-goals."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only report counters that disagree with the tasks table.",
+        )
+
+    def handle(self, *args, **options):
+        drift = find_counter_drift()
+        for model, pks in drift.items():
+            label = model._meta.verbose_name_plural
+            self.stdout.write(f"{len(pks)} {label} with stale counters")
+            for pk in pks[:20]:
+                self.stdout.write(f"  {pk}")
+
+        stale = sum(len(pks) for pks in drift.values())
+        if options['check']:
+            if stale:
+                raise CommandError(f"{stale} rows have stale progress counters.")
+            return
+
+        rebuild_counters()
+        remaining = sum(len(pks) for pks in find_counter_drift().values())
+        if remaining:
+            raise CommandError(f"{remaining} rows still disagree after the rebuild.")
+        self.stdout.write(self.style.SUCCESS("Progress counters rebuilt."))
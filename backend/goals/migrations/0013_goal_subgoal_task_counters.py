@@ -0,0 +1,62 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:43
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Goal = apps.get_model('goals', 'Goal')
+    SubGoal = apps.get_model('goals', 'SubGoal')
+    Task = apps.get_model('tasks', 'Task')
+
+    def task_count(path, **filters):
+        tasks = (
+            Task.objects.filter(**{path: OuterRef('pk')}, **filters)
+            .order_by()
+            .values(path)
+            .annotate(n=Count('pk'))
+            .values('n')
+        )
+        return Coalesce(Subquery(tasks, output_field=IntegerField()), Value(0))
+
+    SubGoal.objects.update(
+        total_tasks=task_count('sub_goal'),
+        finished_tasks=task_count('sub_goal', status=True),
+    )
+    Goal.objects.update(
+        total_tasks=task_count('sub_goal__goal'),
+        finished_tasks=task_count('sub_goal__goal', status=True),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0012_alter_goal_image_path_alter_goal_image_url'),
+        ('tasks', '0002_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='finished_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='goal',
+            name='total_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subgoal',
+            name='finished_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subgoal',
+            name='total_tasks',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0013_goal_subgoal_task_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='goal_user_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subgoal',
+            index=models.Index(fields=['created_at', 'id'], name='subgoal_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0014_goal_goal_user_created_id_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0015_goal_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subgoal',
+            index=models.Index(fields=['goal', 'created_at', 'id'], name='subgoal_goal_created_id_idx'),
+        ),
+    ]
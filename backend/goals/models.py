@@ -2,7 +2,43 @@ import uuid
 from django.db import models
 from django.conf import settings
 
-class Goal(models.Model):
+
+def progress_percent(finished_tasks, total_tasks):
+    if not total_tasks:
+        return 0
+    return (finished_tasks / total_tasks) * 100
+
+
+class ProgressCounters(models.Model):
+    """
+    Denormalized task counters. They are kept up to date by the signal
+    handlers in ``goals.signals`` using F() updates, so a plain ``save()``
+    must never write them (or any other ``COUNTER_FIELDS``) back from a
+    possibly stale instance.
+    """
+    total_tasks = models.PositiveIntegerField(default=0, editable=False)
+    finished_tasks = models.PositiveIntegerField(default=0, editable=False)
+
+    COUNTER_FIELDS = ('total_tasks', 'finished_tasks')
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            skipped = self.get_deferred_fields().union(self.COUNTER_FIELDS)
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped and field.name not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def progress(self):
+        return progress_percent(self.finished_tasks, self.total_tasks)
+
+
+class Goal(ProgressCounters):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -18,27 +54,44 @@ class Goal(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped on every write to the goal, its sub-goals or their tasks; the
+    # detail endpoints derive their ETag from it.
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    COUNTER_FIELDS = ProgressCounters.COUNTER_FIELDS + ('version',)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's goals on (created_at, id).
+            models.Index(fields=['user', 'created_at', 'id'], name='goal_user_created_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
-    
-    @property
-    def progress(self):
-        total_tasks = sum(subgoal.tasks.count() for subgoal in self.sub_goals.all())
-        if total_tasks == 0:
-            return 0
-        finished_tasks = sum(subgoal.tasks.filter(status=True).count() for subgoal in self.sub_goals.all())
-        return (finished_tasks / total_tasks) * 100
 
 
 # moels.py/ SubGoal
 
-class SubGoal(models.Model):
+class SubGoal(ProgressCounters):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
     goal = models.ForeignKey(Goal, on_delete=models.CASCADE, related_name="sub_goals")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='subgoal_created_id_idx'),
+            # A goal's sub-goals in creation order.
+            models.Index(fields=['goal', 'created_at', 'id'], name='subgoal_goal_created_id_idx'),
+        ]
+
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the parent goal so a move can shift the counters across.
+        instance._loaded_goal_id = instance.__dict__.get('goal_id')
+        return instance
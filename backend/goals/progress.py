@@ -0,0 +1,92 @@
+# goals/progress.py
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tasks.models import Task
+from .models import Goal, SubGoal
+
+
+def bump_goal_version(goal_id):
+    Goal.objects.filter(pk=goal_id).update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def apply_task_delta(sub_goal_id, total=0, finished=0):
+    """
+    Shift the counters of a sub-goal and its goal by the given amounts and
+    bump the goal's version, even when both amounts are zero. ``updated_at``
+    moves with them so delta sync picks up the new progress.
+
+    Both rows are updated with F() expressions, so concurrent writers add up
+    instead of overwriting each other.
+    """
+    changes = {}
+    if total:
+        changes['total_tasks'] = F('total_tasks') + total
+    if finished:
+        changes['finished_tasks'] = F('finished_tasks') + finished
+
+    now = timezone.now()
+    with transaction.atomic():
+        if changes:
+            SubGoal.objects.filter(pk=sub_goal_id).update(updated_at=now, **changes)
+        Goal.objects.filter(sub_goals=sub_goal_id).update(version=F('version') + 1, updated_at=now, **changes)
+
+
+def shift_sub_goal_counters(sub_goal_id, goal_id, sign):
+    """Add (sign=1) or remove (sign=-1) a sub-goal's counters on a goal."""
+    counters = SubGoal.objects.filter(pk=sub_goal_id)
+    total = Subquery(counters.values('total_tasks')[:1])
+    finished = Subquery(counters.values('finished_tasks')[:1])
+    Goal.objects.filter(pk=goal_id).update(
+        total_tasks=F('total_tasks') + sign * total,
+        finished_tasks=F('finished_tasks') + sign * finished,
+        version=F('version') + 1,
+        updated_at=timezone.now(),
+    )
+
+
+def _task_count(path, **filters):
+    """Correlated subquery counting the tasks below the outer row."""
+    tasks = (
+        Task.objects.filter(**{path: OuterRef('pk')}, **filters)
+        .order_by()
+        .values(path)
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    return Coalesce(Subquery(tasks, output_field=IntegerField()), Value(0))
+
+
+def _actual_counts(model):
+    path = 'sub_goal' if model is SubGoal else 'sub_goal__goal'
+    return {
+        'total_tasks': _task_count(path),
+        'finished_tasks': _task_count(path, status=True),
+    }
+
+
+def find_counter_drift():
+    """
+    Return ``{model: [pk, ...]}`` for every goal and sub-goal whose stored
+    counters disagree with the tasks table.
+    """
+    drift = {}
+    for model in (SubGoal, Goal):
+        actual = _actual_counts(model)
+        rows = model.objects.annotate(
+            actual_total=actual['total_tasks'],
+            actual_finished=actual['finished_tasks'],
+        ).filter(
+            ~Q(total_tasks=F('actual_total')) | ~Q(finished_tasks=F('actual_finished'))
+        )
+        drift[model] = list(rows.values_list('pk', flat=True))
+    return drift
+
+
+def rebuild_counters():
+    """Recompute every counter from the tasks table, one UPDATE per model."""
+    with transaction.atomic():
+        for model in (SubGoal, Goal):
+            model.objects.update(**_actual_counts(model))
@@ -5,18 +5,61 @@ from .models import Goal
 from .models import SubGoal
 from .utils.supabase_storage import upload_image, delete_image
 
+class ExpandableFieldsMixin:
+    """
+    Adds two optional keyword arguments:
+
+    * ``fields``: names of the fields to keep, everything else is dropped.
+    * ``expand``: nested relations to embed, dotted for deeper levels
+      (``{'sub_goals', 'sub_goals.tasks'}``). Relations listed in
+      ``expandable_fields`` but not in ``expand`` are left out.
+
+    Leaving both out keeps the full nested representation.
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self._only_fields = fields
+        self._expand = expand
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self._expand is not None:
+            for name, serializer_class in self.expandable_fields.items():
+                if name not in self._expand:
+                    fields.pop(name, None)
+                    continue
+                nested = {
+                    path.split('.', 1)[1] for path in self._expand
+                    if path.startswith(name + '.')
+                }
+                kwargs = {'many': True, 'read_only': True}
+                if issubclass(serializer_class, ExpandableFieldsMixin):
+                    kwargs['expand'] = nested
+                fields[name] = serializer_class(**kwargs)
+        if self._only_fields is not None:
+            for name in list(fields):
+                if name not in self._only_fields:
+                    del fields[name]
+        return fields
+
+
 #sub-goals/serializers.py
 
-class SubGoalSerializer(serializers.ModelSerializer):
+class SubGoalSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     tasks = TaskSerializer(many=True, read_only=True)  # Nest tasks here
+    progress = serializers.ReadOnlyField()
 
     class Meta:
         model = SubGoal
         fields = '__all__'
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'progress', 'created_at', 'updated_at')
 
+    expandable_fields = {'tasks': TaskSerializer}
 
-class GoalSerializer(serializers.ModelSerializer):
+
+class GoalSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     progress = serializers.ReadOnlyField()
     # image = serializers.SerializerMethodField()
     image = serializers.ImageField(required=False, write_only=True)  # For handling file uploads
@@ -28,6 +71,8 @@ class GoalSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('id','user','progress', 'created_at', 'updated_at','image_url', 'image_path')
 
+    expandable_fields = {'sub_goals': SubGoalSerializer}
+
     def create(self, validated_data):
         image_file = validated_data.pop('image', None)
         # Remove this line that's causing the error:
@@ -0,0 +1,122 @@
+from django.db import models, transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from tasks.models import Prayer, Task
+from .cache import invalidate_user
+from .models import Goal, SubGoal
+from .progress import apply_task_delta, bump_goal_version, shift_sub_goal_counters
+
+
+def _deleted_through(origin, model):
+    """True when ``delete()`` was called on ``model`` itself, not a parent."""
+    origin_model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    return issubclass(origin_model, model)
+
+
+@receiver(post_save, sender=Task)
+def update_progress_on_task_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    status = int(bool(instance.status))
+    if created:
+        apply_task_delta(instance.sub_goal_id, total=1, finished=status)
+    else:
+        old_sub_goal_id = getattr(instance, '_loaded_sub_goal_id', None)
+        old_status = getattr(instance, '_loaded_status', None)
+        if old_sub_goal_id is None or old_status is None:
+            # Saved from an instance that was not loaded from the database;
+            # rebuild_progress will pick up any counter difference.
+            apply_task_delta(instance.sub_goal_id)
+        elif old_sub_goal_id != instance.sub_goal_id:
+            apply_task_delta(old_sub_goal_id, total=-1, finished=-int(old_status))
+            apply_task_delta(instance.sub_goal_id, total=1, finished=status)
+        else:
+            apply_task_delta(instance.sub_goal_id, finished=status - int(bool(old_status)))
+
+    instance._loaded_sub_goal_id = instance.sub_goal_id
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Task)
+def update_progress_on_task_delete(sender, instance, origin=None, **kwargs):
+    # Tasks removed by a sub-goal, goal or prayer cascade are accounted for
+    # once by the handlers below (or not at all when the goal itself goes).
+    if origin is not None and not _deleted_through(origin, Task):
+        return
+    apply_task_delta(instance.sub_goal_id, total=-1, finished=-int(bool(instance.status)))
+
+
+@receiver(pre_delete, sender=SubGoal)
+def update_progress_on_sub_goal_delete(sender, instance, origin=None, **kwargs):
+    if origin is None or not _deleted_through(origin, SubGoal):
+        return
+    shift_sub_goal_counters(instance.pk, instance.goal_id, -1)
+
+
+@receiver(pre_delete, sender=Prayer)
+def update_progress_on_prayer_delete(sender, instance, origin=None, **kwargs):
+    # The prayer's tasks go with it: one delta per sub-goal they were in.
+    # Deleting the user deletes the goals too.
+    if origin is not None and not _deleted_through(origin, Prayer):
+        return
+    counts = (
+        Task.objects.filter(prayer=instance).order_by().values('sub_goal_id')
+        .annotate(total=Count('pk'), finished=Count('pk', filter=Q(status=True)))
+    )
+    for row in counts:
+        apply_task_delta(row['sub_goal_id'], total=-row['total'], finished=-row['finished'])
+
+
+@receiver(post_save, sender=SubGoal)
+def update_progress_on_sub_goal_save(sender, instance, created, raw=False, **kwargs):
+    old_goal_id = getattr(instance, '_loaded_goal_id', None)
+    if raw:
+        pass
+    elif not created and old_goal_id and old_goal_id != instance.goal_id:
+        with transaction.atomic():
+            shift_sub_goal_counters(instance.pk, old_goal_id, -1)
+            shift_sub_goal_counters(instance.pk, instance.goal_id, 1)
+            # The tasks follow the sub-goal to the new goal's owner, and
+            # show up in their next delta sync.
+            owner = models.Subquery(Goal.objects.filter(pk=instance.goal_id).values('user_id'))
+            Task.objects.filter(sub_goal=instance).exclude(user_id=owner).update(
+                user_id=owner, updated_at=timezone.now()
+            )
+    else:
+        bump_goal_version(instance.goal_id)
+    instance._loaded_goal_id = instance.goal_id
+
+
+@receiver(post_save, sender=Goal)
+def bump_version_on_goal_save(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        bump_goal_version(instance.pk)
+
+
+def _owner_id(instance):
+    if isinstance(instance, (Goal, Prayer, Task)):
+        return instance.user_id
+    return Goal.objects.filter(pk=instance.goal_id).values_list('user_id', flat=True).first()
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_save, sender=SubGoal)
+@receiver(post_save, sender=Task)
+def invalidate_goal_list_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_user(_owner_id(instance))
+
+
+@receiver(post_delete, sender=Goal)
+@receiver(post_delete, sender=SubGoal)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Prayer)
+def invalidate_goal_list_on_delete(sender, instance, origin=None, **kwargs):
+    # A cascade invalidates once, from the object delete() was called on;
+    # a prayer takes its tasks out of the goal tree.
+    if origin is not None and not _deleted_through(origin, sender):
+        return
+    invalidate_user(_owner_id(instance))
@@ -1,3 +1,456 @@
-from django.test import TestCase
+from datetime import date
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from tasks.models import Prayer, Task
+from .models import Goal, SubGoal
+
+User = get_user_model()
+
+
+def make_goal(user, name="Goal", sub_goals=2, tasks_per_sub_goal=3, finished=1):
+    goal = Goal.objects.create(user=user, name=name)
+    for i in range(sub_goals):
+        sub_goal = SubGoal.objects.create(goal=goal, name=f"{name} sub {i}")
+        for j in range(tasks_per_sub_goal):
+            Task.objects.create(
+                sub_goal=sub_goal,
+                name=f"task {j}",
+                date=date(2025, 1, 1),
+                status=j < finished,
+            )
+    return goal
+
+
+class GoalAPITestCase(APITestCase):
+    def setUp(self):
+        # The goal list cache lives in process memory across tests.
+        cache.clear()
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+
+
+class GoalProgressTests(GoalAPITestCase):
+    def test_progress_matches_task_status(self):
+        goal = make_goal(self.user, sub_goals=2, tasks_per_sub_goal=4, finished=1)
+        goal.refresh_from_db()
+        self.assertEqual(goal.total_tasks, 8)
+        self.assertEqual(goal.finished_tasks, 2)
+        self.assertEqual(goal.progress, 25)
+
+    def test_sub_goal_progress(self):
+        goal = make_goal(self.user, sub_goals=1, tasks_per_sub_goal=2, finished=1)
+        self.assertEqual(SubGoal.objects.get(goal=goal).progress, 50)
+
+    def test_empty_goal_has_zero_progress(self):
+        goal = Goal.objects.create(user=self.user, name="Empty")
+        self.assertEqual(goal.progress, 0)
+
+    def test_list_endpoint_query_count_is_constant(self):
+        make_goal(self.user, name="first")
+        with CaptureQueriesContext(connection) as one_goal:
+            response = self.client.get("/api/goals/", {"page_size": 100})
+        self.assertEqual(response.status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(9):
+                make_goal(self.user, name=f"goal {i}", sub_goals=5)
+        with CaptureQueriesContext(connection) as many_goals:
+            response = self.client.get("/api/goals/", {"page_size": 100})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 10)
+        self.assertEqual(len(one_goal), len(many_goals))
+        for goal in response.data["results"]:
+            self.assertAlmostEqual(goal["progress"], 100 / 3)
+            for sub_goal in goal["sub_goals"]:
+                self.assertAlmostEqual(sub_goal["progress"], 100 / 3)
+
+
+class ProgressCounterTests(GoalAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.goal = make_goal(self.user, sub_goals=2, tasks_per_sub_goal=2, finished=0)
+        self.first, self.second = SubGoal.objects.filter(goal=self.goal).order_by('name')
+
+    def assertCounters(self, obj, total, finished):
+        obj.refresh_from_db()
+        self.assertEqual((obj.total_tasks, obj.finished_tasks), (total, finished))
+
+    def test_status_flip_through_api(self):
+        task = self.first.tasks.first()
+        response = self.client.patch(f"/api/tasks/{task.pk}/", {"status": True})
+        self.assertEqual(response.status_code, 200)
+        self.assertCounters(self.first, 2, 1)
+        self.assertCounters(self.goal, 4, 1)
+
+        self.client.patch(f"/api/tasks/{task.pk}/", {"status": True})
+        self.assertCounters(self.goal, 4, 1)
+
+        self.client.patch(f"/api/tasks/{task.pk}/", {"status": False})
+        self.assertCounters(self.goal, 4, 0)
+
+    def test_create_and_delete_through_api(self):
+        response = self.client.post("/api/tasks/", {
+            "name": "new", "date": "2025-01-02", "sub_goal": self.first.pk, "status": True,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertCounters(self.first, 3, 1)
+        self.assertCounters(self.goal, 5, 1)
+
+        self.client.delete(f"/api/tasks/{response.data['id']}/")
+        self.assertCounters(self.first, 2, 0)
+        self.assertCounters(self.goal, 4, 0)
+
+    def test_move_between_sub_goals(self):
+        task = self.first.tasks.first()
+        task.status = True
+        task.save()
+        response = self.client.patch(f"/api/tasks/{task.pk}/", {"sub_goal": self.second.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertCounters(self.first, 1, 0)
+        self.assertCounters(self.second, 3, 1)
+        self.assertCounters(self.goal, 4, 1)
+
+    def test_move_sub_goal_to_another_goal(self):
+        other = Goal.objects.create(user=self.user, name="Other")
+        self.first.goal = other
+        self.first.save()
+        self.assertCounters(other, 2, 0)
+        self.assertCounters(self.goal, 2, 0)
+
+    def test_sub_goal_delete_updates_goal(self):
+        self.first.delete()
+        self.assertCounters(self.goal, 2, 0)
+        self.goal.delete()
+        self.assertFalse(Goal.objects.exists())
+
+    def test_prayer_delete_updates_counters(self):
+        fajr = Prayer.objects.get(user=self.user, name="Fajr")
+        for task in Task.objects.filter(sub_goal__goal=self.goal):
+            task.prayer = fajr
+            task.status = task.sub_goal_id == self.first.pk
+            task.save()
+        self.assertCounters(self.goal, 4, 2)
+
+        response = self.client.delete(f"/api/prayers/{fajr.pk}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Task.objects.exists())
+        self.assertCounters(self.first, 0, 0)
+        self.assertCounters(self.goal, 0, 0)
+        call_command("rebuild_progress", "--check", stdout=StringIO())
+
+    def test_goal_save_does_not_overwrite_counters(self):
+        stale = Goal.objects.get(pk=self.goal.pk)
+        Task.objects.create(sub_goal=self.first, name="late", date=date(2025, 1, 3))
+        stale.name = "Renamed"
+        stale.save()
+        self.assertCounters(self.goal, 5, 0)
+
+    def test_rebuild_progress_command(self):
+        call_command("rebuild_progress", "--check", stdout=StringIO())
+        Goal.objects.filter(pk=self.goal.pk).update(total_tasks=99)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_progress", "--check", stdout=StringIO())
+        call_command("rebuild_progress", stdout=StringIO())
+        self.assertCounters(self.goal, 4, 0)
+
+
+class GoalSummaryTests(GoalAPITestCase):
+    def test_summary_has_no_nested_tree(self):
+        goal = make_goal(self.user, sub_goals=2, tasks_per_sub_goal=2, finished=1)
+        make_goal(User.objects.create_user(username="other"), name="Not mine")
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/goals/summary/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{
+            "id": goal.pk,
+            "name": "Goal",
+            "image_url": goal.image_url,
+            "total_tasks": 4,
+            "finished_tasks": 2,
+            "progress": 50,
+        }])
+
+
+class KeysetPaginationTests(GoalAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.goals = [Goal.objects.create(user=self.user, name=f"goal {i}") for i in range(7)]
+
+    def walk(self, url, params):
+        seen, response = [], self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            seen.extend(item["id"] for item in response.data["results"])
+            if response.data["next"] is None:
+                return seen
+            response = self.client.get(response.data["next"])
+
+    def test_goal_list_cursor_walks_every_goal_once(self):
+        seen = self.walk("/api/goals/", {"cursor": "", "page_size": 3})
+        expected = Goal.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        self.assertEqual(seen, [str(pk) for pk in expected])
+
+    def test_sub_goal_list_cursor(self):
+        for goal in self.goals:
+            SubGoal.objects.create(goal=goal, name="sub")
+        seen = self.walk("/api/goals/sub-goals/", {"cursor": "", "page_size": 2})
+        expected = SubGoal.objects.order_by("created_at", "id").values_list("id", flat=True)
+        self.assertEqual(seen, [str(pk) for pk in expected])
+
+    def test_page_number_mode_is_unchanged(self):
+        response = self.client.get("/api/goals/", {"page": 2, "page_size": 5})
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/goals/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+
+class SparseFieldsetTests(GoalAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.goal = make_goal(self.user, sub_goals=2, tasks_per_sub_goal=2)
+
+    def test_default_is_full_tree(self):
+        response = self.client.get("/api/goals/")
+        sub_goal = response.data["results"][0]["sub_goals"][0]
+        self.assertEqual(len(sub_goal["tasks"]), 2)
+
+    def test_fields_only_never_loads_tasks(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/goals/", {"fields": "id,name"})
+        self.assertEqual(response.data["results"], [{"id": str(self.goal.pk), "name": "Goal"}])
+        tables = " ".join(query["sql"] for query in queries)
+        self.assertNotIn("tasks_task", tables)
+        self.assertNotIn("goals_subgoal", tables)
+
+    def test_expand_one_level(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/goals/{self.goal.pk}/", {"expand": "sub_goals"})
+        self.assertEqual(len(response.data["sub_goals"]), 2)
+        self.assertNotIn("tasks", response.data["sub_goals"][0])
+        self.assertNotIn("tasks_task", " ".join(query["sql"] for query in queries))
+
+    def test_expand_two_levels(self):
+        response = self.client.get(f"/api/goals/{self.goal.pk}/", {
+            "fields": "id,sub_goals", "expand": "sub_goals.tasks",
+        })
+        self.assertEqual(set(response.data), {"id", "sub_goals"})
+        self.assertEqual(len(response.data["sub_goals"][0]["tasks"]), 2)
+
+    def test_nested_field_must_be_expanded(self):
+        response = self.client.get("/api/goals/", {"fields": "id,sub_goals"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.data)
+        response = self.client.get(f"/api/goals/{self.goal.pk}/", {"fields": "id,sub_goals"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/goals/sub-goals/", {"fields": "id,tasks", "expand": "tasks"})
+        self.assertEqual(len(response.data["results"][0]["tasks"]), 2)
+
+    def test_sub_goal_without_tasks(self):
+        response = self.client.get("/api/goals/sub-goals/", {"expand": ""})
+        self.assertNotIn("tasks", response.data["results"][0])
+        self.assertIn("progress", response.data["results"][0])
+
+
+class ETagTests(GoalAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.goal = make_goal(self.user, sub_goals=1, tasks_per_sub_goal=2)
+        self.sub_goal = self.goal.sub_goals.get()
+        self.url = f"/api/goals/{self.goal.pk}/"
+
+    def test_not_modified_skips_the_tree(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_writes_change_the_etag(self):
+        etags = {self.client.get(self.url)["ETag"]}
+
+        task = self.sub_goal.tasks.first()
+        task.name = "renamed"
+        task.save()
+        etags.add(self.client.get(self.url)["ETag"])
+
+        SubGoal.objects.create(goal=self.goal, name="another")
+        etags.add(self.client.get(self.url)["ETag"])
+
+        self.client.patch(self.url, {"name": "New name"})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etags.copy().pop())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["name"], "New name")
+        etags.add(response["ETag"])
+        self.assertEqual(len(etags), 4)
+
+    def test_prayer_delete_changes_the_etag(self):
+        fajr = Prayer.objects.get(user=self.user, name="Fajr")
+        task = self.sub_goal.tasks.first()
+        task.prayer = fajr
+        task.save()
+        etag = self.client.get(self.url)["ETag"]
+        self.client.delete(f"/api/prayers/{fajr.pk}/")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["sub_goals"][0]["tasks"]), 1)
+
+    def test_sparse_fieldsets_have_their_own_etag(self):
+        full = self.client.get(self.url)["ETag"]
+        sparse = self.client.get(self.url, {"fields": "id"})["ETag"]
+        self.assertNotEqual(full, sparse)
+
+    def test_sub_goal_detail(self):
+        url = f"/api/goals/sub-goals/{self.sub_goal.pk}/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Task.objects.create(sub_goal=self.sub_goal, name="new", date=date(2025, 1, 2))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_other_users_goal_is_404(self):
+        other = make_goal(User.objects.create_user(username="other"))
+        self.assertEqual(self.client.get(f"/api/goals/{other.pk}/").status_code, 404)
+
+
+class GoalListCacheTests(GoalAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.goal = make_goal(self.user, sub_goals=1, tasks_per_sub_goal=2, finished=0)
+        self.task = Task.objects.filter(sub_goal__goal=self.goal).first()
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get("/api/goals/")
+        self.assertEqual(first["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/goals/")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.data, second.data)
+
+        self.assertEqual(self.client.get("/api/goals/", {"page_size": 1})["X-Cache"], "MISS")
+
+    def test_task_write_invalidates(self):
+        self.client.get("/api/goals/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/api/tasks/{self.task.pk}/", {"status": True})
+        response = self.client.get("/api/goals/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["progress"], 50)
+
+    def test_sub_goal_delete_invalidates(self):
+        self.client.get("/api/goals/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.goal.sub_goals.get().delete()
+        response = self.client.get("/api/goals/")
+        self.assertEqual(response.data["results"][0]["sub_goals"], [])
+
+    def test_prayer_delete_invalidates(self):
+        fajr = Prayer.objects.get(user=self.user, name="Fajr")
+        self.task.prayer = fajr
+        self.task.save()
+        self.client.get("/api/goals/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/prayers/{fajr.pk}/")
+        response = self.client.get("/api/goals/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["results"][0]["sub_goals"][0]["tasks"]), 1)
+
+    def test_users_do_not_share_entries(self):
+        self.client.get("/api/goals/")
+        other = User.objects.create_user(username="other")
+        self.client.force_authenticate(other)
+        response = self.client.get("/api/goals/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["count"], 0)
+
+    def test_stats(self):
+        self.client.get("/api/goals/")
+        self.client.get("/api/goals/")
+        self.client.get("/api/goals/")
+        self.assertEqual(self.client.get("/api/goals/cache-stats/").status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get("/api/goals/cache-stats/")
+        self.assertEqual(response.data, {"hits": 2, "misses": 1, "hit_rate": 2 / 3})
+
+
+class FastPathTests(GoalAPITestCase):
+    def test_goal_list_matches_serializer(self):
+        from rest_framework.renderers import JSONRenderer
+        from .fastpath import GOAL_FORMAT, SUB_GOAL_FORMAT, render_goals, render_sub_goals
+        from .serializers import GoalSerializer, SubGoalSerializer
+
+        make_goal(self.user, name="a", sub_goals=2, tasks_per_sub_goal=3, finished=2)
+        make_goal(self.user, name="b", sub_goals=0)
+        goals = Goal.objects.order_by("created_at")
+        sub_goals = SubGoal.objects.order_by("created_at")
+        render = JSONRenderer().render
+
+        self.assertEqual(
+            render(render_goals(goals.values(*GOAL_FORMAT.columns))),
+            render(GoalSerializer(goals, many=True).data),
+        )
+        self.assertEqual(
+            render(render_sub_goals(sub_goals.values(*SUB_GOAL_FORMAT.columns))),
+            render(SubGoalSerializer(sub_goals, many=True).data),
+        )
+        self.assertEqual(
+            render(render_goals(goals.values(*GOAL_FORMAT.columns), {"sub_goals"}, {"id", "sub_goals"})),
+            render(GoalSerializer(goals, many=True, fields={"id", "sub_goals"}, expand={"sub_goals"}).data),
+        )
+
+
+class SnapshotTests(GoalAPITestCase):
+    def test_snapshot_tree_in_four_queries(self):
+        first = make_goal(self.user, name="first", sub_goals=2, tasks_per_sub_goal=2)
+        make_goal(self.user, name="second", sub_goals=1, tasks_per_sub_goal=3)
+        make_goal(User.objects.create_user(username="other"), name="not mine")
+
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/goals/snapshot/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([goal["name"] for goal in response.data["goals"]], ["second", "first"])
+        self.assertEqual(len(response.data["goals"][1]["sub_goals"]), 2)
+        self.assertEqual(len(response.data["goals"][1]["sub_goals"][0]["tasks"]), 2)
+        self.assertEqual(len(response.data["prayers"]), 7)
+
+        response = self.client.get("/api/goals/snapshot/", {"goal": str(first.pk)})
+        self.assertEqual([goal["name"] for goal in response.data["goals"]], ["first"])
+        self.assertEqual(self.client.get("/api/goals/snapshot/", {"goal": "nope"}).status_code, 400)
+
+
+class CompletedTasksTests(GoalAPITestCase):
+    def test_newest_first_with_cursor(self):
+        goal = make_goal(self.user, sub_goals=2, tasks_per_sub_goal=3, finished=0)
+        tasks = list(Task.objects.filter(sub_goal__goal=goal))
+        for day, task in enumerate(tasks[:5], start=1):
+            task.date = date(2025, 2, day)
+            task.status = True
+            task.save()
+
+        url = f"/api/goals/{goal.pk}/completed-tasks/"
+        response = self.client.get(url, {"limit": 2})
+        dates = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            dates.extend(task["date"] for task in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(dates, [f"2025-02-0{day}" for day in range(5, 0, -1)])
+
+    def test_other_users_goal(self):
+        goal = make_goal(User.objects.create_user(username="other"))
+        self.assertEqual(self.client.get(f"/api/goals/{goal.pk}/completed-tasks/").status_code, 404)
@@ -1,7 +1,8 @@
 
 from django.urls import path
 from .views import (
-    GoalListCreateView, GoalDetailView,
+    GoalListCreateView, GoalSummaryView, GoalSnapshotView, GoalCacheStatsView, GoalDetailView,
+    GoalCompletedTasksView,
     SubGoalListCreateView, SubGoalDetailView
 )
 
@@ -9,7 +10,11 @@ from .views import (
 urlpatterns = [
     # Routes pour Goals
     path('', GoalListCreateView.as_view(), name='goal-list-create'),
+    path('summary/', GoalSummaryView.as_view(), name='goal-summary'),
+    path('snapshot/', GoalSnapshotView.as_view(), name='goal-snapshot'),
+    path('cache-stats/', GoalCacheStatsView.as_view(), name='goal-cache-stats'),
     path('<uuid:pk>/', GoalDetailView.as_view(), name='goal-detail'),
+    path('<uuid:pk>/completed-tasks/', GoalCompletedTasksView.as_view(), name='goal-completed-tasks'),
     
     # Routes pour SubGoals
     path('sub-goals/', SubGoalListCreateView.as_view(), name='subgoal-list-create'),
@@ -1,67 +1,267 @@
 from rest_framework.response import Response
-from rest_framework import permissions, status
+from rest_framework import permissions, serializers, status
 from rest_framework.views import APIView
 from django.conf import settings
 from rest_framework import generics, permissions
 from rest_framework.pagination import PageNumberPagination
 from django.db.models import Prefetch
-from .models import Goal
+from django.utils.cache import parse_etags, quote_etag
+import hashlib
+from .models import Goal, progress_percent
 from .serializers import GoalSerializer
 from .models import SubGoal
 from .serializers import SubGoalSerializer
 from rest_framework.parsers import MultiPartParser, FormParser
+from .pagination import KeysetPagination, KeysetSwitchMixin
+from .fastpath import GOAL_FORMAT, SUB_GOAL_FORMAT, render_goals, render_snapshot, render_sub_goals
+from django.core.exceptions import ValidationError
+from tasks.fastpath import FastListMixin, TASK_FORMAT
+from tasks.models import Task
+from django.shortcuts import get_object_or_404
+from . import cache as goal_cache
+from django.core.cache import cache
 
-class GoalPagination(PageNumberPagination):
+class ExpandableViewMixin:
+    """
+    Reads ``?fields=a,b`` and ``?expand=sub_goals,sub_goals.tasks`` on read
+    requests and passes them to the serializer. ``get_queryset`` uses
+    ``is_expanded`` to skip prefetches for relations that are not rendered.
+    Without either parameter the full nested tree is returned, as before.
+    A nested field named in ``fields`` must also be in ``expand``.
+    """
+
+    def _query_set_param(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return {item.strip() for item in value.split(',') if item.strip()}
+
+    def get_field_options(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None, None
+        fields = self._query_set_param('fields')
+        expand = self._query_set_param('expand')
+        if fields is None and expand is None:
+            return None, None
+
+        # "sub_goals.tasks" implies "sub_goals".
+        expanded = set()
+        for path in expand or ():
+            parts = path.split('.')
+            expanded.update('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+        if fields is not None:
+            expanded = {path for path in expanded if path.split('.')[0] in fields}
+            collapsed = (fields & set(self.get_serializer_class().expandable_fields)) - expanded
+            if collapsed:
+                raise serializers.ValidationError(
+                    {'fields': [f'Add {name} to expand to include it.' for name in sorted(collapsed)]}
+                )
+        return fields, expanded
+
+    def is_expanded(self, path):
+        expand = self.get_field_options()[1]
+        return expand is None or path in expand
+
+    def get_serializer(self, *args, **kwargs):
+        fields, expand = self.get_field_options()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if expand is not None:
+            kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
+
+class GoalQuerysetMixin(ExpandableViewMixin):
+    def get_queryset(self):
+        queryset = Goal.objects.filter(user=self.request.user).select_related('user')
+        # Only prefetch the levels of the tree that will be serialized.
+        if self.is_expanded('sub_goals.tasks'):
+            return queryset.prefetch_related(
+                Prefetch('sub_goals', queryset=SubGoal.objects.prefetch_related('tasks'))
+            )
+        if self.is_expanded('sub_goals'):
+            return queryset.prefetch_related('sub_goals')
+        return queryset
+
+class GoalVersionETagMixin:
+    """
+    Strong ETag / If-None-Match support for detail views of the goal tree.
+
+    The ETag is built from ``Goal.version``, which is bumped by every goal,
+    sub-goal or task write, so a matching request is answered with a 304
+    after one single-column query, without loading or serializing the tree.
+    ``version_lookup`` is the path from Goal to the object in the URL.
+    """
+    version_lookup = 'pk'
+
+    def get_version_queryset(self):
+        return Goal.objects.filter(**{self.version_lookup: self.kwargs['pk']}, user=self.request.user)
+
+    def get_etag(self, version):
+        fields, expand = self.get_field_options()
+        variant = hashlib.sha1(repr((
+            sorted(fields) if fields is not None else None,
+            sorted(expand) if expand is not None else None,
+        )).encode()).hexdigest()[:8]
+        return quote_etag(f"{self.kwargs['pk']}-{version}-{variant}")
+
+    def retrieve(self, request, *args, **kwargs):
+        # Read the version before the tree, so a concurrent write can only
+        # make the ETag older than the body, never newer.
+        version = self.get_version_queryset().values_list('version', flat=True).first()
+        if version is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = self.get_etag(version)
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        return response
+
+class GoalPagination(KeysetSwitchMixin, PageNumberPagination):
     page_size = 8
     page_size_query_param = 'page_size'
     max_page_size = 100
+    keyset_ordering = ('-created_at', '-id')
 
-class GoalListCreateView(generics.ListCreateAPIView):
+class GoalListCreateView(FastListMixin, GoalQuerysetMixin, generics.ListCreateAPIView):
     serializer_class = GoalSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)  # To handle file uploads
     pagination_class = GoalPagination
+    row_format = GOAL_FORMAT
 
     def get_queryset(self):
-        # Optimize query with select_related and prefetch_related
-        return Goal.objects.filter(user=self.request.user).select_related('user').prefetch_related(
-            Prefetch('sub_goals', queryset=SubGoal.objects.prefetch_related('tasks'))
-        ).order_by('-created_at')
+        return super().get_queryset().order_by('-created_at')
+
+    def get_list_rows(self):
+        return Goal.objects.filter(user=self.request.user).order_by('-created_at').values(*GOAL_FORMAT.columns)
+
+    def render_rows(self, rows):
+        fields, expand = self.get_field_options()
+        return render_goals(rows, expand, fields)
+
+    def list(self, request, *args, **kwargs):
+        # Cached per user and query string; see goals/cache.py for invalidation.
+        key = goal_cache.goal_list_key(request)
+        data = cache.get(key)
+        if data is not None:
+            goal_cache.record_hit()
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, goal_cache.GOAL_LIST_CACHE_TIMEOUT)
+        goal_cache.record_miss()
+        response['X-Cache'] = 'MISS'
+        return response
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class GoalDetailView(generics.RetrieveUpdateDestroyAPIView):
-    serializer_class = GoalSerializer
+class CompletedTaskPagination(KeysetPagination):
+    always = True
+    ordering = ('-date', '-id')
+    page_size = 20
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+class GoalCompletedTasksView(FastListMixin, generics.ListAPIView):
+    """
+    Finished tasks of one goal, newest first, cursor paginated
+    (``?limit=`` sets the page size). Served by the
+    ``task_subgoal_status_date_idx`` index.
+    """
     permission_classes = [permissions.IsAuthenticated]
-    parser_classes = (MultiPartParser, FormParser)  # To handle file uploads
-    
+    pagination_class = CompletedTaskPagination
+    row_format = TASK_FORMAT
+
     def get_queryset(self):
-        # Optimize query with select_related and prefetch_related
-        return Goal.objects.filter(user=self.request.user).select_related('user').prefetch_related(
-            Prefetch('sub_goals', queryset=SubGoal.objects.prefetch_related('tasks'))
+        goal = get_object_or_404(Goal.objects.only('pk'), pk=self.kwargs['pk'], user=self.request.user)
+        return Task.objects.filter(sub_goal__goal=goal, status=True)
+
+class GoalSnapshotView(APIView):
+    """
+    A user's goal -> sub-goal -> task tree and their prayers in one
+    response, so opening a goal page costs one round trip instead of four.
+    ``?goal=<id>`` limits the tree to a single goal.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        goal_id = request.query_params.get('goal')
+        if goal_id is not None:
+            try:
+                goal_id = Goal._meta.pk.to_python(goal_id)
+            except ValidationError:
+                return Response({"goal": ["Must be a valid UUID."]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(render_snapshot(request.user, goal_id))
+
+class GoalCacheStatsView(APIView):
+    """Hit/miss counters of the goal list cache."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(goal_cache.cache_stats())
+
+class GoalSummaryView(APIView):
+    """
+    Id, name, image and progress of every goal, without the nested
+    sub-goal/task tree. Meant for sidebars and progress bars.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        goals = Goal.objects.filter(user=request.user).order_by('-created_at').values(
+            'id', 'name', 'image_url', 'total_tasks', 'finished_tasks'
         )
+        summary = []
+        for goal in goals:
+            goal['progress'] = progress_percent(goal['finished_tasks'], goal['total_tasks'])
+            summary.append(goal)
+        return Response(summary)
+
+class GoalDetailView(GoalVersionETagMixin, GoalQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = GoalSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = (MultiPartParser, FormParser)  # To handle file uploads
 
 # sub-goals/views.py
 
-class SubGoalPagination(PageNumberPagination):
+class SubGoalPagination(KeysetSwitchMixin, PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    keyset_ordering = ('created_at', 'id')
+
+class SubGoalQuerysetMixin(ExpandableViewMixin):
+    def get_queryset(self):
+        queryset = SubGoal.objects.filter(goal__user=self.request.user).select_related('goal')
+        if self.is_expanded('tasks'):
+            queryset = queryset.prefetch_related('tasks')
+        return queryset
 
-class SubGoalListCreateView(generics.ListCreateAPIView):
+class SubGoalListCreateView(FastListMixin, SubGoalQuerysetMixin, generics.ListCreateAPIView):
     serializer_class = SubGoalSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = SubGoalPagination
+    row_format = SUB_GOAL_FORMAT
 
     def get_queryset(self):
-        # Optimize query with select_related and prefetch_related
-        return SubGoal.objects.filter(goal__user=self.request.user).select_related('goal').prefetch_related('tasks').order_by('created_at')
+        return super().get_queryset().order_by('created_at')
 
-class SubGoalDetailView(generics.RetrieveUpdateDestroyAPIView):
+    def get_list_rows(self):
+        return SubGoal.objects.filter(goal__user=self.request.user).order_by('created_at').values(
+            *SUB_GOAL_FORMAT.columns
+        )
+
+    def render_rows(self, rows):
+        fields, expand = self.get_field_options()
+        return render_sub_goals(rows, expand, fields)
+
+class SubGoalDetailView(GoalVersionETagMixin, SubGoalQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = SubGoalSerializer
     permission_classes = [permissions.IsAuthenticated]
-
-    def get_queryset(self):
-        # Optimize query with select_related and prefetch_related
-        return SubGoal.objects.filter(goal__user=self.request.user).select_related('goal').prefetch_related('tasks')  
\ No newline at end of file
+    version_lookup = 'sub_goals'
\ No newline at end of file
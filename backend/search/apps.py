@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def restore_triggers(sender, using, **kwargs):
+    from .schema import restore_sqlite_triggers
+
+    restore_sqlite_triggers(connections[using])
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "search"
+
+    def ready(self):
+        post_migrate.connect(restore_triggers, sender=self)
@@ -0,0 +1,78 @@
+import random
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from goals.models import Goal, SubGoal
+from search.views import SearchView
+from tasks.models import Task
+from thimar_project.benchmarking import bench_user, rolled_back, summarize, timed
+
+SYLLABLES = ['ka', 'ri', 'mo', 'sa', 'lu', 'te', 'na', 'bi', 'do', 'fa', 'qu', 'ze', 'ha', 'ji', 'wa', 'ye']
+
+
+class Command(BaseCommand):
+    help = "Time search for a user with a very large task history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000)
+        parser.add_argument('--goals', type=int, default=200)
+        parser.add_argument('--sub-goals', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        # ~4000 three-syllable words, so one word matches a few hundred tasks.
+        vocabulary = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+
+        def text(words):
+            return ' '.join(rng.choice(vocabulary) for _ in range(words))
+
+        with rolled_back():
+            user = bench_user()
+            goals = Goal.objects.bulk_create(
+                Goal(user=user, name=text(3), description=text(10)) for _ in range(options['goals'])
+            )
+            sub_goals = SubGoal.objects.bulk_create(
+                SubGoal(goal=goal, name=text(3)) for goal in goals for _ in range(options['sub_goals'])
+            )
+            started = time.perf_counter()
+            Task.objects.bulk_create(
+                (
+                    Task(
+                        sub_goal=rng.choice(sub_goals), user=user, name=text(4),
+                        description=text(8), date=date(2025, 1, 1),
+                    )
+                    for _ in range(options['tasks'])
+                ),
+                batch_size=5000,
+            )
+            self.stdout.write(
+                f"Seeded {options['tasks']} tasks, indexed in {time.perf_counter() - started:.0f} s"
+            )
+
+            word = rng.choice(vocabulary)
+            cases = [
+                ("one word", {'q': word}),
+                ("two words", {'q': f"{word} {rng.choice(vocabulary)}"}),
+                ("2 letters (whole)", {'q': word[:2]}),
+                ("prefix (3 letters)", {'q': word[:3]}),
+                ("prefix (4 letters)", {'q': word[:4]}),
+                ("prefix (5 letters)", {'q': word[:5]}),
+                ("one word, page 5", {'q': word, 'page': 5}),
+                ("no match", {'q': 'xyzzy'}),
+            ]
+            view = SearchView.as_view()
+            factory = APIRequestFactory()
+            for label, params in cases:
+                timings = timed(lambda: self.get(view, factory, user, params), options['repeat'])
+                self.stdout.write(f"{label:<20} {summarize(timings)}")
+
+    def get(self, view, factory, user, params):
+        request = factory.get('/api/search/', params)
+        force_authenticate(request, user=user)
+        response = view(request)
+        assert response.status_code == 200, response.data
+        return response
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:40
+
+from django.db import migrations
+
+from search import schema
+
+
+def create_search_index(apps, schema_editor):
+    schema.create(schema_editor)
+
+
+def drop_search_index(apps, schema_editor):
+    schema.drop(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0016_subgoal_subgoal_goal_created_id_idx'),
+        ('tasks', '0010_task_user_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
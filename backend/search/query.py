@@ -0,0 +1,103 @@
+# search/query.py
+"""
+Ranked full-text search over a user's goals, sub-goals and tasks.
+
+Every word of the query must match; words of ``MIN_PREFIX`` letters or more
+match as prefixes, so results show up while typing. The ranked page of
+``(kind, id)`` pairs comes from one query on the backend's index (see
+schema.py); the rows on it are then read by primary key and rendered like
+everywhere else in the API.
+
+Every match is ranked; paging stops after the best ``MAX_RESULTS``
+(``SEARCH_MAX_RESULTS``) results.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+
+from goals.fastpath import GOAL_FORMAT, SUB_GOAL_FORMAT, render_goals, render_sub_goals
+from goals.models import Goal, SubGoal
+from tasks.fastpath import TASK_FORMAT
+from tasks.models import Task
+
+MAX_TERMS = 10
+MIN_PREFIX = 3
+MAX_RESULTS = getattr(settings, 'SEARCH_MAX_RESULTS', 1000)
+# Letters and digits only: everything else separates words in both indexes,
+# and keeping it out means user input never reaches the query syntax.
+WORD = re.compile(r'[^\W_]+')
+
+# Name matches count ten times as much as description matches.
+SQLITE_SEARCH = """
+    SELECT e.kind, e.object_id
+    FROM search_fts JOIN search_entry e ON e.id = search_fts.rowid
+    WHERE search_fts MATCH %s AND e.owner = %s
+    ORDER BY bm25(search_fts, 10.0, 1.0), e.id
+    LIMIT %s OFFSET %s
+"""
+
+POSTGRES_SEARCH = """
+    WITH q AS (SELECT to_tsquery('simple', %s) AS query)
+    SELECT kind, id FROM (
+        SELECT 'goal' AS kind, g.id, ts_rank(g.search_vector, q.query) AS rank
+        FROM goals_goal g, q
+        WHERE g.user_id = %s AND g.search_vector @@ q.query
+        UNION ALL
+        SELECT 'sub_goal', s.id, ts_rank(s.search_vector, q.query)
+        FROM goals_subgoal s JOIN goals_goal g ON g.id = s.goal_id, q
+        WHERE g.user_id = %s AND s.search_vector @@ q.query
+        UNION ALL
+        SELECT 'task', t.id, ts_rank(t.search_vector, q.query)
+        FROM tasks_task t, q
+        WHERE t.user_id = %s AND t.search_vector @@ q.query
+    ) AS matches
+    ORDER BY rank DESC, kind, id
+    LIMIT %s OFFSET %s
+"""
+
+MODELS = {'goal': Goal, 'sub_goal': SubGoal, 'task': Task}
+
+
+def terms(text):
+    return WORD.findall(text)[:MAX_TERMS]
+
+
+def _prefix(word):
+    return len(word) >= MIN_PREFIX
+
+
+def ranked_ids(user, words, limit, offset=0):
+    """The ``(kind, id)`` of the best matches, best first."""
+    limit = min(limit, MAX_RESULTS - offset)
+    if limit <= 0:
+        return []
+    if connection.vendor == 'postgresql':
+        query = ' & '.join(f'{word}:*' if _prefix(word) else word for word in words)
+        sql, params = POSTGRES_SEARCH, [query, user.pk, user.pk, user.pk, limit, offset]
+    else:
+        match = ' '.join(f'"{word}"*' if _prefix(word) else f'"{word}"' for word in words)
+        sql, params = SQLITE_SEARCH, [match, user.pk, limit, offset]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(kind, MODELS[kind]._meta.pk.to_python(pk)) for kind, pk in cursor.fetchall()]
+
+
+def render_results(hits):
+    """``[{"type", "item"}]`` for ``(kind, id)`` hits, in order, with one query per kind."""
+    ids = {kind: [pk for hit_kind, pk in hits if hit_kind == kind] for kind in MODELS}
+    items = {}
+    if ids['goal']:
+        rows = Goal.objects.filter(pk__in=ids['goal']).values(*GOAL_FORMAT.columns)
+        items.update((('goal', item['id']), item) for item in render_goals(rows, expand=()))
+    if ids['sub_goal']:
+        rows = SubGoal.objects.filter(pk__in=ids['sub_goal']).values(*SUB_GOAL_FORMAT.columns)
+        items.update((('sub_goal', item['id']), item) for item in render_sub_goals(rows, expand=()))
+    if ids['task']:
+        rows = Task.objects.filter(pk__in=ids['task']).values(*TASK_FORMAT.columns)
+        items.update((('task', item['id']), item) for item in TASK_FORMAT.render_all(rows))
+    # A row deleted since the ranking query is simply left out.
+    return [
+        {'type': kind, 'item': items[kind, str(pk)]}
+        for kind, pk in hits if (kind, str(pk)) in items
+    ]
@@ -0,0 +1,151 @@
+# search/schema.py
+"""
+Database objects behind search, per backend.
+
+PostgreSQL: a generated, weighted ``search_vector`` tsvector column with a
+GIN index on each searchable table. The 'simple' configuration leaves words
+unstemmed, which suits a mix of Arabic, French and English text better than
+any one language's rules.
+
+SQLite: one ``search_entry`` row per goal, sub-goal and task, kept up to date
+by triggers, and an FTS5 index over it. The index is keyed by search_entry's
+INTEGER PRIMARY KEY because the UUID-keyed tables' implicit rowids may change
+on VACUUM. Prefixes of 3 and 4 characters get their own index entries, so a
+short prefix reads one posting list instead of merging one per word.
+"""
+POSTGRES_VECTORS = {
+    'goals_goal': "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A')"
+                  " || setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')",
+    'goals_subgoal': "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A')",
+    'tasks_task': "setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A')"
+                  " || setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')",
+}
+
+SQLITE_TABLES = [
+    """
+    CREATE TABLE search_entry (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        object_id CHAR(32) NOT NULL,
+        owner INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        description TEXT NOT NULL
+    )
+    """,
+    "CREATE UNIQUE INDEX search_entry_object_uniq ON search_entry (kind, object_id)",
+    """
+    CREATE VIRTUAL TABLE search_fts USING fts5(
+        name, description,
+        content='search_entry', content_rowid='id', prefix='3 4',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+]
+
+# kind, table, owner, description (``{row}`` is the row alias), and the
+# columns whose change must refresh the entry.
+SQLITE_SOURCES = [
+    ('goal', 'goals_goal', '{row}.user_id', "coalesce({row}.description, '')", ('name', 'description', 'user_id')),
+    ('sub_goal', 'goals_subgoal', '(SELECT user_id FROM goals_goal WHERE id = {row}.goal_id)', "''",
+     ('name', 'goal_id')),
+    ('task', 'tasks_task', '{row}.user_id', "coalesce({row}.description, '')", ('name', 'description', 'user_id')),
+]
+
+
+def sqlite_triggers():
+    """CREATE TRIGGER statements for search_entry, its FTS index and every source table."""
+    statements = [
+        """
+        CREATE TRIGGER IF NOT EXISTS search_entry_ai AFTER INSERT ON search_entry BEGIN
+            INSERT INTO search_fts (rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS search_entry_ad AFTER DELETE ON search_entry BEGIN
+            INSERT INTO search_fts (search_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS search_entry_au AFTER UPDATE ON search_entry BEGIN
+            INSERT INTO search_fts (search_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO search_fts (rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+        """,
+    ]
+    for kind, table, owner, description, watched in SQLITE_SOURCES:
+        owner, description = owner.format(row='new'), description.format(row='new')
+        changed = ' OR '.join(f'old.{column} IS NOT new.{column}' for column in watched)
+        statements += [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS search_{table}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO search_entry (kind, object_id, owner, name, description)
+                VALUES ('{kind}', new.id, {owner}, new.name, {description});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS search_{table}_au AFTER UPDATE ON {table} WHEN {changed} BEGIN
+                UPDATE search_entry SET owner = {owner}, name = new.name, description = {description}
+                WHERE kind = '{kind}' AND object_id = old.id;
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS search_{table}_ad AFTER DELETE ON {table} BEGIN
+                DELETE FROM search_entry WHERE kind = '{kind}' AND object_id = old.id;
+            END
+            """,
+        ]
+    return statements
+
+
+def sqlite_backfill():
+    return [
+        f"""
+        INSERT INTO search_entry (kind, object_id, owner, name, description)
+        SELECT '{kind}', row.id, {owner.format(row='row')}, row.name, {description.format(row='row')}
+        FROM {table} AS row
+        """
+        for kind, table, owner, description, _ in SQLITE_SOURCES
+    ]
+
+
+def create(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for table, vector in POSTGRES_VECTORS.items():
+            schema_editor.execute(
+                f'ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED'
+            )
+            schema_editor.execute(f'CREATE INDEX {table}_search_idx ON {table} USING gin (search_vector)')
+    elif vendor == 'sqlite':
+        for statement in SQLITE_TABLES + sqlite_backfill() + sqlite_triggers():
+            schema_editor.execute(statement)
+
+
+def drop(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for table in POSTGRES_VECTORS:
+            schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN search_vector')
+    elif vendor == 'sqlite':
+        for _, table, *_ in SQLITE_SOURCES:
+            for suffix in ('ai', 'au', 'ad'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS search_{table}_{suffix}')
+        schema_editor.execute('DROP TABLE search_fts')
+        schema_editor.execute('DROP TABLE search_entry')
+
+
+def restore_sqlite_triggers(connection):
+    """
+    SQLite migrations rebuild a table to alter most columns, which drops
+    its triggers; put back any that went missing. The entries themselves
+    survive, since the rebuild copies rows without firing them.
+    """
+    if connection.vendor != 'sqlite' or 'search_entry' not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for statement in sqlite_triggers():
+            cursor.execute(statement)
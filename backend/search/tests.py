@@ -0,0 +1,90 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.test import APITestCase
+
+from goals.models import Goal, SubGoal
+from tasks.models import Task
+from . import query
+from .schema import SQLITE_SOURCES, restore_sqlite_triggers
+
+User = get_user_model()
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+        self.goal = Goal.objects.create(user=self.user, name="Memorize Quran", description="Juz Amma first")
+        self.sub_goal = SubGoal.objects.create(goal=self.goal, name="Surah Al-Mulk")
+        self.task = Task.objects.create(
+            sub_goal=self.sub_goal, name="Review verses", description="Memorize verses 1-10", date=date(2025, 1, 1)
+        )
+        other = User.objects.create_user(username="bilal", password="pass")
+        Goal.objects.create(user=other, name="Memorize poetry")
+
+    def search(self, q, **params):
+        response = self.client.get("/api/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def hits(self, q):
+        return [(result["type"], result["item"]["id"]) for result in self.search(q)["results"]]
+
+    def test_ranks_name_matches_first(self):
+        self.assertEqual(self.hits("memoriz"), [("goal", str(self.goal.pk)), ("task", str(self.task.pk))])
+        self.assertEqual(self.hits("mulk"), [("sub_goal", str(self.sub_goal.pk))])
+        self.assertEqual(self.hits("memorize amma"), [("goal", str(self.goal.pk))])
+        self.assertEqual(self.hits("fasting"), [])
+        # Below three letters a word must match whole.
+        self.assertEqual(self.hits("me"), [])
+
+    def test_renders_items_like_the_api(self):
+        result = self.search("review")["results"][0]
+        self.assertEqual(result["item"], self.client.get(f"/api/tasks/{self.task.pk}/").data)
+
+    def test_follows_edits_and_deletes(self):
+        self.task.name = "Recite at night"
+        self.task.save()
+        self.assertEqual(self.hits("night"), [("task", str(self.task.pk))])
+        self.assertEqual(self.hits("review"), [])
+        self.goal.delete()
+        self.assertEqual(self.hits("night"), [])
+
+    def test_ranks_every_match(self):
+        # More matches than results are served: the older name match still
+        # comes first, and only the cap stops paging.
+        for i in range(5):
+            Task.objects.create(
+                sub_goal=self.sub_goal, name=f"Step {i}", description="then memorize", date=date(2025, 1, 2)
+            )
+        with mock.patch.object(query, "MAX_RESULTS", 3), mock.patch("search.views.MAX_RESULTS", 3):
+            data = self.search("memorize", page_size=2)
+            self.assertEqual(data["results"][0]["item"]["id"], str(self.goal.pk))
+            self.assertEqual(len(self.client.get(data["next"]).data["results"]), 1)
+
+    def test_pages(self):
+        for i in range(5):
+            Task.objects.create(sub_goal=self.sub_goal, name=f"Revise page {i}", date=date(2025, 1, 1))
+        first = self.search("revise", page_size=3)
+        self.assertEqual(len(first["results"]), 3)
+        second = self.client.get(first["next"]).data
+        self.assertEqual(len(second["results"]), 2)
+        self.assertIsNone(second["next"])
+
+    def test_rejects_queries_without_words(self):
+        for q in ("", '"*)(', "__"):
+            with self.subTest(q=q):
+                self.assertEqual(self.client.get("/api/search/", {"q": q}).status_code, 400)
+
+    def test_restores_dropped_triggers(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite only")
+        with connection.cursor() as cursor:
+            for _, table, *_ in SQLITE_SOURCES:
+                cursor.execute(f"DROP TRIGGER search_{table}_ai")
+        restore_sqlite_triggers(connection)
+        Task.objects.create(sub_goal=self.sub_goal, name="Tahajjud", date=date(2025, 1, 1))
+        self.assertEqual(len(self.hits("tahajjud")), 1)
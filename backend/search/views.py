@@ -0,0 +1,41 @@
+from rest_framework import permissions, serializers
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from .query import MAX_RESULTS, ranked_ids, render_results, terms
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    q = serializers.CharField()
+    page = serializers.IntegerField(min_value=1, default=1)
+    page_size = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+    def validate_q(self, value):
+        words = terms(value)
+        if not words:
+            raise serializers.ValidationError("Enter at least one word.")
+        return words
+
+
+class SearchView(APIView):
+    """
+    Goals, sub-goals and tasks of the user matching every word of ``?q=``
+    (as prefixes from three letters on), best matches first, as ``{"next", "results"}`` where each
+    result is ``{"type": "goal" | "sub_goal" | "task", "item": {...}}``.
+    Pages are numbered with ``?page=`` and sized with ``?page_size=``; they
+    stop after ``MAX_RESULTS`` results.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        params = SearchParamsSerializer(data=request.query_params.dict())
+        params.is_valid(raise_exception=True)
+        page, page_size = params.validated_data['page'], params.validated_data['page_size']
+
+        offset = (page - 1) * page_size
+        hits = ranked_ids(request.user, params.validated_data['q'], page_size + 1, offset)
+        next_url = None
+        if len(hits) > page_size and offset + page_size < MAX_RESULTS:
+            next_url = replace_query_param(request.build_absolute_uri(), 'page', page + 1)
+        return Response({'next': next_url, 'results': render_results(hits[:page_size])})
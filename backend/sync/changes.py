@@ -0,0 +1,70 @@
+# sync/changes.py
+"""
+Delta sync: everything a user's client needs to catch up since its last
+cursor, as flat per-table lists of rows plus the ids deleted meanwhile.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from goals.fastpath import GOAL_FORMAT, SUB_GOAL_FORMAT, render_goals, render_sub_goals
+from goals.models import Goal, SubGoal
+from tasks.fastpath import PRAYER_FORMAT, TASK_FORMAT
+from tasks.models import Prayer, Task
+
+SECTIONS = {Goal: 'goals', SubGoal: 'sub_goals', Task: 'tasks', Prayer: 'prayers'}
+
+
+def _querysets(user):
+    return {
+        'goals': Goal.objects.filter(user=user).values(*GOAL_FORMAT.columns),
+        'sub_goals': SubGoal.objects.filter(goal__user=user).values(*SUB_GOAL_FORMAT.columns),
+        'tasks': Task.objects.filter(user=user).values(*TASK_FORMAT.columns),
+        'prayers': Prayer.objects.filter(user=user).values(*PRAYER_FORMAT.columns),
+    }
+
+
+def _render(section, rows):
+    if section == 'goals':
+        return render_goals(rows, expand=())
+    if section == 'sub_goals':
+        return render_sub_goals(rows, expand=())
+    if section == 'tasks':
+        return TASK_FORMAT.render_all(rows)
+    return PRAYER_FORMAT.render_all(rows)
+
+
+def is_expired(since):
+    """True when tombstones older than ``since`` may already be pruned."""
+    return since < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+
+
+def collect_changes(user, since=None):
+    """
+    Rows created or updated at or after ``since`` and the ids deleted since
+    then. With no ``since`` (or one older than the tombstone retention)
+    every row is returned and ``full`` tells the client to replace its
+    copy instead of merging.
+
+    The returned ``cursor`` is taken before reading, minus
+    ``SYNC_OVERLAP_SECONDS``, so rows written by transactions still open at
+    that time show up again on the next call rather than never. Clients
+    apply rows by id, so seeing one twice is harmless.
+    """
+    cursor = timezone.now() - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+    full = since is None or is_expired(since)
+
+    changes = {'cursor': cursor, 'full': full}
+    for section, rows in _querysets(user).items():
+        if not full:
+            rows = rows.filter(updated_at__gte=since)
+        changes[section] = _render(section, rows)
+
+    deleted = {section: [] for section in SECTIONS.values()}
+    if not full:
+        tombstones = user.tombstones.filter(deleted_at__gte=since).values_list('section', 'object_id')
+        for section, object_id in tombstones:
+            deleted[section].append(object_id)
+    changes['deleted'] = deleted
+    return changes
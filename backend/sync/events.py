@@ -0,0 +1,109 @@
+# sync/events.py
+"""
+Per-user change events for the push channel (/api/events/).
+
+Writes publish a small ``{"action", "section", "id"}`` event on the owner's
+channel once their transaction commits; every open stream of that user
+receives it and can fetch the rows through /api/sync/. Channels are per
+user, so a write only costs as many deliveries as its owner has streams.
+
+``InMemoryBroker`` delivers within one process (development, tests, a
+single ASGI server); ``RedisBroker`` goes through Redis pub/sub so the
+process that saves a task need not be the one holding the stream.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryBroker:
+    # Events queued for a stream that is not reading are dropped past this.
+    max_pending = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(str(user_id), ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._offer, queue, event)
+
+    @staticmethod
+    def _offer(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    async def subscribe(self, user_id):
+        """Yield the user's events until the consumer stops iterating."""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.max_pending))
+        key = str(user_id)
+        with self._lock:
+            self._subscribers[key].add(subscriber)
+        try:
+            while True:
+                yield await subscriber[1].get()
+        finally:
+            with self._lock:
+                self._subscribers[key].discard(subscriber)
+                if not self._subscribers[key]:
+                    del self._subscribers[key]
+
+
+class RedisBroker:
+    channel_prefix = 'thimar:events:'
+
+    def __init__(self, url):
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def channel(self, user_id):
+        return f'{self.channel_prefix}{user_id}'
+
+    def publish(self, user_id, event):
+        try:
+            self._client.publish(self.channel(user_id), json.dumps(event))
+        except redis.RedisError:
+            # A missed event only delays the client until its next sync.
+            logger.warning("Could not publish a change event", exc_info=True)
+
+    async def subscribe(self, user_id):
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.channel(user_id))
+        try:
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    yield json.loads(message['data'])
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.close()
+            await client.close()
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = RedisBroker(settings.REDIS_URL) if settings.REDIS_URL else InMemoryBroker()
+    return _broker
+
+
+def publish_event(user_id, action, section, object_id):
+    """Send an event to ``user_id``'s streams after the current transaction commits."""
+    event = {'action': action, 'section': section, 'id': str(object_id)}
+    transaction.on_commit(lambda: get_broker().publish(user_id, event))
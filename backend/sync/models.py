@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    Marks a deleted goal, sub-goal, task or prayer so delta sync can tell
+    clients to drop it. Only the object ``delete()`` was called on gets one;
+    the children a cascade removes with it are implied.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='tombstones'
+    )
+    # The section of the sync response the object belonged to.
+    section = models.CharField(max_length=20)
+    object_id = models.UUIDField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.section} {self.object_id} deleted at {self.deleted_at}"
@@ -0,0 +1,50 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from goals.models import Goal, SubGoal
+from goals.signals import _deleted_through, _owner_id
+from tasks.models import Prayer, Task
+from .changes import SECTIONS
+from .events import publish_event
+from .models import Tombstone
+
+
+@receiver(post_delete, sender=Goal)
+@receiver(post_delete, sender=SubGoal)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Prayer)
+def record_deletion(sender, instance, origin=None, **kwargs):
+    # Children removed by a cascade go with their parent on the client too,
+    # and a deleted user has nobody left to sync.
+    if origin is not None and not _deleted_through(origin, sender):
+        return
+    user_id = _owner_id(instance)
+    if user_id is not None:
+        Tombstone.objects.create(user_id=user_id, section=SECTIONS[sender], object_id=instance.pk)
+        publish_event(user_id, 'deleted', SECTIONS[sender], instance.pk)
+
+
+@receiver(pre_save, sender=SubGoal)
+def record_sub_goal_handover(sender, instance, raw=False, **kwargs):
+    # A sub-goal moved to another user's goal is gone for its old owner,
+    # tasks included.
+    old_goal_id = getattr(instance, '_loaded_goal_id', None)
+    if raw or old_goal_id is None or old_goal_id == instance.goal_id:
+        return
+    owners = dict(Goal.objects.filter(pk__in=[old_goal_id, instance.goal_id]).values_list('pk', 'user_id'))
+    old_user_id = owners.get(old_goal_id)
+    if old_user_id is not None and old_user_id != owners.get(instance.goal_id):
+        Tombstone.objects.create(user_id=old_user_id, section=SECTIONS[SubGoal], object_id=instance.pk)
+        publish_event(old_user_id, 'deleted', SECTIONS[SubGoal], instance.pk)
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_save, sender=SubGoal)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Prayer)
+def publish_change(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    user_id = _owner_id(instance)
+    if user_id is not None:
+        publish_event(user_id, 'created' if created else 'updated', SECTIONS[sender], instance.pk)
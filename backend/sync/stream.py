@@ -0,0 +1,112 @@
+# sync/stream.py
+"""
+``/api/events/``: a Server-Sent Events stream of the user's change events
+(see sync/events.py), served as a plain ASGI app in its own process (see
+thimar_project/asgi.py) because Django 4.1 cannot stream from an async
+iterator.
+
+Browsers' EventSource cannot set headers, so the JWT access token may be
+passed as ``?token=`` as well as in the Authorization header.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .events import get_broker
+
+EVENTS_PATH = '/api/events/'
+# Comment lines keep proxies from closing an idle stream.
+KEEPALIVE_SECONDS = 15
+
+
+def _raw_token(scope):
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    if query.get('token'):
+        return query['token'][0].encode()
+    for name, value in scope.get('headers', ()):
+        if name == b'authorization':
+            try:
+                return JWTAuthentication().get_raw_token(value)
+            except AuthenticationFailed:
+                return None  # a malformed header, answered with a 401
+    return None
+
+
+@sync_to_async
+def _authenticate(raw_token):
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def _respond(send, status, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps(body).encode()})
+
+
+async def _forward(send, events):
+    # The pending read is kept across keepalives: cancelling it would close
+    # the subscription.
+    pending = asyncio.ensure_future(events.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({pending}, timeout=KEEPALIVE_SECONDS)
+            if done:
+                chunk = f'event: change\ndata: {json.dumps(pending.result())}\n\n'.encode()
+                pending = asyncio.ensure_future(events.__anext__())
+            else:
+                chunk = b': keepalive\n\n'
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    finally:
+        pending.cancel()
+        await asyncio.gather(pending, return_exceptions=True)
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def events_application(scope, receive, send):
+    if scope['type'] != 'http':
+        return
+    if scope['path'] != EVENTS_PATH:
+        await _respond(send, 404, {'detail': 'Not found.'})
+        return
+    raw_token = _raw_token(scope)
+    user = await _authenticate(raw_token) if raw_token else None
+    if user is None:
+        await _respond(send, 401, {'detail': 'Authentication credentials were not provided or are invalid.'})
+        return
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': b': connected\n\n', 'more_body': True})
+
+    events = get_broker().subscribe(user.pk)
+    forward = asyncio.ensure_future(_forward(send, events))
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await asyncio.wait({forward, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (forward, disconnect):
+            task.cancel()
+        await asyncio.gather(forward, disconnect, return_exceptions=True)
+        await events.aclose()
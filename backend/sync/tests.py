@@ -0,0 +1,177 @@
+import asyncio
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from goals.models import Goal, SubGoal
+from goals.tests import make_goal
+from tasks.models import Task
+from thimar_project import asgi
+from .events import InMemoryBroker
+from .models import Tombstone
+
+User = get_user_model()
+
+
+@override_settings(SYNC_OVERLAP_SECONDS=0)
+class SyncTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+        self.goal = make_goal(self.user, sub_goals=2, tasks_per_sub_goal=2, finished=0)
+        self.other_goal = make_goal(self.user, name="Other")
+
+    def sync(self, cursor=None):
+        params = {} if cursor is None else {"cursor": cursor}
+        response = self.client.get("/api/sync/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def ids(self, rows):
+        return {row["id"] for row in rows}
+
+    def test_first_sync_is_full(self):
+        data = self.sync()
+        self.assertTrue(data["full"])
+        self.assertEqual(len(data["goals"]), 2)
+        self.assertEqual(len(data["tasks"]), 10)
+        self.assertEqual(len(data["prayers"]), 7)
+        self.assertNotIn("sub_goals", data["goals"][0])
+
+    def test_only_changes_since_cursor(self):
+        cursor = self.sync()["cursor"]
+        self.assertEqual(self.sync(cursor)["tasks"], [])
+
+        task = Task.objects.filter(sub_goal__goal=self.goal).first()
+        task.status = True
+        task.save()
+
+        data = self.sync(cursor)
+        self.assertFalse(data["full"])
+        self.assertEqual(self.ids(data["tasks"]), {str(task.pk)})
+        self.assertEqual(self.ids(data["sub_goals"]), {str(task.sub_goal_id)})
+        self.assertEqual(self.ids(data["goals"]), {str(self.goal.pk)})
+        self.assertEqual(data["goals"][0]["progress"], 25)
+        self.assertEqual(data["prayers"], [])
+
+    def test_deletions_leave_tombstones(self):
+        cursor = self.sync()["cursor"]
+        task = Task.objects.filter(sub_goal__goal=self.other_goal).first()
+        task_id, goal_id = str(task.pk), str(self.goal.pk)
+        task.delete()
+        self.goal.delete()
+
+        deleted = self.sync(cursor)["deleted"]
+        self.assertEqual(deleted["tasks"], [task_id])
+        # The goal's sub-goals and tasks went with it.
+        self.assertEqual(deleted["goals"], [goal_id])
+        self.assertEqual(deleted["sub_goals"], [])
+        self.assertEqual(Tombstone.objects.count(), 2)
+
+    def test_sub_goal_moved_to_another_user(self):
+        other = User.objects.create_user(username="bilal", password="pass")
+        other_goal = Goal.objects.create(user=other, name="Bilal's")
+        cursor = self.sync()["cursor"]
+        self.client.force_authenticate(other)
+        other_cursor = self.sync()["cursor"]
+
+        sub_goal = self.goal.sub_goals.first()
+        task_ids = {str(pk) for pk in sub_goal.tasks.values_list("pk", flat=True)}
+        sub_goal.goal = other_goal
+        sub_goal.save()
+
+        data = self.sync(other_cursor)
+        self.assertEqual(self.ids(data["tasks"]), task_ids)
+        self.assertEqual(self.ids(data["sub_goals"]), {str(sub_goal.pk)})
+        self.client.force_authenticate(self.user)
+        data = self.sync(cursor)
+        self.assertEqual(data["deleted"]["sub_goals"], [str(sub_goal.pk)])
+        self.assertEqual(data["tasks"], [])
+
+    def test_expired_cursor_gets_full_sync(self):
+        cursor = (timezone.now() - timedelta(days=365)).isoformat()
+        data = self.sync(cursor)
+        self.assertTrue(data["full"])
+        self.assertEqual(len(data["sub_goals"]), SubGoal.objects.count())
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/sync/", {"cursor": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+
+
+class ChangeEventTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.goal = make_goal(self.user, sub_goals=1, tasks_per_sub_goal=1)
+
+    def test_events_are_published_on_commit_to_the_owner(self):
+        task = Task.objects.get(sub_goal__goal=self.goal)
+        goal_id = str(self.goal.pk)
+        broker = mock.Mock()
+        with mock.patch("sync.events.get_broker", return_value=broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                task.status = False
+                task.save()
+                broker.publish.assert_not_called()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.goal.delete()
+
+        broker.publish.assert_has_calls([
+            mock.call(self.user.pk, {"action": "updated", "section": "tasks", "id": str(task.pk)}),
+            mock.call(self.user.pk, {"action": "deleted", "section": "goals", "id": goal_id}),
+        ])
+        self.assertEqual(broker.publish.call_count, 2)
+
+    async def stream(self, query_string, broker, headers=(), path="/api/events/"):
+        sent, incoming = asyncio.Queue(), asyncio.Queue()
+        scope = {"type": "http", "path": path, "query_string": query_string, "headers": list(headers)}
+        with mock.patch("sync.stream.get_broker", return_value=broker):
+            app = asyncio.ensure_future(asgi.application(scope, incoming.get, sent.put))
+            start = await asyncio.wait_for(sent.get(), 5)
+            return app, start, sent, incoming
+
+    async def test_stream_delivers_only_the_users_events(self):
+        broker = InMemoryBroker()
+        token = str(AccessToken.for_user(self.user))
+        app, start, sent, incoming = await self.stream(f"token={token}".encode(), broker)
+        self.assertEqual(start["status"], 200)
+        self.assertEqual((await sent.get())["body"], b": connected\n\n")
+        while not broker._subscribers:
+            await asyncio.sleep(0.01)
+
+        broker.publish(self.user.pk + 1, {"action": "created", "section": "goals", "id": "other"})
+        broker.publish(self.user.pk, {"action": "created", "section": "goals", "id": "mine"})
+        body = (await asyncio.wait_for(sent.get(), 5))["body"].decode()
+        self.assertTrue(body.startswith("event: change\ndata: "))
+        self.assertEqual(json.loads(body.split("data: ", 1)[1])["id"], "mine")
+
+        await incoming.put({"type": "http.disconnect"})
+        await asyncio.wait_for(app, 5)
+        self.assertEqual(broker._subscribers, {})
+
+    async def test_stream_requires_a_token(self):
+        app, start, sent, incoming = await self.stream(b"token=nope", InMemoryBroker())
+        await asyncio.wait_for(app, 5)
+        self.assertEqual(start["status"], 401)
+
+    async def test_asgi_serves_only_the_stream(self):
+        # The rest of the API is deployed on WSGI (see thimar_project/asgi.py).
+        token = str(AccessToken.for_user(self.user))
+        app, start, sent, incoming = await self.stream(
+            f"token={token}".encode(), InMemoryBroker(), path="/api/users/me/export/"
+        )
+        await asyncio.wait_for(app, 5)
+        self.assertEqual(start["status"], 404)
+
+    async def test_malformed_authorization_header(self):
+        headers = [(b"authorization", b"Bearer two parts")]
+        app, start, sent, incoming = await self.stream(b"", InMemoryBroker(), headers)
+        await asyncio.wait_for(app, 5)
+        self.assertEqual(start["status"], 401)
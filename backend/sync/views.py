@@ -0,0 +1,28 @@
+from django.utils.dateparse import parse_datetime
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .changes import collect_changes
+
+
+class SyncView(APIView):
+    """
+    Goals, sub-goals, tasks and prayers changed since ``?cursor=`` (the
+    ``cursor`` of the previous response), plus the ids deleted meanwhile.
+    Deleting a goal, sub-goal or prayer removes the tasks (and sub-goals)
+    under it, which are not listed separately. Without a cursor, or when
+    ``full`` is true, the response holds every row.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        since = request.query_params.get('cursor') or None
+        if since is not None:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None or since.tzinfo is None:
+                return Response({"cursor": ["Invalid cursor."]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(collect_changes(request.user, since))
@@ -0,0 +1,52 @@
+# tasks/agenda.py
+"""
+The day view: a user's prayers in time order, each with the tasks planned
+for it on a date, plus the tasks of that date not tied to a prayer.
+Recurring tasks appear through their occurrences on that date.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import quote_etag
+
+from .fastpath import PRAYER_FORMAT, TASK_FORMAT
+from .models import Prayer
+from .recurrence import DAILY_PRAYERS, expand, tasks_in_range
+
+
+def agenda_etag(user, day):
+    """
+    ETag of the agenda for ``day``, from the row count and latest
+    ``updated_at`` of the prayers and of the day's tasks: any insert,
+    update or delete of either changes one of them. Writing an occurrence
+    touches its task, so completions are covered too.
+    """
+    state = (
+        Prayer.objects.filter(user=user).aggregate(n=Count('pk'), latest=Max('updated_at')),
+        tasks_in_range(user, day, day).aggregate(n=Count('pk'), latest=Max('updated_at')),
+    )
+    digest = hashlib.sha1(repr(state).encode()).hexdigest()[:16]
+    return quote_etag(f"agenda-{day.isoformat()}-{digest}")
+
+
+def render_agenda(user, day):
+    """
+    One query for the prayers and one for the tasks, joined by id in memory
+    (plus one for stored occurrences when the day has recurring tasks).
+    """
+    prayers = []
+    by_prayer = {}
+    daily_prayer_ids = []
+    for row in Prayer.objects.filter(user=user).order_by('time').values(*PRAYER_FORMAT.columns):
+        prayer = PRAYER_FORMAT.render(row)
+        prayer['tasks'] = by_prayer[row['id']] = []
+        prayers.append(prayer)
+        if row['name'] in DAILY_PRAYERS:
+            daily_prayer_ids.append(row['id'])
+
+    unscheduled = []
+    rows = tasks_in_range(user, day, day).order_by('id').values(*TASK_FORMAT.columns)
+    for task in expand(user, rows, day, day, daily_prayer_ids):
+        by_prayer.get(task['prayer'], unscheduled).append(task)
+
+    return {'date': day.isoformat(), 'prayers': prayers, 'unscheduled': unscheduled}
@@ -0,0 +1,127 @@
+# tasks/bulk.py
+"""
+Many task edits in one request (drag and drop, multi-select).
+
+Ownership of the whole batch is checked with one query, the changes are
+written with one ``bulk_update`` in one transaction, and the work the
+per-task post_save handlers would do (progress counters, goal versions,
+daily rollups, list cache, change events) is done once per batch instead.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from analytics.rollup import add, apply_deltas, new_deltas, task_contribution
+from goals.cache import invalidate_user
+from goals.models import SubGoal
+from goals.progress import apply_task_delta
+from sync.events import publish_event
+from .models import Prayer, Priority, Task
+
+MAX_BULK_CHANGES = 500
+# Rows per UPDATE: each one is a CASE over its batch, which gets slow when long.
+BULK_UPDATE_BATCH = 100
+
+
+class TaskChangeSerializer(serializers.Serializer):
+    """One item of a bulk request: the task id and the fields to change."""
+    id = serializers.UUIDField()
+    status = serializers.BooleanField(required=False)
+    date = serializers.DateField(required=False)
+    priority = serializers.ChoiceField(choices=Priority.choices, required=False)
+    prayer = serializers.UUIDField(required=False, allow_null=True)
+    sub_goal = serializers.UUIDField(required=False)
+
+
+def _owned_ids(queryset, ids):
+    if not ids:
+        return set()
+    return set(queryset.filter(pk__in=ids).values_list('pk', flat=True))
+
+
+@transaction.atomic
+def apply_task_changes(user, items):
+    """
+    Apply ``items`` (dicts as accepted by TaskChangeSerializer) to the
+    user's tasks. Items that fail validation are skipped; the rest are
+    saved together. Returns one ``{"id", "ok"[, "errors"]}`` per item, in
+    order.
+    """
+    results = []
+    changes = []
+    for item in items:
+        serializer = TaskChangeSerializer(data=item)
+        if serializer.is_valid():
+            changes.append((len(results), serializer.validated_data))
+            results.append({'id': str(serializer.validated_data['id']), 'ok': True})
+        else:
+            item_id = item.get('id') if isinstance(item, dict) else None
+            results.append({'id': item_id, 'ok': False, 'errors': serializer.errors})
+
+    tasks = Task.objects.filter(
+        user=user, pk__in=[data['id'] for _, data in changes]
+    ).select_for_update(of=('self',)).in_bulk()
+    sub_goal_ids = _owned_ids(
+        SubGoal.objects.filter(goal__user=user),
+        {data['sub_goal'] for _, data in changes if 'sub_goal' in data},
+    )
+    prayer_ids = _owned_ids(
+        Prayer.objects.filter(user=user),
+        {data['prayer'] for _, data in changes if data.get('prayer')},
+    )
+
+    def fail(index, errors):
+        results[index]['ok'] = False
+        results[index]['errors'] = errors
+
+    now = timezone.now()
+    changed = {}
+    fields = {'updated_at'}
+    deltas = defaultdict(lambda: [0, 0])  # sub_goal_id -> [total, finished]
+    rollups = new_deltas()
+    for index, data in changes:
+        task = tasks.get(data['id'])
+        if task is None:
+            fail(index, {'id': ['Not found.']})
+            continue
+        if task.pk in changed:
+            fail(index, {'id': ['Appears more than once in the batch.']})
+            continue
+        if 'sub_goal' in data and data['sub_goal'] not in sub_goal_ids:
+            fail(index, {'sub_goal': ['Not found.']})
+            continue
+        if data.get('prayer') and data['prayer'] not in prayer_ids:
+            fail(index, {'prayer': ['Not found.']})
+            continue
+
+        old_sub_goal_id, old_status = task.sub_goal_id, int(task.status)
+        add(rollups, task_contribution(*task.rollup_fields()), -1)
+        for name, value in data.items():
+            if name == 'id':
+                continue
+            attname = Task._meta.get_field(name).attname
+            setattr(task, attname, value)
+            fields.add(attname)
+        task.updated_at = now
+        new_status = int(task.status)
+        add(rollups, task_contribution(*task.rollup_fields()), 1)
+
+        deltas[old_sub_goal_id][0] -= 1
+        deltas[old_sub_goal_id][1] -= old_status
+        deltas[task.sub_goal_id][0] += 1
+        deltas[task.sub_goal_id][1] += new_status
+        changed[task.pk] = task
+
+    if changed:
+        Task.objects.bulk_update(changed.values(), sorted(fields), batch_size=BULK_UPDATE_BATCH)
+        # Also bumps the version of every goal touched, even without a
+        # counter change (a moved date still changes the goal's tree).
+        for sub_goal_id, (total, finished) in deltas.items():
+            apply_task_delta(sub_goal_id, total=total, finished=finished)
+        apply_deltas(rollups)
+        invalidate_user(user.pk)
+        for task_id in changed:
+            publish_event(user.pk, 'updated', 'tasks', task_id)
+    return results
@@ -0,0 +1,135 @@
+# tasks/fastpath.py
+"""
+Read-only serialization straight from ``values()`` rows.
+
+``RowFormat`` mirrors the output of a ModelSerializer (same keys, same order,
+same value types) without instantiating serializers or fields per object, so
+list endpoints can render thousands of rows cheaply. Fields that are not
+plain model columns (``progress``, nested lists) are passed in by the caller.
+"""
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework.response import Response
+
+from .serializers import PrayerSerializer, TaskSerializer
+
+
+def _datetime(value):
+    # Same as rest_framework.fields.DateTimeField.to_representation.
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _isoformat(value):
+    return value if isinstance(value, str) else value.isoformat()
+
+
+def _formatter(model_field):
+    if model_field.is_relation:
+        return None  # PrimaryKeyRelatedField renders the raw pk
+    if isinstance(model_field, models.UUIDField):
+        return str
+    if isinstance(model_field, models.DateTimeField):
+        return _datetime
+    if isinstance(model_field, (models.DateField, models.TimeField)):
+        return _isoformat
+    return None
+
+
+class RowFormat:
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def fields(self):
+        """``[(name, formatter, is_column), ...]`` in serializer order."""
+        serializer = self.serializer_class()
+        model = serializer.Meta.model
+        fields = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                model_field = None
+            if model_field is None or not model_field.concrete:
+                fields.append((name, None, False))
+            else:
+                fields.append((name, _formatter(model_field), True))
+        return fields
+
+    @cached_property
+    def columns(self):
+        """Names to pass to ``values()``."""
+        return [name for name, _, is_column in self.fields if is_column]
+
+    def render(self, row, extra=None, only=None):
+        """
+        Build the representation of one ``values()`` row. Computed fields
+        come from ``extra`` and are left out when missing from it; ``only``
+        restricts the output to the given names.
+        """
+        data = {}
+        for name, formatter, is_column in self.fields:
+            if only is not None and name not in only:
+                continue
+            if not is_column:
+                if extra is not None and name in extra:
+                    data[name] = extra[name]
+                continue
+            value = row[name]
+            if value is not None and formatter is not None:
+                value = formatter(value)
+            data[name] = value
+        return data
+
+    def render_all(self, rows):
+        return [self.render(row) for row in rows]
+
+
+TASK_FORMAT = RowFormat(TaskSerializer)
+PRAYER_FORMAT = RowFormat(PrayerSerializer)
+
+
+def tasks_by_sub_goal(queryset):
+    """Render tasks and group them by sub-goal id in a single pass."""
+    grouped = {}
+    render = TASK_FORMAT.render
+    for row in queryset.values(*TASK_FORMAT.columns):
+        grouped.setdefault(row['sub_goal'], []).append(render(row))
+    return grouped
+
+
+class FastListMixin:
+    """
+    For ListAPIView subclasses: serve GET list requests from ``values()``
+    rows rendered by ``render_rows`` instead of the serializer. Pagination
+    works as before, on the rows queryset.
+
+    ``row_format`` (a RowFormat) is required; by default the rows are
+    ``get_queryset()`` values rendered with it.
+    """
+    row_format = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not isinstance(cls.row_format, RowFormat):
+            raise ImproperlyConfigured(f"{cls.__name__} must set row_format to a RowFormat.")
+
+    def get_list_rows(self):
+        return self.get_queryset().values(*self.row_format.columns)
+
+    def render_rows(self, rows):
+        return self.row_format.render_all(rows)
+
+    def list(self, request, *args, **kwargs):
+        rows = self.get_list_rows()
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.render_rows(page))
+        return Response(self.render_rows(rows))
@@ -0,0 +1,56 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from goals.models import Goal, SubGoal
+from tasks.models import Task
+from tasks.views import TaskBulkUpdateView, TaskDetailView
+from thimar_project.benchmarking import bench_user, rolled_back
+
+
+class Command(BaseCommand):
+    help = "Compare task updates per second through per-task PATCH and the bulk endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=500)
+        parser.add_argument('--sub-goals', type=int, default=5)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        with rolled_back():
+            user = bench_user()
+            goal = Goal.objects.create(user=user, name="bench")
+            sub_goals = SubGoal.objects.bulk_create(
+                SubGoal(goal=goal, name=f"sub {i}") for i in range(options['sub_goals'])
+            )
+            tasks = Task.objects.bulk_create(
+                Task(sub_goal=sub_goals[i % len(sub_goals)], user=user, name=f"task {i}", date=date(2025, 1, 1))
+                for i in range(options['tasks'])
+            )
+            self.stdout.write(f"{len(tasks)} tasks over {len(sub_goals)} sub-goals")
+
+            detail = TaskDetailView.as_view()
+            start = time.perf_counter()
+            for task in tasks:
+                request = factory.patch(f'/api/tasks/{task.pk}/', {'status': True}, format='json')
+                force_authenticate(request, user=user)
+                response = detail(request, pk=task.pk)
+                assert response.status_code == 200, response.data
+            self.report("per-task PATCH", len(tasks), time.perf_counter() - start)
+
+            bulk = TaskBulkUpdateView.as_view()
+            changes = [{'id': str(task.pk), 'status': False} for task in tasks]
+            start = time.perf_counter()
+            request = factory.post('/api/tasks/bulk/', {'changes': changes}, format='json')
+            force_authenticate(request, user=user)
+            response = bulk(request)
+            assert response.status_code == 200 and all(r['ok'] for r in response.data['results'])
+            self.report("bulk", len(tasks), time.perf_counter() - start)
+
+            goal.refresh_from_db()
+            assert goal.finished_tasks == 0, goal.finished_tasks
+
+    def report(self, label, count, seconds):
+        self.stdout.write(f"{label:<16} {seconds * 1000:9.1f} ms   {count / seconds:9.0f} tasks/s")
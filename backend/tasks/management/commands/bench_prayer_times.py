@@ -0,0 +1,122 @@
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from praytimes import PrayTimes
+
+from tasks import prayer_cache, timetable
+from tasks.models import Prayer
+from tasks.prayer_times import METHODS, TIME_NAMES, compute_times, minutes_of_day
+from tasks.utils import PRAYER_NAMES, update_prayer_times
+from thimar_project.benchmarking import rolled_back, summarize, timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the vectorized prayer-time engine against the praytimes library, the daily update "
+        "and timetable ranges."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000_000)
+        parser.add_argument('--sample', type=int, default=10_000, help="Locations computed with praytimes.")
+        parser.add_argument('--cities', type=int, default=5_000, help="Places the users of the cache run live in.")
+        parser.add_argument('--db-users', type=int, default=100_000, help="Users seeded for the daily update.")
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        users = options['users']
+        latitudes = rng.uniform(-60, 60, users)
+        longitudes = rng.uniform(-180, 180, users)
+        day = date.today()
+
+        def engine():
+            return {name: minutes_of_day(hours) for name, hours in compute_times(latitudes, longitudes, day).items()}
+
+        self.stdout.write(f"engine, {users} users:       {summarize(timed(engine, options['repeat']))}")
+
+        sample = options['sample']
+        computed = engine()
+        worst = 0
+        started = time.perf_counter()
+        for index in range(sample):
+            calculator = PrayTimes()
+            calculator.adjust({'maghrib': '0 min', 'midnight': 'Standard', **METHODS['MWL']})
+            expected = calculator.getTimes(day, (latitudes[index], longitudes[index]), 0)
+            for name in TIME_NAMES:
+                minutes = int(expected[name][:2]) * 60 + int(expected[name][3:])
+                gap = abs(minutes - int(computed[name][index]))
+                worst = max(worst, min(gap, 1440 - gap))
+        per_user = (time.perf_counter() - started) / sample
+        self.stdout.write(
+            f"praytimes, {sample} users:      {per_user * 1000:.3f} ms per user, "
+            f"{per_user * users:.1f} s for {users}; largest difference {worst} min"
+        )
+
+        # Users clustered around cities, as they are: the cache computes
+        # each cell once, then serves everyone in it.
+        cities = rng.integers(0, options['cities'], users)
+        city_latitudes = rng.uniform(-60, 60, options['cities'])
+        city_longitudes = rng.uniform(-180, 180, options['cities'])
+        clustered = (
+            city_latitudes[cities] + rng.uniform(-0.004, 0.004, users),
+            city_longitudes[cities] + rng.uniform(-0.004, 0.004, users),
+        )
+        prayer_cache.local_cache.clear()
+        for label in ('cold', 'warm'):
+            started = time.perf_counter()
+            prayer_cache.prayer_minutes(*clustered, day)
+            self.stdout.write(
+                f"cache {label}, {users} users:   {(time.perf_counter() - started) * 1000:8.2f} ms, "
+                f"{len(prayer_cache.local_cache)} cells"
+            )
+
+        with rolled_back():
+            User = get_user_model()
+            pyrng = random.Random(0)
+            seeded = User.objects.bulk_create(
+                (
+                    User(username=f"bench-{i}", latitude=pyrng.uniform(-60, 60), longitude=pyrng.uniform(-180, 180))
+                    for i in range(options['db_users'])
+                ),
+                batch_size=5000,
+            )
+            Prayer.objects.bulk_create(
+                (Prayer(user=user, name=name, time='00:00') for user in seeded for name in PRAYER_NAMES.values()),
+                batch_size=5000,
+            )
+            bench_users = User.objects.filter(username__startswith='bench-')
+            with CaptureQueriesContext(connection) as queries:
+                update_prayer_times(bench_users, day)
+            days = iter(day + timedelta(days=i) for i in range(1, options['repeat'] + 1))
+            timings = timed(lambda: update_prayer_times(bench_users, next(days)), options['repeat'])
+            self.stdout.write(
+                f"daily update, {options['db_users']} users: {summarize(timings)}, "
+                f"{len(queries)} statements"
+            )
+
+        # A month of the timetable: stored yearly tables against the engine
+        # run for each request.
+        month_end = day + timedelta(days=29)
+        latitude, longitude = float(latitudes[0]), float(longitudes[0])
+        with rolled_back():
+            started = time.perf_counter()
+            timetable.timetable_range(latitude, longitude, day, month_end)
+            self.stdout.write(f"timetable build, 1 place:    {(time.perf_counter() - started) * 1000:8.2f} ms")
+            stored = timed(lambda: timetable.timetable_range(latitude, longitude, day, month_end), options['repeat'])
+            self.stdout.write(f"timetable month, stored:     {summarize(stored)}")
+        month = np.arange(np.datetime64(day), np.datetime64(month_end) + 1)
+
+        def on_the_fly():
+            computed = compute_times(latitude, longitude, month)
+            return {name: minutes_of_day(hours) for name, hours in computed.items()}
+
+        self.stdout.write(f"timetable month, computed:   {summarize(timed(on_the_fly, options['repeat']))}")
+        row = next(iter(timetable.build([0], day.year).values()))
+        self.stdout.write(f"timetable row:               {len(row)} bytes")
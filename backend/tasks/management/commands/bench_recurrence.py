@@ -0,0 +1,66 @@
+import random
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from goals.models import Goal, SubGoal
+from tasks.fastpath import TASK_FORMAT
+from tasks.models import Recurrence, Task, TaskOccurrence
+from tasks.recurrence import expand, tasks_in_range
+from thimar_project.benchmarking import bench_user, rolled_back, summarize, timed
+
+
+class Command(BaseCommand):
+    help = "Time reading a month of occurrences for a user with many daily repeating tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recurring', type=int, default=50)
+        parser.add_argument('--history', type=int, default=20_000, help="One-off tasks spread over three years.")
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        date_from = date.today().replace(day=1)
+        date_to = date_from + timedelta(days=options['days'] - 1)
+        with rolled_back():
+            user = bench_user()
+            sub_goal = SubGoal.objects.create(goal=Goal.objects.create(user=user, name="bench"), name="bench")
+            recurring = Task.objects.bulk_create(
+                Task(
+                    sub_goal=sub_goal, user=user, name=f"daily {i}", date=date_from - timedelta(days=365),
+                    recurrence=Recurrence.DAILY, repeat=True,
+                )
+                for i in range(options['recurring'])
+            )
+            Task.objects.bulk_create(
+                (
+                    Task(sub_goal=sub_goal, user=user, name=f"once {i}", date=date_to - timedelta(days=rng.randrange(3 * 365)))
+                    for i in range(options['history'])
+                ),
+                batch_size=5000,
+            )
+            # Half of this month's occurrences ticked off so far.
+            TaskOccurrence.objects.bulk_create(
+                TaskOccurrence(task=task, date=date_from + timedelta(days=day), status=True)
+                for task in recurring
+                for day in range(0, options['days'], 2)
+            )
+
+            def read():
+                rows = tasks_in_range(user, date_from, date_to).values(*TASK_FORMAT.columns)
+                return expand(user, rows, date_from, date_to)
+
+            with CaptureQueriesContext(connection) as queries:
+                occurrences = read()
+            rows_read = (
+                tasks_in_range(user, date_from, date_to).count()
+                + TaskOccurrence.objects.filter(task__user=user, date__range=(date_from, date_to)).count()
+            )
+            self.stdout.write(
+                f"{options['recurring']} daily tasks, {options['history']} one-off tasks, {options['days']} days: "
+                f"{len(occurrences)} occurrences from {rows_read} rows in {len(queries)} queries"
+            )
+            self.stdout.write(f"expand: {summarize(timed(read, options['repeat']))}")
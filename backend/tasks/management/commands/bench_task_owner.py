@@ -0,0 +1,79 @@
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from goals.models import Goal, SubGoal
+from tasks.models import Task
+from thimar_project.benchmarking import rolled_back, summarize, timed
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the task list queries filtered through sub-goal and goal "
+        "with the same queries on Task.user, with their plans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--tasks-per-user', type=int, default=2000)
+        parser.add_argument('--sub-goals', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        start = date(2025, 1, 1)
+        with rolled_back():
+            users = User.objects.bulk_create(
+                User(username=f"bench-owner-{i}") for i in range(options['users'])
+            )
+            goals = Goal.objects.bulk_create(Goal(user=user, name="bench") for user in users)
+            sub_goals = SubGoal.objects.bulk_create(
+                SubGoal(goal=goal, name=f"sub {j}") for goal in goals for j in range(options['sub_goals'])
+            )
+            by_user = {}
+            for sub_goal in sub_goals:
+                by_user.setdefault(sub_goal.goal.user_id, []).append(sub_goal)
+            Task.objects.bulk_create(
+                (
+                    Task(
+                        sub_goal=rng.choice(by_user[user.pk]),
+                        user=user,
+                        name=f"task {i}",
+                        date=start + timedelta(days=rng.randrange(365)),
+                    )
+                    for user in users for i in range(options['tasks_per_user'])
+                ),
+                batch_size=5000,
+            )
+            self.stdout.write(f"Seeded {Task.objects.count()} tasks for {len(users)} users")
+
+            user = users[len(users) // 2]
+            week = (date(2025, 6, 2), date(2025, 6, 8))
+            cases = [
+                ("all tasks", lambda tasks: tasks.order_by('date', 'id')),
+                ("first page (50)", lambda tasks: tasks.order_by('date', 'id')[:51]),
+                ("one week", lambda tasks: tasks.filter(date__range=week).order_by('date', 'id')),
+            ]
+            filters = [
+                ("via goal", Task.objects.filter(sub_goal__goal__user=user)),
+                ("on user", Task.objects.filter(user=user)),
+            ]
+            for label, shape in cases:
+                for how, tasks in filters:
+                    queryset = shape(tasks).values()
+                    timings = timed(lambda: list(queryset.all()), options['repeat'])
+                    self.stdout.write(f"{label:<16} {how:<9} {summarize(timings)}")
+                    for line in self.explain(queryset):
+                        self.stdout.write(f"    {line}")
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        prefix = 'EXPLAIN ' if connection.vendor == 'postgresql' else 'EXPLAIN QUERY PLAN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
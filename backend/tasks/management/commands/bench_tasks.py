@@ -0,0 +1,70 @@
+import random
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from goals.models import Goal, SubGoal
+from tasks.models import Priority, Task
+from tasks.views import TaskListCreateView
+from thimar_project.benchmarking import bench_user, rolled_back, summarize, timed
+
+
+class Command(BaseCommand):
+    help = "Time the task list for a user with a long task history, whole and filtered."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=50_000)
+        parser.add_argument('--sub-goals', type=int, default=50)
+        parser.add_argument('--days', type=int, default=3 * 365)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        today = date.today()
+        days = options['days']
+        rng = random.Random(0)
+        with rolled_back():
+            user = bench_user()
+            goal = Goal.objects.create(user=user, name="bench goal")
+            sub_goals = SubGoal.objects.bulk_create(
+                SubGoal(goal=goal, name=f"sub {i}") for i in range(options['sub_goals'])
+            )
+            Task.objects.bulk_create(
+                (
+                    Task(
+                        sub_goal=rng.choice(sub_goals),
+                        user=user,
+                        name=f"task {i}",
+                        date=today - timedelta(days=rng.randrange(days)),
+                        status=rng.random() < 0.8,
+                        priority=rng.choice(Priority.values),
+                    )
+                    for i in range(options['tasks'])
+                ),
+                batch_size=5000,
+            )
+            self.stdout.write(f"Seeded {options['tasks']} tasks over {days} days")
+
+            week_start = today - timedelta(days=today.weekday())
+            cases = [
+                ("everything", {}),
+                ("first page (50)", {'cursor': ''}),
+                ("today", {'date_from': today, 'date_to': today}),
+                ("this week", {'date_from': week_start, 'date_to': week_start + timedelta(days=6)}),
+                ("this week, open, urgent", {
+                    'date_from': week_start, 'date_to': week_start + timedelta(days=6),
+                    'status': 'false', 'priority': Priority.URGENT,
+                }),
+            ]
+            view = TaskListCreateView.as_view()
+            factory = APIRequestFactory()
+            for label, params in cases:
+                timings = timed(lambda: self.get(view, factory, user, params), options['repeat'])
+                self.stdout.write(f"{label:<26} {summarize(timings)}")
+
+    def get(self, view, factory, user, params):
+        request = factory.get('/api/tasks/', params)
+        force_authenticate(request, user=user)
+        response = view(request)
+        assert response.status_code == 200, response.data
+        return response
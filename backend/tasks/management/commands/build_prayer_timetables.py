@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.models import PrayerTimetable
+from tasks.timetable import BUILD_BATCH, ensure_timetables, located_cells
+
+
+class Command(BaseCommand):
+    help = "Precompute the yearly prayer timetables of every place a user lives in."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, action='append', help="Defaults to this year and the next.")
+
+    def handle(self, *args, **options):
+        this_year = timezone.now().year
+        years = options['year'] or [this_year, this_year + 1]
+        cells = located_cells(get_user_model().objects.all())
+        for year in years:
+            before = PrayerTimetable.objects.filter(year=year).count()
+            for start in range(0, len(cells), BUILD_BATCH):
+                ensure_timetables(cells[start:start + BUILD_BATCH], year)
+            built = PrayerTimetable.objects.filter(year=year).count() - before
+            self.stdout.write(f"{year}: {len(cells)} places, {built} timetables built")
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['date', 'id'], name='task_date_id_idx'),
+        ),
+    ]
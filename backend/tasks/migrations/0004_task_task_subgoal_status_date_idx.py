@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_task_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['sub_goal', 'status', 'date'], name='task_subgoal_status_date_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:57
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def merge_duplicate_prayers(apps, schema_editor):
+    """
+    Keep the most recently updated prayer of each (user, name) pair, move
+    the tasks of the others onto it and delete them.
+    """
+    Prayer = apps.get_model('tasks', 'Prayer')
+    Task = apps.get_model('tasks', 'Task')
+
+    duplicated = (
+        Prayer.objects.values('user_id', 'name')
+        .annotate(n=Count('pk'))
+        .filter(n__gt=1)
+    )
+    for pair in duplicated:
+        prayers = list(
+            Prayer.objects.filter(user_id=pair['user_id'], name=pair['name'])
+            .order_by('-updated_at', '-created_at')
+            .values_list('pk', flat=True)
+        )
+        keep, extra = prayers[0], prayers[1:]
+        Task.objects.filter(prayer_id__in=extra).update(prayer_id=keep)
+        Prayer.objects.filter(pk__in=extra).delete()
+
+
+class Migration(migrations.Migration):
+    # The constraint is added by the next migration: on PostgreSQL the
+    # deleted rows leave deferred FK checks pending until this one commits.
+
+    dependencies = [
+        ('tasks', '0004_task_task_subgoal_status_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_prayers, migrations.RunPython.noop),
+    ]
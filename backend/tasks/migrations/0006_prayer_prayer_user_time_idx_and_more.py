@@ -0,0 +1,29 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_merge_duplicate_prayers'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prayer',
+            index=models.Index(fields=['user', 'time'], name='prayer_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['sub_goal', 'date', 'id'], name='task_subgoal_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['prayer', 'date', 'id'], name='task_prayer_date_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='prayer',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='prayer_user_name_uniq'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.1.13 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_prayer_prayer_user_time_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['sub_goal', 'updated_at'], name='task_subgoal_updated_idx'),
+        ),
+    ]
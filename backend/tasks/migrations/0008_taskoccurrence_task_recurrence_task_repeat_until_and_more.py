@@ -0,0 +1,67 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def repeat_daily(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(repeat=True).update(recurrence='daily')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_updated_at_task_task_subgoal_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskOccurrence',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('status', models.BooleanField(default=False)),
+                ('skipped', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence',
+            field=models.CharField(blank=True, choices=[('', 'None'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('prayers', 'After each prayer')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='repeat_until',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('recurrence', ''), _negated=True), fields=['sub_goal', 'date'], name='task_recurring_idx'),
+        ),
+        migrations.AddField(
+            model_name='taskoccurrence',
+            name='prayer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='tasks.prayer'),
+        ),
+        migrations.AddField(
+            model_name='taskoccurrence',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='tasks.task'),
+        ),
+        migrations.AddIndex(
+            model_name='taskoccurrence',
+            index=models.Index(fields=['task', 'date'], name='occurrence_task_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskoccurrence',
+            constraint=models.UniqueConstraint(condition=models.Q(('prayer__isnull', True)), fields=('task', 'date'), name='occurrence_task_date_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskoccurrence',
+            constraint=models.UniqueConstraint(condition=models.Q(('prayer__isnull', False)), fields=('task', 'date', 'prayer'), name='occurrence_task_date_prayer_uniq'),
+        ),
+        migrations.RunPython(repeat_daily, migrations.RunPython.noop),
+    ]
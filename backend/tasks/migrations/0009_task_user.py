@@ -0,0 +1,43 @@
+# Generated by Django 4.1.13 on 2026-10-18 09:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_task_owners(apps, schema_editor):
+    """Set each task's user to the owner of its sub-goal's goal, in one UPDATE."""
+    Task = apps.get_model('tasks', 'Task')
+    SubGoal = apps.get_model('goals', 'SubGoal')
+    Task.objects.update(
+        user_id=models.Subquery(
+            SubGoal.objects.filter(pk=models.OuterRef('sub_goal_id')).values('goal__user_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    # NOT NULL and the new indexes come in the next migration, once every
+    # row has a value (and, on PostgreSQL, this UPDATE has committed).
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0016_subgoal_subgoal_goal_created_id_idx'),
+        ('tasks', '0008_taskoccurrence_task_recurrence_task_repeat_until_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='user',
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='tasks',
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(copy_task_owners, migrations.RunPython.noop),
+    ]
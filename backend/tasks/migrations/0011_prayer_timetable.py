@@ -0,0 +1,29 @@
+# Generated by Django 4.1.13 on 2026-10-18 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_user_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrayerTimetable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=20)),
+                ('precision', models.PositiveSmallIntegerField()),
+                ('cell', models.BigIntegerField()),
+                ('year', models.PositiveSmallIntegerField()),
+                ('minutes', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='prayertimetable',
+            constraint=models.UniqueConstraint(fields=('method', 'precision', 'cell', 'year'), name='prayer_timetable_cell_year_uniq'),
+        ),
+    ]
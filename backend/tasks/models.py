@@ -21,10 +21,45 @@ class Prayer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='prayer_user_name_uniq'),
+        ]
+        indexes = [
+            # A user's prayers in the order of the day.
+            models.Index(fields=['user', 'time'], name='prayer_user_time_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.time}) for {self.user}"
 
 
+class PrayerTimetable(models.Model):
+    """
+    A year of computed prayer times for one grid cell of tasks/prayer_cache.py,
+    shared by everyone who lives in it. ``minutes`` packs them as
+    little-endian unsigned 16-bit minutes after midnight UTC: one run of 366
+    days per time, in the order of prayer_times.TIME_NAMES, 0xFFFF where a
+    time is undefined (and for the last day of a common year).
+    """
+    method = models.CharField(max_length=20)
+    precision = models.PositiveSmallIntegerField()
+    cell = models.BigIntegerField()
+    year = models.PositiveSmallIntegerField()
+    minutes = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['method', 'precision', 'cell', 'year'], name='prayer_timetable_cell_year_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.method} timetable of cell {self.cell} for {self.year}"
+
+
 # tasks model
 class Priority(models.TextChoices):
     LOW = "Low", "Low"
@@ -32,6 +67,12 @@ class Priority(models.TextChoices):
     HIGH = "High", "High"
     URGENT = "Urgent", "Urgent"
 
+class Recurrence(models.TextChoices):
+    NONE = "", "None"
+    DAILY = "daily", "Daily"
+    WEEKLY = "weekly", "Weekly"
+    PRAYERS = "prayers", "After each prayer"
+
 class Task(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
@@ -48,6 +89,17 @@ class Task(models.Model):
         'tasks.Prayer', on_delete=models.CASCADE, related_name="tasks", blank=True, null=True
     )
 
+    # Owner of the sub-goal's goal, copied here so task queries filter on it
+    # directly instead of joining sub-goal and goal. Set by save() and kept
+    # in step by the sub-goal post_save handler; indexed through Meta.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tasks",
+        editable=False,
+        db_index=False
+    )
+
     priority = models.CharField(
         max_length=10,
         choices=Priority.choices,
@@ -56,8 +108,119 @@ class Task(models.Model):
 
     status = models.BooleanField(default=False)
     repeat = models.BooleanField(default=False)
+    # A recurring task is stored once, from ``date`` until ``repeat_until``;
+    # its occurrences are computed when read (tasks/recurrence.py) and only
+    # completions and exceptions are stored, as TaskOccurrence rows.
+    recurrence = models.CharField(
+        max_length=10,
+        choices=Recurrence.choices,
+        default=Recurrence.NONE,
+        blank=True
+    )
+    repeat_until = models.DateField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # A user's tasks by date: the list, its keyset pages and date filters.
+            models.Index(fields=['user', 'date', 'id'], name='task_user_date_id_idx'),
+            # A goal's completed tasks, newest first.
+            models.Index(fields=['sub_goal', 'status', 'date'], name='task_subgoal_status_date_idx'),
+            # The task list filtered by ?sub_goal_id= or ?prayer_id=.
+            models.Index(fields=['sub_goal', 'date', 'id'], name='task_subgoal_date_id_idx'),
+            models.Index(fields=['prayer', 'date', 'id'], name='task_prayer_date_id_idx'),
+            # Delta sync: a user's tasks changed since a cursor.
+            models.Index(fields=['user', 'updated_at'], name='task_user_updated_idx'),
+            # Recurring tasks only, so expanding them never walks one-off history.
+            models.Index(
+                fields=['user', 'date'],
+                name='task_user_recurring_idx',
+                condition=~models.Q(recurrence=''),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.get_priority_display()}"
+
+    def save(self, *args, **kwargs):
+        # ``repeat`` predates recurrence rules and still means "daily".
+        if self.repeat and not self.recurrence:
+            self.recurrence = Recurrence.DAILY
+        self.repeat = bool(self.recurrence)
+        if self._state.adding or self.sub_goal_id != getattr(self, '_loaded_sub_goal_id', None):
+            self.user_id = (
+                SubGoal.objects.filter(pk=self.sub_goal_id).values_list('goal__user_id', flat=True).first()
+            )
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'user' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'user']
+        super().save(*args, **kwargs)
+
+    _rollup_attnames = {'user_id', 'date', 'sub_goal_id', 'prayer_id', 'status', 'recurrence'}
+
+    def rollup_fields(self):
+        """What analytics.rollup.task_contribution needs to know about the task."""
+        return self.user_id, self.date, self.sub_goal_id, self.prayer_id, self.status, self.recurrence
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot of the fields the goal progress counters and the daily
+        # rollups depend on, so the post_save handlers can apply the
+        # difference instead of recounting.
+        instance._loaded_sub_goal_id = instance.__dict__.get('sub_goal_id')
+        instance._loaded_status = instance.__dict__.get('status')
+        if cls._rollup_attnames.issubset(instance.__dict__):
+            instance._loaded_rollup = instance.rollup_fields()
+        return instance
     
 
+
+class TaskOccurrence(models.Model):
+    """
+    A completed or skipped occurrence of a recurring task. Occurrences with
+    neither have no row. ``prayer`` is set for the "after each prayer" rule,
+    which has one occurrence per prayer and day.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="occurrences")
+    date = models.DateField()
+    prayer = models.ForeignKey(
+        'tasks.Prayer', on_delete=models.CASCADE, related_name="occurrences", blank=True, null=True
+    )
+    status = models.BooleanField(default=False)
+    skipped = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['task', 'date'],
+                condition=models.Q(prayer__isnull=True),
+                name='occurrence_task_date_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['task', 'date', 'prayer'],
+                condition=models.Q(prayer__isnull=False),
+                name='occurrence_task_date_prayer_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['task', 'date'], name='occurrence_task_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} on {self.date}"
+
+    _rollup_attnames = {'date', 'prayer_id', 'status', 'skipped'}
+
+    def rollup_fields(self):
+        """What analytics.rollup.occurrence_contribution needs besides the task."""
+        return self.date, self.prayer_id, self.status, self.skipped
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls._rollup_attnames.issubset(instance.__dict__):
+            instance._loaded_rollup = instance.rollup_fields()
+        return instance
@@ -0,0 +1,148 @@
+# tasks/prayer_cache.py
+"""
+Prayer times shared by everyone in the same place.
+
+Locations are snapped to a grid of ``PRAYER_TIME_BUCKET_PRECISION`` decimal
+places (2 is about a kilometre, a few seconds of difference), and the times
+of a (cell, date, method) are computed once, at the cell's centre, with one
+engine call for all the cells a batch is missing. Computed cells are kept
+in a per-process LRU of ``PRAYER_TIME_CACHE_SIZE`` entries and, when
+``PRAYER_TIME_SHARED_CACHE`` is on (the default with Redis), in the Django
+cache so that the web and worker processes share them.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .prayer_times import TIME_NAMES, compute_times, minutes_of_day
+
+BUCKET_PRECISION = getattr(settings, 'PRAYER_TIME_BUCKET_PRECISION', 2)
+LOCAL_CACHE_SIZE = getattr(settings, 'PRAYER_TIME_CACHE_SIZE', 50_000)
+SHARED_CACHE = getattr(settings, 'PRAYER_TIME_SHARED_CACHE', False)
+# Entries are per date, so they only need to outlive the day.
+SHARED_CACHE_TIMEOUT = 60 * 60 * 48
+
+HITS_KEY = 'prayers:times:hits'
+MISSES_KEY = 'prayers:times:misses'
+
+
+class LRUCache:
+    """A thread-safe mapping that forgets the least recently used keys past ``size``."""
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+local_cache = LRUCache(LOCAL_CACHE_SIZE)
+
+
+def buckets(latitudes, longitudes, precision=BUCKET_PRECISION):
+    """
+    The grid cells of the locations, each packed into one integer (the
+    latitude cell times the width of a row of longitude cells, plus the
+    longitude cell) so that they sort and compare as plain numbers.
+    """
+    scale = 10 ** precision
+    latitude = np.round(np.asarray(latitudes, dtype=float) * scale).astype(np.int64).reshape(-1)
+    longitude = np.round(np.asarray(longitudes, dtype=float) * scale).astype(np.int64).reshape(-1)
+    return (latitude + 90 * scale) * (360 * scale + 1) + longitude + 180 * scale
+
+
+def cell_centres(cells, precision=BUCKET_PRECISION):
+    """``(latitudes, longitudes)`` of the cells' centres."""
+    scale = 10 ** precision
+    latitude, longitude = np.divmod(cells, 360 * scale + 1)
+    return (latitude - 90 * scale) / scale, (longitude - 180 * scale) / scale
+
+
+def _key(method, day, precision, cell):
+    return f'prayers:times:{method}:{day.isoformat()}:{precision}:{cell}'
+
+
+def prayer_minutes(latitudes, longitudes, day, method='MWL', precision=BUCKET_PRECISION):
+    """
+    ``{name: minutes after midnight UTC}`` for each name in TIME_NAMES, one
+    entry per location (-1 where the time is undefined). Each distinct cell
+    is looked up once, and computed at most once.
+    """
+    cells, inverse = np.unique(buckets(latitudes, longitudes, precision), return_inverse=True)
+    keys = [_key(method, day, precision, cell) for cell in cells.tolist()]
+
+    found = {}
+    for key in keys:
+        value = local_cache.get(key)
+        if value is not None:
+            found[key] = value
+    missing = [key for key in keys if key not in found]
+    if missing and SHARED_CACHE:
+        for key, value in cache.get_many(missing).items():
+            local_cache.set(key, value)
+            found[key] = value
+        missing = [key for key in keys if key not in found]
+
+    if missing:
+        index = [i for i, key in enumerate(keys) if key not in found]
+        computed = compute_times(*cell_centres(cells[index], precision), day, method=method)
+        rows = np.stack([minutes_of_day(computed[name]) for name in TIME_NAMES], axis=1).tolist()
+        fresh = {keys[i]: tuple(row) for i, row in zip(index, rows)}
+        for key, value in fresh.items():
+            local_cache.set(key, value)
+        if SHARED_CACHE:
+            cache.set_many(fresh, SHARED_CACHE_TIMEOUT)
+        found.update(fresh)
+
+    locations = len(inverse.reshape(-1))
+    _count(MISSES_KEY, len(missing))
+    _count(HITS_KEY, locations - len(missing))
+    table = np.array([found[key] for key in keys], dtype=np.int32).reshape(-1, len(TIME_NAMES))
+    per_location = table[inverse.reshape(-1)]
+    return {name: per_location[:, i] for i, name in enumerate(TIME_NAMES)}
+
+
+def _count(key, delta):
+    if not delta:
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def cache_stats():
+    """Locations served from a cached cell (hits) against cells computed (misses)."""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0,
+        'cached_cells': len(local_cache),
+    }
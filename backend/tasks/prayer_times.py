@@ -0,0 +1,143 @@
+# tasks/prayer_times.py
+"""
+Prayer times for many locations at once.
+
+The astronomy of the ``praytimes`` library (praytimes.org) over NumPy
+arrays: one call computes Fajr to Isha for every ``(latitude, longitude,
+date)`` it is given, without a Python loop or a ``PrayTimes`` object per
+location. Times are hours after midnight at ``utc_offset``, NaN where the
+sun never reaches the angle and the high-latitude rule does not fill in.
+
+Minute-based settings (Makkah's "90 min" Isha) are added to the time they
+follow, as in the reference PrayTimes.js; the Python port subtracts them.
+"""
+import numpy as np
+
+# Fajr and Isha (and, for the Shia methods, Maghrib) as degrees below the
+# horizon, or as minutes after the previous time when a "N min" string.
+METHODS = {
+    'MWL': {'fajr': 18, 'isha': 17},
+    'ISNA': {'fajr': 15, 'isha': 15},
+    'Egypt': {'fajr': 19.5, 'isha': 17.5},
+    'Makkah': {'fajr': 18.5, 'isha': '90 min'},
+    'Karachi': {'fajr': 18, 'isha': 18},
+    'Tehran': {'fajr': 17.7, 'isha': 14, 'maghrib': 4.5},
+    'Jafari': {'fajr': 16, 'isha': 14, 'maghrib': 4},
+}
+ASR_FACTORS = {'Standard': 1, 'Hanafi': 2}
+HIGH_LATITUDE_RULES = ('NightMiddle', 'AngleBased', 'OneSeventh', 'None')
+TIME_NAMES = ('fajr', 'sunrise', 'dhuhr', 'asr', 'sunset', 'maghrib', 'isha')
+
+# Refraction and the sun's radius, at sea level.
+RISE_SET_ANGLE = 0.833
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+
+def _sin(degrees):
+    return np.sin(np.radians(degrees))
+
+
+def _cos(degrees):
+    return np.cos(np.radians(degrees))
+
+
+def _minutes(setting):
+    """The minutes of a "N min" setting, or None for an angle."""
+    if isinstance(setting, str) and 'min' in setting:
+        return float(setting.split('min')[0])
+    return None
+
+
+def _sun_position(julian_days):
+    """``(declination, equation of time)`` in degrees and hours."""
+    d = julian_days - 2451545.0
+    g = (357.529 + 0.98560028 * d) % 360
+    q = (280.459 + 0.98564736 * d) % 360
+    ecliptic_longitude = (q + 1.915 * _sin(g) + 0.020 * _sin(2 * g)) % 360
+    obliquity = 23.439 - 0.00000036 * d
+    right_ascension = np.degrees(
+        np.arctan2(_cos(obliquity) * _sin(ecliptic_longitude), _cos(ecliptic_longitude))
+    ) / 15.0
+    equation_of_time = q / 15.0 - right_ascension % 24
+    declination = np.degrees(np.arcsin(_sin(obliquity) * _sin(ecliptic_longitude)))
+    return declination, equation_of_time
+
+
+def compute_times(latitudes, longitudes, dates, method='MWL', utc_offset=0, asr='Standard',
+                  high_lats='NightMiddle'):
+    """
+    ``{name: hours}`` for each name in TIME_NAMES, arrays broadcast from
+    ``latitudes``, ``longitudes`` and ``dates`` (``datetime.date`` values or
+    anything ``numpy.datetime64`` accepts). ``utc_offset`` is in hours and
+    may be an array too.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown calculation method: {method!r}")
+    if high_lats not in HIGH_LATITUDE_RULES:
+        raise ValueError(f"Unknown high latitude rule: {high_lats!r}")
+    params = {'maghrib': '0 min', **METHODS[method]}
+    lat = np.asarray(latitudes, dtype=float)
+    lng = np.asarray(longitudes, dtype=float)
+    days = np.asarray(dates, dtype='datetime64[D]').astype(float)
+    julian_days = days + UNIX_EPOCH_JULIAN_DAY - lng / 360.0
+
+    def angle_time(angle, hour, before_noon=False):
+        # When the sun is ``angle`` degrees below the horizon, searched
+        # around ``hour``.
+        declination, equation_of_time = _sun_position(julian_days + hour / 24.0)
+        noon = (12 - equation_of_time) % 24
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cos_hour_angle = (-_sin(angle) - _sin(declination) * _sin(lat)) / (_cos(declination) * _cos(lat))
+            offset = np.degrees(np.arccos(cos_hour_angle)) / 15.0
+        return noon - offset if before_noon else noon + offset
+
+    declination, equation_of_time = _sun_position(julian_days + 13 / 24.0)
+    factor = ASR_FACTORS.get(asr, asr)
+    asr_angle = -np.degrees(np.arctan(1.0 / (factor + np.tan(np.radians(np.abs(lat - declination))))))
+
+    times = {
+        'fajr': angle_time(params['fajr'], 5, before_noon=True),
+        'sunrise': angle_time(RISE_SET_ANGLE, 6, before_noon=True),
+        'dhuhr': (12 - _sun_position(julian_days + 0.5)[1]) % 24,
+        'asr': angle_time(asr_angle, 13),
+        'sunset': angle_time(RISE_SET_ANGLE, 18),
+    }
+    for name in ('maghrib', 'isha'):
+        if _minutes(params[name]) is None:
+            times[name] = angle_time(params[name], 18)
+    shift = utc_offset - lng / 15.0
+    times = {name: np.broadcast_to(value + shift, np.broadcast(lat, lng, days).shape).copy()
+             for name, value in times.items()}
+
+    if high_lats != 'None':
+        night = (times['sunrise'] - times['sunset']) % 24
+        for name, base, before in (('fajr', 'sunrise', True), ('isha', 'sunset', False), ('maghrib', 'sunset', False)):
+            if name not in times:
+                continue
+            if high_lats == 'AngleBased':
+                portion = night * float(params[name]) / 60.0
+            else:
+                portion = night * (1 / 7.0 if high_lats == 'OneSeventh' else 1 / 2.0)
+            time = times[name]
+            with np.errstate(invalid='ignore'):
+                gap = (times[base] - time) % 24 if before else (time - times[base]) % 24
+                late = np.isnan(time) | (gap > portion)
+            limit = times[base] - portion if before else times[base] + portion
+            times[name] = np.where(late, limit, time)
+
+    for name, after in (('maghrib', 'sunset'), ('isha', 'maghrib')):
+        minutes = _minutes(params[name])
+        if minutes is not None:
+            times[name] = times[after] + minutes / 60.0
+    return {name: times[name] for name in TIME_NAMES}
+
+
+def minutes_of_day(hours):
+    """
+    Whole minutes after midnight, rounded to the nearest minute as
+    ``praytimes`` formats them; -1 where the time is undefined.
+    """
+    hours = np.asarray(hours, dtype=float)
+    with np.errstate(invalid='ignore'):
+        minutes = np.floor((hours + 0.5 / 60) % 24 * 60)
+    return np.where(np.isnan(minutes), -1, minutes).astype(np.int32)
@@ -1,8 +1,10 @@
 from django.urls import path
-from .views import PrayerListCreateView, PrayerDetailView
+from .views import PrayerCacheStatsView, PrayerListCreateView, PrayerDetailView, PrayerTimetableView
 from .views import TaskListCreateView, TaskDetailView
 
 urlpatterns = [
     path('', PrayerListCreateView.as_view(), name='prayer-list-create'),
+    path('cache-stats/', PrayerCacheStatsView.as_view(), name='prayer-cache-stats'),
+    path('timetable/', PrayerTimetableView.as_view(), name='prayer-timetable'),
     path('<uuid:pk>/', PrayerDetailView.as_view(), name='prayer-detail'),
 ]
\ No newline at end of file
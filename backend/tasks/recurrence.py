@@ -0,0 +1,108 @@
+# tasks/recurrence.py
+"""
+Lazy expansion of recurring tasks.
+
+A recurring task is one row; reading a date range turns it into one
+occurrence per matching day (and, for the "after each prayer" rule, per
+daily prayer) in memory. The database is only asked for the recurring
+tasks active in the range and the TaskOccurrence rows (completions and
+exceptions) inside it, so a month of 50 daily tasks reads ~50 task rows
+plus whatever was ticked off, never one row per day.
+"""
+from datetime import timedelta
+
+from django.db.models import Q
+
+from .fastpath import TASK_FORMAT
+from .models import Prayer, Recurrence, Task, TaskOccurrence
+
+# The prayers an "after each prayer" task follows.
+DAILY_PRAYERS = ('Fajr', 'Dhuhr', 'Asr', 'Maghrib', 'Isha')
+
+
+def recurring_in_range(date_from, date_to):
+    """Q for recurring tasks with at least one day inside the range."""
+    return (
+        ~Q(recurrence=Recurrence.NONE)
+        & Q(date__lte=date_to)
+        & (Q(repeat_until__isnull=True) | Q(repeat_until__gte=date_from))
+    )
+
+
+def tasks_in_range(user, date_from, date_to):
+    """The user's one-off tasks dated in the range and recurring tasks active in it."""
+    return Task.objects.filter(user=user).filter(
+        Q(recurrence=Recurrence.NONE, date__gte=date_from, date__lte=date_to)
+        | recurring_in_range(date_from, date_to)
+    )
+
+
+def daily_prayer_ids(user):
+    return list(
+        Prayer.objects.filter(user=user, name__in=DAILY_PRAYERS).order_by('time').values_list('pk', flat=True)
+    )
+
+
+def occurrence_dates(start, until, recurrence, date_from, date_to):
+    """The days in [date_from, date_to] a task starting on ``start`` recurs on."""
+    first = max(start, date_from)
+    last = min(until, date_to) if until else date_to
+    step = 1
+    if recurrence == Recurrence.WEEKLY:
+        step = 7
+        first += timedelta(days=(start.weekday() - first.weekday()) % 7)
+    day = first
+    while day <= last:
+        yield day
+        day += timedelta(days=step)
+
+
+def is_occurrence(task, day, prayer_id, prayer_ids):
+    """True when ``(day, prayer_id)`` is one of ``task``'s occurrences."""
+    if not task.recurrence or not any(occurrence_dates(task.date, task.repeat_until, task.recurrence, day, day)):
+        return False
+    if task.recurrence == Recurrence.PRAYERS:
+        return prayer_id in prayer_ids
+    return prayer_id is None
+
+
+def expand(user, rows, date_from, date_to, prayer_ids=None):
+    """
+    Render task rows (``values(*TASK_FORMAT.columns)``, as returned by
+    ``tasks_in_range``) as occurrences: one-off tasks as they are, recurring
+    ones once per occurrence with ``date``, ``prayer`` and ``status`` of
+    that occurrence. Skipped occurrences are left out. Every item carries
+    ``recurring``. ``prayer_ids`` may be passed when the caller already has
+    ``daily_prayer_ids(user)``.
+    """
+    one_off, recurring = [], []
+    for row in rows:
+        (recurring if row['recurrence'] else one_off).append(row)
+
+    occurrences = [dict(TASK_FORMAT.render(row), recurring=False) for row in one_off]
+    if not recurring:
+        return occurrences
+
+    overrides = {
+        (task_id, day, prayer_id): (status, skipped)
+        for task_id, day, prayer_id, status, skipped in TaskOccurrence.objects.filter(
+            task__user=user, date__gte=date_from, date__lte=date_to
+        ).values_list('task_id', 'date', 'prayer_id', 'status', 'skipped')
+    }
+    if prayer_ids is None and any(row['recurrence'] == Recurrence.PRAYERS for row in recurring):
+        prayer_ids = daily_prayer_ids(user)
+
+    for row in recurring:
+        base = TASK_FORMAT.render(row)
+        per_prayer = row['recurrence'] == Recurrence.PRAYERS
+        slots = prayer_ids if per_prayer else [None]
+        for day in occurrence_dates(row['date'], row['repeat_until'], row['recurrence'], date_from, date_to):
+            for prayer_id in slots:
+                status, skipped = overrides.get((row['id'], day, prayer_id), (False, False))
+                if skipped:
+                    continue
+                occurrence = dict(base, date=day.isoformat(), status=status, recurring=True)
+                if per_prayer:
+                    occurrence['prayer'] = prayer_id
+                occurrences.append(occurrence)
+    return occurrences
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import Prayer
-from .models import Task
+from .models import Priority, Recurrence, Task, TaskOccurrence
 
 class PrayerSerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,7 +8,75 @@ class PrayerSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('id', 'created_at', 'updated_at')
 
+    def validate(self, attrs):
+        # Prayer names are unique per user (prayer_user_name_uniq); DRF does
+        # not derive a validator from a UniqueConstraint, so check it here.
+        instance = self.instance
+        if instance is None:
+            # The views save new prayers for the requesting user.
+            user_id = self.context['request'].user.pk
+        else:
+            user_id = attrs['user'].pk if 'user' in attrs else instance.user_id
+        name = attrs.get('name', instance.name if instance else None)
+        duplicates = Prayer.objects.filter(user_id=user_id, name=name)
+        if instance is not None:
+            duplicates = duplicates.exclude(pk=instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError({'name': 'You already have a prayer with this name.'})
+        return attrs
+
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
-        fields = '__all__'
\ No newline at end of file
+        exclude = ('user',)
+
+    def validate(self, attrs):
+        # Clients that only know the "Repeat daily" switch send ``repeat``;
+        # otherwise the switch follows the rule, so Task.save() does not
+        # turn a cleared rule back into a daily one.
+        if 'recurrence' in attrs:
+            attrs['repeat'] = bool(attrs['recurrence'])
+        elif 'repeat' in attrs:
+            current = self.instance.recurrence if self.instance else Recurrence.NONE
+            attrs['recurrence'] = (current or Recurrence.DAILY) if attrs['repeat'] else Recurrence.NONE
+        start = attrs.get('date', self.instance.date if self.instance else None)
+        until = attrs.get('repeat_until', self.instance.repeat_until if self.instance else None)
+        if start and until and until < start:
+            raise serializers.ValidationError({'repeat_until': 'Must not be before date.'})
+        return attrs
+
+class TaskFilterSerializer(serializers.Serializer):
+    """Query parameters of the task list; pass ``query_params.dict()``."""
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    status = serializers.BooleanField(required=False)
+    priority = serializers.ChoiceField(choices=Priority.choices, required=False)
+
+    def validate(self, attrs):
+        if 'date_from' in attrs and 'date_to' in attrs and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError({'date_to': 'Must not be before date_from.'})
+        return attrs
+
+class OccurrenceRangeSerializer(serializers.Serializer):
+    """``date_from`` / ``date_to`` of the occurrence list, at most MAX_DAYS apart."""
+    MAX_DAYS = 92
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+
+    def validate(self, attrs):
+        days = (attrs['date_to'] - attrs['date_from']).days
+        if days < 0:
+            raise serializers.ValidationError({'date_to': 'Must not be before date_from.'})
+        if days >= self.MAX_DAYS:
+            raise serializers.ValidationError({'date_to': f'The range may span at most {self.MAX_DAYS} days.'})
+        return attrs
+
+class TimetableRangeSerializer(OccurrenceRangeSerializer):
+    """``date_from`` / ``date_to`` of the prayer timetable, up to a year."""
+    MAX_DAYS = 366
+
+class TaskOccurrenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskOccurrence
+        fields = ('date', 'prayer', 'status', 'skipped')
@@ -1,3 +1,532 @@
-from django.test import TestCase
+import random
+from datetime import date, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import generics
+from rest_framework.renderers import JSONRenderer
+from praytimes import PrayTimes
+from rest_framework.test import APITestCase
+
+from goals.models import Goal, SubGoal
+from .fastpath import FastListMixin, PRAYER_FORMAT, TASK_FORMAT
+from . import prayer_cache, timetable, utils
+from .models import Prayer, PrayerTimetable, Task, TaskOccurrence
+from .prayer_times import METHODS, TIME_NAMES, compute_times, minutes_of_day
+from .serializers import PrayerSerializer, TaskSerializer
+from .tasks import update_prayers_daily
+from .utils import update_prayer_times_for_user
+
+User = get_user_model()
+
+
+class TaskListTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+        goal = Goal.objects.create(user=self.user, name="Goal")
+        self.sub_goal = SubGoal.objects.create(goal=goal, name="Sub")
+        for day in (3, 1, 2, 1, 5):
+            Task.objects.create(sub_goal=self.sub_goal, name=f"day {day}", date=date(2025, 1, day))
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+
+    def test_cursor_pages_by_date(self):
+        response = self.client.get("/api/tasks/", {"cursor": "", "page_size": 2})
+        dates = []
+        while True:
+            dates.extend(task["date"] for task in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(dates, ["2025-01-01", "2025-01-01", "2025-01-02", "2025-01-03", "2025-01-05"])
+
+    def test_fast_path_matches_serializer(self):
+        prayer = Prayer.objects.filter(user=self.user).first()
+        Task.objects.filter(name="day 3").update(prayer=prayer, description="with prayer")
+        render = JSONRenderer().render
+
+        tasks = Task.objects.order_by("date", "id")
+        self.assertEqual(
+            render(TASK_FORMAT.render_all(tasks.values(*TASK_FORMAT.columns))),
+            render(TaskSerializer(tasks, many=True).data),
+        )
+        prayers = Prayer.objects.order_by("name")
+        self.assertEqual(
+            render(PRAYER_FORMAT.render_all(prayers.values(*PRAYER_FORMAT.columns))),
+            render(PrayerSerializer(prayers, many=True).data),
+        )
+
+    def test_fast_list_requires_a_row_format(self):
+        with self.assertRaises(ImproperlyConfigured):
+            type("NoFormatView", (FastListMixin, generics.ListAPIView), {})
+
+
+class PrayerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+
+    def test_name_is_unique_per_user(self):
+        fajr = Prayer.objects.get(user=self.user, name="Fajr")
+        response = self.client.post(
+            "/api/prayers/", {"user": self.user.pk, "name": "Fajr", "time": "05:00"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("name", response.data)
+
+        response = self.client.patch(f"/api/prayers/{fajr.pk}/", {"name": "Isha"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(f"/api/prayers/{fajr.pk}/", {"time": "05:10"})
+        self.assertEqual(response.status_code, 200)
+
+
+class TaskFilterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+        sub_goal = SubGoal.objects.create(goal=Goal.objects.create(user=self.user, name="Goal"), name="Sub")
+        for day in range(1, 11):
+            Task.objects.create(
+                sub_goal=sub_goal, name=f"day {day}", date=date(2025, 3, day),
+                status=day % 2 == 0, priority="High" if day > 5 else "Low",
+            )
+
+    def names(self, **params):
+        response = self.client.get("/api/tasks/", params)
+        self.assertEqual(response.status_code, 200)
+        return [task["name"] for task in response.data]
+
+    def test_date_range(self):
+        self.assertEqual(
+            self.names(date_from="2025-03-03", date_to="2025-03-05"),
+            ["day 3", "day 4", "day 5"],
+        )
+        self.assertEqual(len(self.names(date_from="2025-03-09")), 2)
+
+    def test_status_and_priority(self):
+        self.assertEqual(self.names(status="true", priority="High"), ["day 6", "day 8", "day 10"])
+        self.assertEqual(self.names(status="false", date_to="2025-03-04"), ["day 1", "day 3"])
+
+    def test_filters_combine_with_cursor_pages(self):
+        response = self.client.get("/api/tasks/", {"cursor": "", "page_size": 2, "priority": "High"})
+        self.assertEqual([task["name"] for task in response.data["results"]], ["day 6", "day 7"])
+        self.assertIsNotNone(response.data["next"])
+
+    def test_invalid_filters(self):
+        for params in ({"date_from": "monday"}, {"status": "maybe"}, {"priority": "Someday"},
+                       {"date_from": "2025-03-05", "date_to": "2025-03-01"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/api/tasks/", params).status_code, 400)
+
+
+class AgendaTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+        self.sub_goal = SubGoal.objects.create(goal=Goal.objects.create(user=self.user, name="Goal"), name="Sub")
+        self.fajr = Prayer.objects.get(user=self.user, name="Fajr")
+        Prayer.objects.filter(user=self.user).update(time="12:00")
+        Prayer.objects.filter(pk=self.fajr.pk).update(time="05:00")
+
+    def add_task(self, name, day=1, prayer=None):
+        return Task.objects.create(sub_goal=self.sub_goal, name=name, date=date(2025, 4, day), prayer=prayer)
+
+    def test_groups_tasks_by_prayer(self):
+        self.add_task("after fajr", prayer=self.fajr)
+        self.add_task("anytime")
+        self.add_task("tomorrow", day=2, prayer=self.fajr)
+
+        with self.assertNumQueries(4):  # two for the ETag, one per table
+            response = self.client.get("/api/tasks/agenda/", {"date": "2025-04-01"})
+        self.assertEqual(response.status_code, 200)
+        prayers = response.data["prayers"]
+        self.assertEqual(prayers[0]["name"], "Fajr")
+        self.assertEqual([task["name"] for task in prayers[0]["tasks"]], ["after fajr"])
+        self.assertTrue(all(prayer["tasks"] == [] for prayer in prayers[1:]))
+        self.assertEqual([task["name"] for task in response.data["unscheduled"]], ["anytime"])
+
+    def test_etag(self):
+        task = self.add_task("anytime")
+        url = "/api/tasks/agenda/?date=2025-04-01"
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        task.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_invalid_date(self):
+        self.assertEqual(self.client.get("/api/tasks/agenda/", {"date": "2025-13-01"}).status_code, 400)
+
+
+class RecurrenceTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+        self.sub_goal = SubGoal.objects.create(goal=Goal.objects.create(user=self.user, name="Goal"), name="Sub")
+        self.daily = Task.objects.create(
+            sub_goal=self.sub_goal, name="read", date=date(2025, 4, 1),
+            recurrence="daily", repeat_until=date(2025, 4, 10),
+        )
+        self.weekly = Task.objects.create(sub_goal=self.sub_goal, name="review", date=date(2025, 4, 2), recurrence="weekly")
+        self.after_prayers = Task.objects.create(
+            sub_goal=self.sub_goal, name="dhikr", date=date(2025, 4, 1), recurrence="prayers",
+        )
+        Task.objects.create(sub_goal=self.sub_goal, name="once", date=date(2025, 4, 5))
+
+    def occurrences(self, date_from="2025-04-01", date_to="2025-04-30"):
+        response = self.client.get("/api/tasks/occurrences/", {"date_from": date_from, "date_to": date_to})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def dates(self, occurrences, name):
+        return [item["date"] for item in occurrences if item["name"] == name]
+
+    def test_expands_rules_over_the_range(self):
+        with self.assertNumQueries(3):  # tasks, stored occurrences, prayers
+            occurrences = self.occurrences()
+        self.assertEqual(self.dates(occurrences, "read"), [f"2025-04-{day:02}" for day in range(1, 11)])
+        self.assertEqual(self.dates(occurrences, "review"), ["2025-04-02", "2025-04-09", "2025-04-16", "2025-04-23", "2025-04-30"])
+        self.assertEqual(len(self.dates(occurrences, "dhikr")), 5 * 30)
+        self.assertEqual(self.dates(occurrences, "once"), ["2025-04-05"])
+        self.assertEqual(Task.objects.count(), 4)
+
+    def test_completions_and_exceptions(self):
+        url = f"/api/tasks/{self.daily.pk}/occurrences/"
+        self.assertEqual(self.client.post(url, {"date": "2025-04-03", "status": True}).status_code, 200)
+        self.assertEqual(self.client.post(url, {"date": "2025-04-04", "skipped": True}).status_code, 200)
+
+        read = [item for item in self.occurrences() if item["name"] == "read"]
+        self.assertEqual([item["date"] for item in read if item["status"]], ["2025-04-03"])
+        self.assertNotIn("2025-04-04", [item["date"] for item in read])
+
+        self.client.post(url, {"date": "2025-04-03", "status": False})
+        self.assertEqual(TaskOccurrence.objects.count(), 1)
+
+    def test_rejects_days_outside_the_rule(self):
+        url = f"/api/tasks/{self.weekly.pk}/occurrences/"
+        self.assertEqual(self.client.post(url, {"date": "2025-04-03", "status": True}).status_code, 400)
+        fajr = Prayer.objects.get(user=self.user, name="Fajr")
+        url = f"/api/tasks/{self.after_prayers.pk}/occurrences/"
+        self.assertEqual(self.client.post(url, {"date": "2025-04-03", "status": True}).status_code, 400)
+        self.assertEqual(self.client.post(url, {"date": "2025-04-03", "prayer": fajr.pk, "status": True}).status_code, 200)
+
+    def test_agenda_lists_occurrences(self):
+        fajr = Prayer.objects.get(user=self.user, name="Fajr")
+        response = self.client.get("/api/tasks/agenda/", {"date": "2025-04-09"})
+        tasks = {prayer["name"]: [task["name"] for task in prayer["tasks"]] for prayer in response.data["prayers"]}
+        self.assertEqual(tasks["Fajr"], ["dhikr"])
+        self.assertEqual(tasks["Sunrise"], [])
+        self.assertEqual(sorted(task["name"] for task in response.data["unscheduled"]), ["read", "review"])
+
+        etag = response["ETag"]
+        self.client.post(f"/api/tasks/{self.after_prayers.pk}/occurrences/", {"date": "2025-04-09", "prayer": fajr.pk, "status": True})
+        response = self.client.get("/api/tasks/agenda/", {"date": "2025-04-09"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["prayers"][0]["tasks"][0]["status"])
+
+    def test_repeat_switch_means_daily(self):
+        response = self.client.patch(f"/api/tasks/{self.weekly.pk}/", {"repeat": False})
+        self.assertEqual(response.data["recurrence"], "")
+        response = self.client.patch(f"/api/tasks/{self.weekly.pk}/", {"repeat": True})
+        self.assertEqual(response.data["recurrence"], "daily")
+
+    def test_clears_recurrence(self):
+        response = self.client.patch(f"/api/tasks/{self.weekly.pk}/", {"recurrence": ""})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["recurrence"], response.data["repeat"]), ("", False))
+        self.weekly.refresh_from_db()
+        self.assertEqual((self.weekly.recurrence, self.weekly.repeat), ("", False))
+
+
+class BulkUpdateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+        self.goal = Goal.objects.create(user=self.user, name="Goal")
+        self.first = SubGoal.objects.create(goal=self.goal, name="First")
+        self.second = SubGoal.objects.create(goal=self.goal, name="Second")
+        self.tasks = [
+            Task.objects.create(sub_goal=self.first, name=f"task {i}", date=date(2025, 5, 1)) for i in range(4)
+        ]
+
+    def post(self, changes):
+        return self.client.post("/api/tasks/bulk/", {"changes": changes}, format="json")
+
+    def test_applies_changes_and_counters(self):
+        fajr = Prayer.objects.get(user=self.user, name="Fajr")
+        changes = [{"id": str(task.pk), "status": True} for task in self.tasks[:3]]
+        changes.append({"id": str(self.tasks[3].pk), "sub_goal": str(self.second.pk), "prayer": str(fajr.pk),
+                        "date": "2025-05-02", "priority": "High"})
+        version = Goal.objects.get(pk=self.goal.pk).version
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(changes)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(result["ok"] for result in response.data["results"]))
+        task_queries = [query["sql"].split()[0] for query in queries if '"tasks_task"' in query["sql"]]
+        self.assertEqual(task_queries, ["SELECT", "UPDATE"])
+
+        moved = Task.objects.get(pk=self.tasks[3].pk)
+        self.assertEqual((moved.sub_goal_id, moved.prayer_id, str(moved.date), moved.priority),
+                         (self.second.pk, fajr.pk, "2025-05-02", "High"))
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.goal.refresh_from_db()
+        self.assertEqual((self.first.total_tasks, self.first.finished_tasks), (3, 3))
+        self.assertEqual((self.second.total_tasks, self.second.finished_tasks), (1, 0))
+        self.assertEqual((self.goal.total_tasks, self.goal.finished_tasks), (4, 3))
+        self.assertGreater(self.goal.version, version)
+
+    def test_reports_each_item(self):
+        other = User.objects.create_user(username="bilal", password="pass")
+        foreign_sub_goal = SubGoal.objects.create(goal=Goal.objects.create(user=other, name="Theirs"), name="Sub")
+        foreign_task = Task.objects.create(sub_goal=foreign_sub_goal, name="theirs", date=date(2025, 5, 1))
+        response = self.post([
+            {"id": str(self.tasks[0].pk), "status": True},
+            {"id": str(foreign_task.pk), "status": True},
+            {"id": str(self.tasks[1].pk), "sub_goal": str(foreign_sub_goal.pk)},
+            {"id": str(self.tasks[2].pk), "priority": "Someday"},
+            {"id": str(self.tasks[0].pk), "status": False},
+        ])
+        results = response.data["results"]
+        self.assertEqual([result["ok"] for result in results], [True, False, False, False, False])
+        self.assertIn("priority", results[3]["errors"])
+        self.assertTrue(Task.objects.get(pk=self.tasks[0].pk).status)
+        self.assertFalse(Task.objects.get(pk=foreign_task.pk).status)
+        self.assertEqual(Task.objects.get(pk=self.tasks[1].pk).sub_goal_id, self.first.pk)
+
+    def test_rejects_malformed_batches(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.post([{"id": str(self.tasks[0].pk)}] * 501).status_code, 400)
+
+
+class TaskOwnerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.other = User.objects.create_user(username="bilal", password="pass")
+        self.sub_goal = SubGoal.objects.create(goal=Goal.objects.create(user=self.user, name="Mine"), name="Sub")
+        self.theirs = Goal.objects.create(user=self.other, name="Theirs")
+        self.task = Task.objects.create(sub_goal=self.sub_goal, name="task", date=date(2025, 1, 1))
+
+    def test_set_on_create_and_task_move(self):
+        self.assertEqual(self.task.user_id, self.user.pk)
+        self.task.sub_goal = SubGoal.objects.create(goal=self.theirs, name="Their sub")
+        self.task.save(update_fields=["sub_goal"])
+        self.assertEqual(Task.objects.get(pk=self.task.pk).user_id, self.other.pk)
+
+    def test_follows_sub_goal_move(self):
+        self.sub_goal.goal = self.theirs
+        self.sub_goal.save()
+        self.assertEqual(Task.objects.get(pk=self.task.pk).user_id, self.other.pk)
+
+    def test_hidden_from_api(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(f"/api/tasks/{self.task.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("user", response.data)
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(f"/api/tasks/{self.task.pk}/").status_code, 404)
+
+
+def reference_minutes(method, latitude, longitude, day):
+    """Times from the praytimes library, in minutes after midnight UTC."""
+    # Set every parameter: PrayTimes keeps its settings on the class.
+    calculator = PrayTimes()
+    calculator.adjust({"maghrib": "0 min", "midnight": "Standard", "asr": "Standard", **METHODS[method]})
+    times = calculator.getTimes(day, (latitude, longitude), 0)
+    return {
+        name: -1 if times[name] == "-----" else int(times[name][:2]) * 60 + int(times[name][3:])
+        for name in TIME_NAMES
+    }
+
+
+class PrayerTimeTests(APITestCase):
+    def test_matches_praytimes(self):
+        rng = random.Random(0)
+        for method in METHODS:
+            places = [
+                (rng.uniform(-60, 60), rng.uniform(-180, 180), date(2025, 1, 1) + timedelta(days=rng.randrange(365)))
+                for _ in range(50)
+            ]
+            latitudes, longitudes, days = zip(*places)
+            computed = compute_times(latitudes, longitudes, list(days), method=method)
+            for index, place in enumerate(places):
+                expected = reference_minutes(method, *place)
+                if method == "Makkah":
+                    # praytimes subtracts minute-based Isha from Maghrib.
+                    expected["isha"] = (expected["maghrib"] + 90) % 1440
+                for name in TIME_NAMES:
+                    actual = int(minutes_of_day(computed[name][index]))
+                    gap = abs(actual - expected[name])
+                    self.assertLessEqual(min(gap, 1440 - gap), 1, (method, place, name))
+
+    def test_high_latitudes(self):
+        computed = compute_times([55], [0], date(2025, 6, 21), high_lats="None")
+        self.assertEqual(int(minutes_of_day(computed["fajr"])[0]), -1)
+        computed = compute_times([55], [0], date(2025, 6, 21))
+        self.assertGreaterEqual(int(minutes_of_day(computed["fajr"])[0]), 0)
+
+    def test_daily_update(self):
+        day = date.today()
+        amina = User.objects.create_user(username="amina", password="pass", latitude=21.42, longitude=39.83)
+        bilal = User.objects.create_user(username="bilal", password="pass", latitude=51.5, longitude=-0.12)
+        User.objects.create_user(username="nowhere", password="pass")
+        Prayer.objects.filter(user=bilal, name="Isha").delete()
+        Prayer.objects.filter(user=amina, name="Fajr").update(is_custom=True)
+
+        fajr = Prayer.objects.get(user=amina, name="Fajr")
+        with self.assertNumQueries(5), mock.patch.object(utils, "publish_event") as publish:
+            update_prayers_daily()
+        self.assertEqual(Prayer.objects.get(user=amina, name="Fajr").pk, fajr.pk)
+        events = sorted((call.args[0], call.args[1]) for call in publish.call_args_list)
+        self.assertEqual(events.count((bilal.pk, "created")), 1)
+        self.assertEqual(len(events), 14)
+        for user in (amina, bilal):
+            expected = reference_minutes("MWL", user.latitude, user.longitude, day)
+            for key, name in (("fajr", "Fajr"), ("isha", "Isha")):
+                prayer = Prayer.objects.get(user=user, name=name)
+                minutes = prayer.time.hour * 60 + prayer.time.minute
+                self.assertLessEqual(abs(minutes - expected[key]), 1)
+                self.assertEqual(prayer.calculation_method, "MWL")
+                self.assertFalse(prayer.is_custom)
+        self.assertEqual(
+            set(Prayer.objects.filter(user__username="nowhere").values_list("time", flat=True)), {time(0)}
+        )
+
+    def test_upserts_in_batches(self):
+        for i in range(3):
+            User.objects.create_user(username=f"user{i}", password="pass", latitude=10 * i, longitude=20)
+        with mock.patch.object(utils, "PRAYER_UPSERT_BATCH", 5), CaptureQueriesContext(connection) as queries:
+            update_prayers_daily()
+        inserts = [query for query in queries.captured_queries if query["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 5)  # 21 rows
+        self.assertEqual(Prayer.objects.count(), 21)
+        self.assertFalse(Prayer.objects.filter(time=time(0)).exists())
+
+
+class PrayerCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        prayer_cache.local_cache.clear()
+        self.day = timezone.now().date()
+        # The first two are in the same cell at two decimal places.
+        self.latitudes = [21.4201, 21.4222, 24.47]
+        self.longitudes = [39.8262, 39.8259, 39.61]
+
+    def compute(self, **kwargs):
+        with mock.patch.object(prayer_cache, "compute_times", wraps=prayer_cache.compute_times) as engine:
+            minutes = prayer_cache.prayer_minutes(self.latitudes, self.longitudes, self.day, **kwargs)
+        return minutes, [len(call.args[0]) for call in engine.call_args_list]
+
+    def test_computes_each_cell_once(self):
+        minutes, calls = self.compute()
+        self.assertEqual(calls, [2])
+        self.assertEqual(minutes["fajr"][0], minutes["fajr"][1])
+        self.assertNotEqual(minutes["fajr"][0], minutes["fajr"][2])
+
+        again, calls = self.compute()
+        self.assertEqual(calls, [])
+        self.assertEqual(again["isha"].tolist(), minutes["isha"].tolist())
+        self.assertEqual(prayer_cache.cache_stats()["hits"], 4)
+        self.assertEqual(prayer_cache.cache_stats()["misses"], 2)
+
+        _, calls = self.compute(precision=0)
+        self.assertEqual(calls, [2])
+
+    def test_shared_tier(self):
+        with mock.patch.object(prayer_cache, "SHARED_CACHE", True):
+            self.compute()
+            prayer_cache.local_cache.clear()
+            _, calls = self.compute()
+        self.assertEqual(calls, [])
+        self.assertEqual(len(prayer_cache.local_cache), 2)
+
+    def test_lru_eviction(self):
+        lru = prayer_cache.LRUCache(2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual((lru.get("a"), lru.get("b"), lru.get("c")), (1, None, 3))
+
+    def test_registration_reuses_cells(self):
+        self.compute()
+        user = User.objects.create_user(username="amina", password="pass", latitude=21.42, longitude=39.83)
+        with mock.patch.object(prayer_cache, "compute_times") as engine:
+            update_prayer_times_for_user(user)
+        engine.assert_not_called()
+        self.assertNotEqual(Prayer.objects.get(user=user, name="Fajr").time, time(0))
+
+    def test_stats_view(self):
+        self.compute()
+        user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get("/api/prayers/cache-stats/").status_code, 403)
+        user.is_staff = True
+        user.save()
+        response = self.client.get("/api/prayers/cache-stats/")
+        self.assertEqual(response.data["hit_rate"], 1 / 3)
+
+
+class PrayerTimetableTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass", latitude=21.4225, longitude=39.8262)
+        self.client.force_authenticate(self.user)
+        self.cell = int(prayer_cache.buckets([self.user.latitude], [self.user.longitude])[0])
+
+    def get(self, date_from, date_to):
+        return self.client.get("/api/prayers/timetable/", {"date_from": date_from, "date_to": date_to})
+
+    def test_matches_engine(self):
+        days = [date(2024, 1, 1), date(2024, 2, 29), date(2024, 12, 31)]
+        latitudes, longitudes = prayer_cache.cell_centres([self.cell])
+        computed = compute_times(latitudes[0], longitudes[0], days)
+        table = timetable.ensure_timetables([self.cell], 2024)[self.cell]
+        for row, name in enumerate(TIME_NAMES):
+            expected = minutes_of_day(computed[name]).tolist()
+            self.assertEqual([int(table[row, day.timetuple().tm_yday - 1]) for day in days], expected)
+        # Day 366 of a common year is never read.
+        self.assertEqual(set(timetable.ensure_timetables([self.cell], 2025)[self.cell][:, 365].tolist()),
+                         {timetable.UNDEFINED})
+
+    def test_range_across_years(self):
+        response = self.get("2024-12-30", "2025-01-02")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([day["date"] for day in response.data],
+                         ["2024-12-30", "2024-12-31", "2025-01-01", "2025-01-02"])
+        self.assertEqual(PrayerTimetable.objects.filter(cell=self.cell).count(), 2)
+        expected = minutes_of_day(compute_times(*prayer_cache.cell_centres([self.cell]), date(2025, 1, 1))["fajr"])
+        self.assertEqual(response.data[2]["Fajr"], "%02d:%02d" % divmod(int(expected[0]), 60))
+
+    def test_reads_stored_tables(self):
+        self.get("2025-03-01", "2025-03-31")
+        with mock.patch.object(timetable, "compute_times") as engine, self.assertNumQueries(1):
+            response = self.get("2025-06-01", "2025-06-30")
+        engine.assert_not_called()
+        self.assertEqual(len(response.data), 30)
+
+    def test_undefined_times(self):
+        self.user.latitude, self.user.longitude = 70, 20
+        self.user.save()
+        response = self.get("2025-06-21", "2025-06-21")
+        self.assertIsNone(response.data[0]["Sunrise"])
+
+    def test_validation(self):
+        self.assertEqual(self.get("2025-01-02", "2025-01-01").status_code, 400)
+        self.assertEqual(self.get("2025-01-01", "2026-01-02").status_code, 400)
+        self.assertEqual(self.get("2025-01-01", "2025-12-31").status_code, 200)
+        self.user.latitude = None
+        self.user.save()
+        self.assertEqual(self.get("2025-01-01", "2025-01-01").status_code, 400)
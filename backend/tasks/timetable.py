@@ -0,0 +1,111 @@
+# tasks/timetable.py
+"""
+Yearly prayer timetables per grid cell.
+
+A PrayerTimetable row holds a whole year of times for one cell of
+tasks/prayer_cache.py, packed into about 5 KB, so any range of days is a
+slice of one or two stored rows. Missing tables are computed together, a
+year for every cell in one engine call, and inserted; the daily job and the
+timetable agree to the minute since both use the cell's centre.
+"""
+from datetime import timedelta
+
+import numpy as np
+
+from .models import PrayerTimetable
+from .prayer_cache import BUCKET_PRECISION, buckets, cell_centres
+from .prayer_times import TIME_NAMES, compute_times, minutes_of_day
+from .utils import CALCULATION_METHOD, PRAYER_NAMES
+
+TIMETABLE_DAYS = 366
+UNDEFINED = 0xFFFF
+# Cells per engine call and per INSERT when building many tables.
+BUILD_BATCH = 500
+
+
+def pack(table):
+    return np.asarray(table, dtype='<u2').tobytes()
+
+
+def unpack(data):
+    """The ``(len(TIME_NAMES), 366)`` minutes of a stored table."""
+    return np.frombuffer(bytes(data), dtype='<u2').reshape(len(TIME_NAMES), TIMETABLE_DAYS)
+
+
+def build(cells, year, method=CALCULATION_METHOD, precision=BUCKET_PRECISION):
+    """``{cell: packed table}`` for ``year``, computed in one pass for all ``cells``."""
+    cells = np.asarray(cells, dtype=np.int64)
+    latitudes, longitudes = cell_centres(cells, precision)
+    days = np.arange(f'{year}-01-01', f'{year + 1}-01-01', dtype='datetime64[D]')
+    computed = compute_times(latitudes[:, None], longitudes[:, None], days, method=method)
+    tables = np.full((len(cells), len(TIME_NAMES), TIMETABLE_DAYS), UNDEFINED, dtype='<u2')
+    for index, name in enumerate(TIME_NAMES):
+        minutes = minutes_of_day(computed[name])
+        tables[:, index, :len(days)] = np.where(minutes < 0, UNDEFINED, minutes)
+    return {int(cell): pack(table) for cell, table in zip(cells.tolist(), tables)}
+
+
+def ensure_timetables(cells, year, method=CALCULATION_METHOD, precision=BUCKET_PRECISION):
+    """
+    ``{cell: unpacked table}`` of ``cells`` for ``year``: one query for the
+    stored tables, and the missing ones built and inserted in batches.
+    """
+    cells = sorted({int(cell) for cell in cells})
+    stored = dict(
+        PrayerTimetable.objects.filter(method=method, precision=precision, year=year, cell__in=cells)
+        .values_list('cell', 'minutes')
+    )
+    missing = [cell for cell in cells if cell not in stored]
+    for start in range(0, len(missing), BUILD_BATCH):
+        built = build(missing[start:start + BUILD_BATCH], year, method, precision)
+        # A table built concurrently by another request is the same table.
+        PrayerTimetable.objects.bulk_create(
+            [
+                PrayerTimetable(method=method, precision=precision, cell=cell, year=year, minutes=minutes)
+                for cell, minutes in built.items()
+            ],
+            ignore_conflicts=True,
+        )
+        stored.update(built)
+    return {cell: unpack(stored[cell]) for cell in cells}
+
+
+def _clock(minutes):
+    if minutes == UNDEFINED:
+        return None
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def timetable_range(latitude, longitude, date_from, date_to, method=CALCULATION_METHOD,
+                    precision=BUCKET_PRECISION):
+    """
+    ``[{"date", "Fajr", ..., "Isha"}]`` from ``date_from`` to ``date_to``
+    inclusive, times as UTC ``HH:MM`` (None where undefined), read from one
+    stored table per year spanned.
+    """
+    cell = int(buckets([latitude], [longitude], precision)[0])
+    tables = {
+        year: ensure_timetables([cell], year, method, precision)[cell]
+        for year in range(date_from.year, date_to.year + 1)
+    }
+    names = [PRAYER_NAMES[name] for name in TIME_NAMES]
+    days = []
+    day = date_from
+    while day <= date_to:
+        column = tables[day.year][:, day.timetuple().tm_yday - 1].tolist()
+        row = {'date': day.isoformat()}
+        row.update(zip(names, map(_clock, column)))
+        days.append(row)
+        day += timedelta(days=1)
+    return days
+
+
+def located_cells(users, precision=BUCKET_PRECISION):
+    """The distinct cells the located ``users`` (a queryset) live in."""
+    rows = list(
+        users.filter(latitude__isnull=False, longitude__isnull=False).values_list('latitude', 'longitude')
+    )
+    if not rows:
+        return []
+    latitudes, longitudes = zip(*rows)
+    return np.unique(buckets(latitudes, longitudes, precision)).tolist()
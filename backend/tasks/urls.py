@@ -1,8 +1,14 @@
 from django.urls import path
-from .views import TaskListCreateView, TaskDetailView
+from .views import (
+    AgendaView, TaskBulkUpdateView, TaskDetailView, TaskListCreateView, TaskOccurrenceListView, TaskOccurrenceView,
+)
 
 
 urlpatterns = [
     path('', TaskListCreateView.as_view(), name='task-list-create'),
+    path('agenda/', AgendaView.as_view(), name='task-agenda'),
+    path('bulk/', TaskBulkUpdateView.as_view(), name='task-bulk-update'),
+    path('occurrences/', TaskOccurrenceListView.as_view(), name='task-occurrence-list'),
     path('<uuid:pk>/', TaskDetailView.as_view(), name='task-detail'),
+    path('<uuid:pk>/occurrences/', TaskOccurrenceView.as_view(), name='task-occurrence'),
 ]
\ No newline at end of file
@@ -1,55 +1,94 @@
 # tasks/utils.py
+from datetime import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
-from praytimes import PrayTimes
+
+from sync.events import publish_event
 from .models import Prayer
+from .prayer_cache import prayer_minutes
+
+CALCULATION_METHOD = 'MWL'
+# The stored prayer names for the engine's times.
+PRAYER_NAMES = {
+    'fajr': 'Fajr',
+    'sunrise': 'Sunrise',
+    'dhuhr': 'Dhuhr',
+    'asr': 'Asr',
+    'sunset': 'Sunset',
+    'maghrib': 'Maghrib',
+    'isha': 'Isha',
+}
+# Users read, and their times looked up, per batch.
+UPDATE_BATCH = 10_000
+# Rows per INSERT ... ON CONFLICT statement.
+PRAYER_UPSERT_BATCH = getattr(settings, 'PRAYER_UPSERT_BATCH', 2000)
+UPSERT_FIELDS = ['time', 'calculation_method', 'is_custom', 'updated_at']
+
+
+def update_prayer_times(users, day=None):
+    """
+    Recompute the calculated prayer times of ``users`` (a queryset) for
+    ``day`` (today by default), ``UPDATE_BATCH`` users at a time: the times
+    of the batch's places come from prayer_cache and are written with
+    upsert_prayers. Users without a location are left alone. Times are UTC,
+    as before.
+    """
+    day = day or timezone.now().date()
+    located = users.filter(latitude__isnull=False, longitude__isnull=False).order_by('pk')
+    batch = []
+    for row in located.values_list('pk', 'latitude', 'longitude').iterator(chunk_size=UPDATE_BATCH):
+        batch.append(row)
+        if len(batch) == UPDATE_BATCH:
+            _update_batch(batch, day)
+            batch = []
+    if batch:
+        _update_batch(batch, day)
+
+
+@transaction.atomic
+def _update_batch(rows, day):
+    user_ids, latitudes, longitudes = zip(*rows)
+    computed = prayer_minutes(latitudes, longitudes, day, method=CALCULATION_METHOD)
+    minutes = {name: computed[key] for key, name in PRAYER_NAMES.items()}
+    prayers = []
+    for index, user_id in enumerate(user_ids):
+        for name, column in minutes.items():
+            value = int(column[index])
+            if value < 0:
+                continue  # the sun never reaches the angle that day
+            prayers.append(Prayer(
+                user_id=user_id, name=name, time=time(value // 60, value % 60),
+                calculation_method=CALCULATION_METHOD, is_custom=False,
+            ))
+    upsert_prayers(prayers)
+
+    # The upsert does not report which rows it inserted: those are the ones
+    # that kept the primary key generated here.
+    inserted = {prayer.pk for prayer in prayers}
+    written = {(prayer.user_id, prayer.name) for prayer in prayers}
+    rows = Prayer.objects.filter(user_id__in=user_ids, name__in=minutes).values_list('pk', 'user_id', 'name')
+    for pk, user_id, name in rows:
+        if (user_id, name) in written:
+            publish_event(user_id, 'created' if pk in inserted else 'updated', 'prayers', pk)
+
+
+def upsert_prayers(prayers, batch_size=None):
+    """
+    Save ``prayers`` (new Prayer instances) in bulk: a user's prayer of the
+    same name gets their time, method and custom flag, the others are
+    inserted. One INSERT ... ON CONFLICT (user, name) per ``batch_size``
+    rows (``PRAYER_UPSERT_BATCH`` by default); no save signals are sent.
+    Instances that matched an existing row keep a primary key that was not
+    saved.
+    """
+    Prayer.objects.bulk_create(
+        prayers, batch_size=batch_size or PRAYER_UPSERT_BATCH, update_conflicts=True,
+        unique_fields=['user', 'name'], update_fields=UPSERT_FIELDS,
+    )
+
 
 def update_prayer_times_for_user(user):
-    if user.latitude is None or user.longitude is None:
-        return  # no location => no calculation
-    
-    pt = PrayTimes()
-
-    # Monkey-patch the 'MWL' method if it's a dict
-    if isinstance(pt.methods['MWL'], dict):
-        class MethodWrapper:
-            def __init__(self, method_dict):
-                # If the dictionary already has a key 'params', use it,
-                # otherwise, use the entire dict as parameters.
-                self.params = method_dict.get('params', method_dict)
-        pt.methods['MWL'] = MethodWrapper(pt.methods['MWL'])
-
-    pt.setMethod('MWL')
-
-    now = timezone.now()
-    y, m, d = now.year, now.month, now.day
-
-    # e.g. no offset or use user.timezone_offset
-    result = pt.getTimes((y, m, d), (user.latitude, user.longitude), 0)
-
-    # Make sure your Prayer model has records for these 7 events
-    prayer_map = {
-        'Fajr': 'fajr',
-        'Sunrise': 'sunrise',
-        'Dhuhr': 'dhuhr',
-        'Asr': 'asr',
-        'Sunset': 'sunset',
-        'Maghrib': 'maghrib',
-        'Isha': 'isha'
-    }
-
-    for display_name, library_key in prayer_map.items():
-        time_str = result.get(library_key)
-        if not time_str:
-            continue
-
-        hour_str, min_str = time_str.split(':')
-        hour, minute = int(hour_str), int(min_str)
-
-        prayer_obj, _ = Prayer.objects.get_or_create(
-            user=user,
-            name=display_name
-        )
-        prayer_obj.time = f"{hour:02d}:{minute:02d}:00"
-        prayer_obj.calculation_method = 'MWL'
-        prayer_obj.is_custom = False
-        prayer_obj.save()
+    update_prayer_times(get_user_model().objects.filter(pk=user.pk))
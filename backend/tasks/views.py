@@ -1,12 +1,29 @@
-from rest_framework import generics, permissions
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import parse_etags
+from django.utils.dateparse import parse_date
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from goals.pagination import KeysetPagination
+from django.shortcuts import get_object_or_404
+from . import prayer_cache, timetable
+from .agenda import agenda_etag, render_agenda
+from .bulk import MAX_BULK_CHANGES, apply_task_changes
+from .recurrence import daily_prayer_ids, expand, is_occurrence, tasks_in_range
+from .fastpath import FastListMixin, PRAYER_FORMAT, TASK_FORMAT
 from .models import Prayer
 from .serializers import PrayerSerializer
-from .models import Task
-from .serializers import TaskSerializer 
+from .models import Task, TaskOccurrence
+from .serializers import (
+    OccurrenceRangeSerializer, TaskFilterSerializer, TaskOccurrenceSerializer, TaskSerializer,
+    TimetableRangeSerializer,
+)
 
-class PrayerListCreateView(generics.ListCreateAPIView):
+class PrayerListCreateView(FastListMixin, generics.ListCreateAPIView):
     serializer_class = PrayerSerializer
     permission_classes = [permissions.IsAuthenticated]
+    row_format = PRAYER_FORMAT
 
     def get_queryset(self):
         return Prayer.objects.filter(user=self.request.user)
@@ -22,15 +39,59 @@ class PrayerDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         return Prayer.objects.filter(user=self.request.user)
 
+class PrayerCacheStatsView(APIView):
+    """Hit/miss counters of the shared prayer-time cache."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(prayer_cache.cache_stats())
+
+class PrayerTimetableView(APIView):
+    """
+    The calculated prayer times of each day from ``date_from`` to ``date_to``
+    (inclusive, up to a year) at the user's location, in UTC, read from the
+    precomputed yearly timetable of the place.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        dates = TimetableRangeSerializer(data=request.query_params.dict())
+        dates.is_valid(raise_exception=True)
+        user = request.user
+        if user.latitude is None or user.longitude is None:
+            return Response(
+                {"detail": "Set your location to get a prayer timetable."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        days = timetable.timetable_range(
+            user.latitude, user.longitude,
+            dates.validated_data['date_from'], dates.validated_data['date_to'],
+        )
+        return Response(days)
+
 # Taks views
 
-class TaskListCreateView(generics.ListCreateAPIView):
+class TaskPagination(KeysetPagination):
+    # Tasks have no created_at; they are listed by the day they are due.
+    ordering = ('date', 'id')
+    page_size = 50
+    max_page_size = 500
+
+class TaskListCreateView(FastListMixin, generics.ListCreateAPIView):
+    """
+    The user's tasks, optionally narrowed by ``sub_goal_id``, ``prayer_id``,
+    ``date_from`` / ``date_to`` (inclusive), ``status`` and ``priority``.
+    Send ``?cursor=`` (empty for the first page) to get keyset pages of
+    ``page_size`` tasks ordered by date.
+    """
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TaskPagination
+    row_format = TASK_FORMAT
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Task.objects.filter(sub_goal__goal__user=user)
+        queryset = Task.objects.filter(user=user)
 
         sub_goal_id = self.request.query_params.get('sub_goal_id')
         if sub_goal_id:
@@ -40,11 +101,141 @@ class TaskListCreateView(generics.ListCreateAPIView):
         if prayer_id:
             queryset = queryset.filter(prayer_id=prayer_id)
 
+        if self.request.method == 'GET':
+            filters = TaskFilterSerializer(data=self.request.query_params.dict())
+            filters.is_valid(raise_exception=True)
+            lookups = {
+                'date_from': 'date__gte',
+                'date_to': 'date__lte',
+                'status': 'status',
+                'priority': 'priority',
+            }
+            queryset = queryset.filter(**{
+                lookups[name]: value for name, value in filters.validated_data.items()
+            })
+
         return queryset
 
+class TaskBulkUpdateView(APIView):
+    """
+    ``{"changes": [{"id": ..., "status": ..., "date": ..., ...}, ...]}``:
+    change ``status``, ``date``, ``priority``, ``prayer`` or ``sub_goal`` of
+    up to 500 tasks at once. Valid items are saved together; ``results``
+    says for each item, in order, whether it was applied.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        changes = request.data.get('changes') if isinstance(request.data, dict) else None
+        if not isinstance(changes, list) or not changes:
+            return Response({"changes": ["Expected a non-empty list."]}, status=status.HTTP_400_BAD_REQUEST)
+        if len(changes) > MAX_BULK_CHANGES:
+            return Response(
+                {"changes": [f"At most {MAX_BULK_CHANGES} changes per request."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({"results": apply_task_changes(request.user, changes)})
+
 class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Task.objects.filter(sub_goal__goal__user=self.request.user)
\ No newline at end of file
+        queryset = Task.objects.filter(user=self.request.user)
+        if self.request.method not in permissions.SAFE_METHODS:
+            # Lock the row so concurrent status flips adjust the goal
+            # progress counters one after the other.
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+class AgendaView(APIView):
+    """
+    ``?date=YYYY-MM-DD`` (default today): the user's prayers in time order,
+    each with its tasks for that day, and the day's other tasks under
+    ``unscheduled``. Supports If-None-Match.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        day = request.query_params.get('date')
+        if day is None:
+            day = timezone.localdate()
+        else:
+            try:
+                day = parse_date(day)
+            except ValueError:
+                day = None
+            if day is None:
+                return Response({"date": ["Must be a date as YYYY-MM-DD."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag = agenda_etag(request.user, day)
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(render_agenda(request.user, day), headers={'ETag': etag})
+
+class TaskOccurrenceListView(APIView):
+    """
+    Every task occurrence between ``date_from`` and ``date_to`` (inclusive,
+    at most 92 days): one-off tasks plus recurring tasks expanded per day,
+    ordered by date. ``recurring`` tells them apart.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        dates = OccurrenceRangeSerializer(data=request.query_params.dict())
+        dates.is_valid(raise_exception=True)
+        date_from, date_to = dates.validated_data['date_from'], dates.validated_data['date_to']
+
+        rows = tasks_in_range(request.user, date_from, date_to).values(*TASK_FORMAT.columns)
+        occurrences = expand(request.user, rows, date_from, date_to)
+        occurrences.sort(key=lambda occurrence: occurrence['date'])
+        return Response(occurrences)
+
+class TaskOccurrenceView(APIView):
+    """
+    Mark one occurrence of a recurring task done (``status``) or skipped
+    (``skipped``). Setting both back to false forgets the occurrence.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @transaction.atomic
+    def post(self, request, pk, *args, **kwargs):
+        task = get_object_or_404(
+            Task.objects.filter(user=request.user).select_for_update(of=('self',)), pk=pk
+        )
+        serializer = TaskOccurrenceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        prayer = data.get('prayer')
+        prayer_id = prayer.pk if prayer else None
+        if not is_occurrence(task, data['date'], prayer_id, daily_prayer_ids(request.user)):
+            return Response(
+                {"date": ["This task has no occurrence on this date and prayer."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        occurrences = TaskOccurrence.objects.filter(task=task, date=data['date'], prayer_id=prayer_id)
+        if data.get('status') or data.get('skipped'):
+            occurrences.update_or_create(
+                task=task, date=data['date'], prayer_id=prayer_id,
+                defaults={'status': data.get('status', False), 'skipped': data.get('skipped', False)},
+            )
+        else:
+            occurrences.delete()
+        # The agenda ETag, delta sync and change events all follow the task.
+        task.save(update_fields=['updated_at'])
+        return Response({
+            'date': data['date'].isoformat(),
+            'prayer': prayer_id,
+            'status': data.get('status', False),
+            'skipped': data.get('skipped', False),
+        })
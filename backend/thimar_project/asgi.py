@@ -3,14 +3,24 @@ ASGI config for thimar_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Only the change-event stream (``/api/events/``, sync/stream.py) is served
+over ASGI, by its own process: ``events`` in the Procfile, the ``events``
+service on App Engine. The rest of the API stays on gunicorn and WSGI
+(thimar_project/wsgi.py), where sync views and streaming responses such as
+the data export run as written; every other path answers 404 here.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "thimar_project.settings")
+django.setup(set_prefix=False)
+
+# Imported after Django is set up.
+from sync.stream import events_application  # noqa: E402
 
-application = get_asgi_application()
+application = events_application
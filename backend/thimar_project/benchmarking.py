@@ -0,0 +1,41 @@
+"""
+Helpers shared by the ``bench_*`` management commands.
+
+Benchmarks seed their data inside a transaction that is always rolled back,
+so they can be pointed at a development database without leaving rows
+behind. Run them against PostgreSQL for numbers that mean anything.
+"""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+
+@contextmanager
+def rolled_back():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def bench_user(username='bench-user'):
+    User = get_user_model()
+    return User.objects.create_user(username=username, password='bench')
+
+
+def timed(func, repeat=5):
+    """Run ``func`` ``repeat`` times, return the timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return f"median {statistics.median(ordered):8.2f} ms   p95 {p95:8.2f} ms"
@@ -60,6 +60,9 @@ INSTALLED_APPS = [
     'goals',
     'tasks',
     'gen_ai',
+    'sync',
+    'search',
+    'analytics',
 ]
 
 MIDDLEWARE = [
@@ -126,6 +129,51 @@ DATABASES = {
 }
 
 
+# Cache
+# Redis when REDIS_URL is set, otherwise (local development, tests) the
+# per-process local-memory backend.
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+GOAL_LIST_CACHE_TIMEOUT = int(os.getenv('GOAL_LIST_CACHE_TIMEOUT', 60 * 5))
+
+# Delta sync (/api/sync/): how far back each cursor reaches to cover
+# transactions still open when it was issued, and how long deletions are
+# remembered before clients with an older cursor get a full resync.
+SYNC_OVERLAP_SECONDS = int(os.getenv('SYNC_OVERLAP_SECONDS', 5))
+SYNC_TOMBSTONE_DAYS = int(os.getenv('SYNC_TOMBSTONE_DAYS', 90))
+
+# Prayer times (tasks/prayer_cache.py): locations are grouped into cells of
+# this many decimal places of latitude and longitude (2 is about a
+# kilometre), each computed once per day and method. Computed cells are
+# kept in a per-process LRU and, with Redis, shared between processes.
+PRAYER_TIME_BUCKET_PRECISION = int(os.getenv('PRAYER_TIME_BUCKET_PRECISION', 2))
+PRAYER_TIME_CACHE_SIZE = int(os.getenv('PRAYER_TIME_CACHE_SIZE', 50_000))
+PRAYER_TIME_SHARED_CACHE = os.getenv('PRAYER_TIME_SHARED_CACHE', '1' if REDIS_URL else '0') == '1'
+# Prayer rows per INSERT ... ON CONFLICT when refreshing them in bulk.
+PRAYER_UPSERT_BATCH = int(os.getenv('PRAYER_UPSERT_BATCH', 2000))
+# Search (/api/search/) ranks every match but pages through at most this
+# many of the best ones.
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 1000))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
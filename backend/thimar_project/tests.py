@@ -0,0 +1,129 @@
+import re
+from urllib.parse import quote
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from goals.models import SubGoal
+from goals.tests import make_goal
+from tasks.models import Prayer, Task
+
+User = get_user_model()
+
+# "SCAN tasks_task" on SQLite, "Seq Scan on tasks_task" on PostgreSQL. SQLite
+# also reports "SCAN ... USING INDEX" for a full index walk, which is no
+# better on a large table, so any SCAN of a table counts. An FTS5 MATCH
+# shows up as "SCAN ... VIRTUAL TABLE INDEX n:M..." and is a lookup.
+SEQUENTIAL_SCAN = re.compile(r'^(?:SCAN (?!CONSTANT ROW|\S+ VIRTUAL TABLE INDEX \d+:M)|.*Seq Scan on )(\S+)')
+
+
+def explain(sql):
+    """The plan lines of ``sql`` on the current database."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # With a few seeded rows the planner rightly prefers a seq scan;
+            # turning it off leaves one only where no index applies.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql)
+        else:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+class IndexUsageTests(APITestCase):
+    """
+    Every query behind the read endpoints must be served by an index. The
+    SQL each request runs is captured and EXPLAINed against seeded data.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="amina", password="pass")
+        other = User.objects.create_user(username="bilal", password="pass")
+        for owner in (cls.user, other):
+            for i in range(3):
+                make_goal(owner, name=f"goal {i}", sub_goals=3, tasks_per_sub_goal=4)
+        cls.goal = cls.user.goals.first()
+        cls.sub_goal = SubGoal.objects.filter(goal=cls.goal).first()
+        cls.prayer = Prayer.objects.filter(user=cls.user).first()
+        cls.task = Task.objects.filter(sub_goal=cls.sub_goal).first()
+        Task.objects.filter(pk=cls.task.pk).update(prayer=cls.prayer)
+        Task.objects.create(sub_goal=cls.sub_goal, name="daily", date=cls.task.date, recurrence="prayers")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def assertIndexed(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, url)
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertTrue(selects, url)
+        for sql in selects:
+            for line in explain(sql):
+                match = SEQUENTIAL_SCAN.match(line.strip())
+                self.assertIsNone(match, f"{url} scans {match and match.group(1)}:\n{sql}")
+
+    def test_goal_endpoints(self):
+        for url in (
+            "/api/goals/",
+            "/api/goals/?cursor=",
+            "/api/goals/summary/",
+            "/api/goals/snapshot/",
+            f"/api/goals/snapshot/?goal={self.goal.pk}",
+            f"/api/goals/{self.goal.pk}/",
+            f"/api/goals/{self.goal.pk}/completed-tasks/",
+        ):
+            with self.subTest(url=url):
+                self.assertIndexed(url)
+
+    def test_sub_goal_endpoints(self):
+        for url in (
+            "/api/goals/sub-goals/",
+            "/api/goals/sub-goals/?cursor=",
+            f"/api/goals/sub-goals/{self.sub_goal.pk}/",
+        ):
+            with self.subTest(url=url):
+                self.assertIndexed(url)
+
+    def test_task_endpoints(self):
+        for url in (
+            "/api/tasks/",
+            "/api/tasks/?cursor=",
+            f"/api/tasks/?sub_goal_id={self.sub_goal.pk}",
+            f"/api/tasks/?sub_goal_id={self.sub_goal.pk}&cursor=",
+            f"/api/tasks/?prayer_id={self.prayer.pk}",
+            "/api/tasks/?date_from=2025-01-01&date_to=2025-01-07",
+            "/api/tasks/?status=false&priority=Low&cursor=",
+            "/api/tasks/agenda/?date=2025-01-01",
+            "/api/tasks/occurrences/?date_from=2025-01-01&date_to=2025-01-31",
+            f"/api/tasks/{self.task.pk}/",
+        ):
+            with self.subTest(url=url):
+                self.assertIndexed(url)
+
+    def test_prayer_endpoints(self):
+        for url in ("/api/prayers/", f"/api/prayers/{self.prayer.pk}/"):
+            with self.subTest(url=url):
+                self.assertIndexed(url)
+
+    def test_export(self):
+        self.assertIndexed("/api/users/me/export/")
+
+    def test_search(self):
+        self.assertIndexed("/api/search/?q=task")
+        self.assertIndexed("/api/search/?q=goal+sub")
+
+    def test_analytics(self):
+        self.assertIndexed("/api/analytics/")
+
+    def test_sync(self):
+        self.assertIndexed("/api/sync/")
+        self.assertIndexed("/api/sync/?cursor=" + quote(timezone.now().isoformat()))
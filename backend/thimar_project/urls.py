@@ -25,6 +25,9 @@ urlpatterns = [
     path('api/sub-goals/', include('goals.urls')),
     path('api/prayers/', include('tasks.prayer_urls')),
     path('api/tasks/', include('tasks.urls')),
+    path('api/sync/', include('sync.urls')),
+    path('api/search/', include('search.urls')),
+    path('api/analytics/', include('analytics.urls')),
 
     path('api/gen-ai/', include('gen_ai.urls')),
     
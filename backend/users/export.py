@@ -0,0 +1,55 @@
+# users/export.py
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from goals.fastpath import GOAL_FORMAT, SUB_GOAL_FORMAT
+from goals.models import Goal, SubGoal, progress_percent
+from tasks.fastpath import PRAYER_FORMAT, TASK_FORMAT
+from tasks.models import Prayer, Task
+from .serializers import UserSerializer
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+def _dumps(value):
+    return json.dumps(value, cls=JSONEncoder)
+
+
+def _sections(user):
+    """(name, queryset, render) for every table in the export, flat."""
+    def goal(row):
+        return GOAL_FORMAT.render(row, {'progress': progress_percent(row['finished_tasks'], row['total_tasks'])})
+
+    def sub_goal(row):
+        return SUB_GOAL_FORMAT.render(row, {'progress': progress_percent(row['finished_tasks'], row['total_tasks'])})
+
+    return [
+        ('goals', Goal.objects.filter(user=user).order_by('created_at').values(*GOAL_FORMAT.columns), goal),
+        ('sub_goals', SubGoal.objects.filter(goal__user=user).order_by('created_at').values(*SUB_GOAL_FORMAT.columns), sub_goal),
+        ('tasks', Task.objects.filter(user=user).order_by('date').values(*TASK_FORMAT.columns), TASK_FORMAT.render),
+        ('prayers', Prayer.objects.filter(user=user).order_by('name').values(*PRAYER_FORMAT.columns), PRAYER_FORMAT.render),
+    ]
+
+
+def export_user_data(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the user's data as one JSON document, a few rows at a time.
+
+    Rows are read with ``.iterator(chunk_size=...)`` and written out as soon
+    as a chunk is full, so memory use depends on ``chunk_size`` and not on
+    the size of the account. Each table is a flat list; relations are ids.
+    """
+    yield '{"user": ' + _dumps(UserSerializer(user).data)
+    for name, queryset, render in _sections(user):
+        yield f', "{name}": ['
+        buffer = []
+        first = True
+        for row in queryset.iterator(chunk_size=chunk_size):
+            buffer.append(('' if first else ',') + _dumps(render(row)))
+            first = False
+            if len(buffer) >= chunk_size:
+                yield ''.join(buffer)
+                buffer = []
+        yield ''.join(buffer) + ']'
+    yield '}'
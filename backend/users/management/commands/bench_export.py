@@ -0,0 +1,49 @@
+import tracemalloc
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from goals.models import Goal, SubGoal
+from tasks.models import Task
+from thimar_project.benchmarking import bench_user, rolled_back
+from users.export import export_user_data
+
+
+class Command(BaseCommand):
+    help = "Measure peak Python memory of the streaming export at growing account sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,50000', help="Task counts, comma separated.")
+
+    def handle(self, *args, **options):
+        for size in (int(n) for n in options['sizes'].split(',')):
+            with rolled_back():
+                user = bench_user()
+                goal = Goal.objects.create(user=user, name="goal")
+                sub_goals = SubGoal.objects.bulk_create(
+                    SubGoal(goal=goal, name=f"sub-goal {i}") for i in range(20)
+                )
+                Task.objects.bulk_create(
+                    (
+                        Task(
+                            sub_goal=sub_goals[i % len(sub_goals)],
+                            user=user,
+                            name=f"task {i}",
+                            description="Memorize a page and review the previous one",
+                            date=date(2025, 1, 1) + timedelta(days=i % 365),
+                        )
+                        for i in range(size)
+                    ),
+                    batch_size=5000,
+                )
+
+                written = 0
+                tracemalloc.start()
+                for chunk in export_user_data(user):
+                    written += len(chunk)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                self.stdout.write(
+                    f"{size:>8} tasks   {written / 1e6:8.2f} MB written   peak {peak / 1e6:6.2f} MB"
+                )
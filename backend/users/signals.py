@@ -18,11 +18,14 @@ def create_default_prayers(sender, instance, created, **kwargs):
             'Maghrib', 
             'Isha'
         ]
-        for prayer_name in default_prayers:
-            Prayer.objects.create(
+        # One INSERT; a new user has no open streams to notify yet.
+        Prayer.objects.bulk_create([
+            Prayer(
                 user=instance,
                 name=prayer_name,
                 time="00:00:00",  # placeholder, updated later by praytimes or user
                 calculation_method="auto",
                 is_custom=False
             )
+            for prayer_name in default_prayers
+        ])
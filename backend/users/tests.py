@@ -1,3 +1,67 @@
-from django.test import TestCase
+import json
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import signals
+from django.db import close_old_connections
+from django.test import RequestFactory
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from goals.models import Goal, SubGoal
+from tasks.models import Task
+from thimar_project import wsgi
+
+User = get_user_model()
+
+
+class UserExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="amina", password="pass")
+        self.client.force_authenticate(self.user)
+
+    def test_export_streams_all_tables(self):
+        goal = Goal.objects.create(user=self.user, name="Quran")
+        sub_goal = SubGoal.objects.create(goal=goal, name="Juz 1")
+        for day in range(1, 6):
+            Task.objects.create(sub_goal=sub_goal, name=f"page {day}", date=date(2025, 1, day), status=day % 2)
+        Goal.objects.create(user=User.objects.create_user(username="other"), name="not mine")
+
+        response = self.client.get("/api/users/me/export/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        data = json.loads(b"".join(response.streaming_content))
+
+        self.assertEqual(data["user"]["username"], "amina")
+        self.assertEqual([g["name"] for g in data["goals"]], ["Quran"])
+        self.assertEqual(data["goals"][0]["progress"], 60)
+        self.assertEqual(data["sub_goals"][0]["goal"], str(goal.pk))
+        self.assertEqual(len(data["tasks"]), 5)
+        self.assertEqual(len(data["prayers"]), 7)
+
+    def test_export_through_the_deployed_application(self):
+        # The export streams lazy ORM reads, which only the WSGI deployment
+        # can run (thimar_project/asgi.py serves the event stream alone).
+        Goal.objects.create(user=self.user, name="Quran")
+        token = AccessToken.for_user(self.user)
+        environ = RequestFactory().get("/api/users/me/export/", HTTP_AUTHORIZATION=f"Bearer {token}").environ
+        started = []
+        # As the test client does: keep the test transaction's connection.
+        signals.request_started.disconnect(close_old_connections)
+        signals.request_finished.disconnect(close_old_connections)
+        try:
+            body = wsgi.application(environ, lambda status, headers: started.append(status))
+            data = json.loads(b"".join(body))
+            body.close()
+        finally:
+            signals.request_started.connect(close_old_connections)
+            signals.request_finished.connect(close_old_connections)
+        self.assertEqual(started, ["200 OK"])
+        self.assertEqual([goal["name"] for goal in data["goals"]], ["Quran"])
+        self.assertEqual(len(data["prayers"]), 7)
+
+    def test_empty_account(self):
+        response = self.client.get("/api/users/me/export/")
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(data["goals"], [])
+        self.assertEqual(data["tasks"], [])
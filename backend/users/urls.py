@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import LogoutView, UserRegistrationView, UserProfileView
+from .views import LogoutView, UserRegistrationView, UserProfileView, UserExportView
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -7,6 +7,7 @@ from rest_framework_simplejwt.views import (
 urlpatterns = [
     path('register/', UserRegistrationView.as_view(), name='user-register'),
     path('me/', UserProfileView.as_view(), name='user-profile'),
+    path('me/export/', UserExportView.as_view(), name='user-export'),
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('logout/', LogoutView.as_view(), name='user-logout'),
@@ -1,11 +1,13 @@
 from rest_framework import generics, permissions, status
 from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
 from .serializers import UserRegistrationSerializer, UserSerializer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from tasks.utils import update_prayer_times_for_user
+from .export import export_user_data
 
 User = get_user_model()
 
@@ -27,6 +29,20 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
+# Streaming export of everything the user owns
+class UserExportView(APIView):
+    """
+    The user's data as one streamed JSON document (users/export.py). The
+    body reads from the ORM as it is sent, so it relies on the WSGI
+    deployment; see thimar_project/asgi.py.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(export_user_data(request.user), content_type='application/json')
+        response['Content-Disposition'] = 'attachment; filename="thimar-export.json"'
+        return response
+
 class LogoutView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 